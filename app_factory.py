@@ -0,0 +1,232 @@
+"""
+Application factory.
+
+create_app() builds the Flask app for a deployment role. The core blueprint
+(pages, health checks, public config) is always registered; the others are
+registered only when their role is enabled, and their heavy dependencies are
+imported only then:
+
+    payments  Stripe / Coinbase Commerce checkout, donations and webhooks
+    auth      registration, login, tokens, waitlist and profile
+    ai        TradingAI advice (initialized in the background)
+    whales    whale activity and top whales
+    admin     whitelist and waitlist administration
+
+Roles come from APP_ROLES ('all' by default), so one codebase can run as
+separately sized pools, e.g. APP_ROLES=ai,whales for the AI workers and
+APP_ROLES=payments,auth,admin for the web tier.
+"""
+
+import asyncio
+import importlib
+import logging
+import os
+import threading
+import time
+from functools import partial
+
+import structlog
+from dotenv import load_dotenv
+from flask import Flask, request
+from flask_cors import CORS
+
+from config import get_config
+from extensions import limiter
+from log_pipeline import (
+    LogPipeline, DeferredFlushStreamHandler, DeferredFlushFileHandler,
+    configure_structlog, json_formatter
+)
+from metrics import init_metrics
+from startup import startup_report
+from utils import (
+    api_error, async_helper, compress_response, configure_template_cache,
+    token_revocations, whitelist_manager
+)
+
+# Load environment
+load_dotenv()
+
+config = get_config()
+logger = structlog.get_logger(__name__)
+
+ROLES = ('payments', 'auth', 'ai', 'whales', 'admin')
+
+def parse_roles(spec):
+    """Roles from a comma-separated spec (or 'all'), in registration order"""
+    if isinstance(spec, str):
+        spec = [role.strip().lower() for role in spec.split(',') if role.strip()]
+    if 'all' in spec:
+        return ROLES
+    unknown = set(spec) - set(ROLES)
+    if unknown:
+        raise ValueError(f"Unknown APP_ROLES: {', '.join(sorted(unknown))} (expected {', '.join(ROLES)} or all)")
+    return tuple(role for role in ROLES if role in spec)
+
+# Configure structured logging (once per process, shared by every app)
+_log_pipeline = None
+
+def setup_logging():
+    global _log_pipeline
+    if _log_pipeline is not None:
+        return _log_pipeline
+    log_level = getattr(logging, config.LOG_LEVEL, logging.INFO)
+    log_file = getattr(config, 'LOG_FILE', './logs/app.log')
+    log_dir = os.path.dirname(log_file)
+    if log_dir and not os.path.exists(log_dir):
+        os.makedirs(log_dir, exist_ok=True)
+    formatter = json_formatter()
+    log_handlers = [DeferredFlushStreamHandler(), DeferredFlushFileHandler(log_file)]
+    for handler in log_handlers:
+        handler.setFormatter(formatter)
+
+    # Request threads only enqueue; the writer thread formats, writes and flushes
+    pipeline = LogPipeline(
+        log_handlers,
+        queue_size=config.LOG_QUEUE_SIZE,
+        batch_size=config.LOG_BATCH_SIZE,
+        flush_interval=config.LOG_FLUSH_INTERVAL,
+        sample_rate=config.LOG_SAMPLE_RATE,
+        sampled_events=config.LOG_SAMPLED_EVENTS
+    )
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(pipeline.queue_handler)
+    root.setLevel(log_level)
+    configure_structlog()
+    _log_pipeline = pipeline.start()
+    return _log_pipeline
+
+# Background initialization
+def startup_stages(roles):
+    """Init stages the given roles need before the process reports ready"""
+    stages = []
+    if 'auth' in roles or 'admin' in roles:
+        stages.append('whitelist')
+    if 'ai' in roles:
+        stages.append('trading_ai')
+    return tuple(stages)
+
+async def warm_up(roles):
+    """Background startup for the enabled roles; stages run concurrently"""
+    loop = asyncio.get_running_loop()
+    stages = []
+    for name in startup_stages(roles):
+        if startup_report.status(name) == 'done':
+            # Built in the master before fork (--preload); this worker inherited it
+            continue
+        if name == 'whitelist':
+            work = loop.run_in_executor(None, partial(whitelist_manager.refresh, full=True))
+        else:
+            from blueprints.ai import initialize_trading_ai
+            work = initialize_trading_ai()
+        stages.append(startup_report.run_stage(name, work))
+    await asyncio.gather(*stages)
+    report = startup_report.as_dict(top_imports=5)
+    logger.info("Startup complete",
+                roles=list(roles),
+                ready_after_seconds=report["ready_after_seconds"],
+                stages={name: stage.get("seconds") for name, stage in report["stages"].items()},
+                slowest_imports={entry["module"]: entry["seconds"] for entry in report["imports"]})
+
+_warm_up_pid = None
+_warm_up_lock = threading.Lock()
+
+def start_warm_up(app):
+    """Start background initialization once per process; requests are served meanwhile"""
+    global _warm_up_pid
+    if _warm_up_pid != os.getpid():
+        with _warm_up_lock:
+            if _warm_up_pid != os.getpid():
+                _warm_up_pid = os.getpid()
+                roles = app.config['APP_ROLES']
+                async_helper.submit(warm_up(roles))
+                if 'whitelist' in startup_stages(roles):
+                    # Keeps the index in sync off the request path
+                    whitelist_manager.refresher.start()
+                # Logouts and tier changes made on other workers
+                token_revocations.refresher.start()
+                if 'trading_ai' in startup_stages(roles) and config.DATABASE_URL:
+                    # Prices stored by the discovery workers' prices jobs
+                    from blueprints.ai import price_history_refresher
+                    price_history_refresher.start()
+
+# Request logging middleware
+def log_request_info():
+    request.start_time = time.time()
+    logger.info(
+        "Request started",
+        method=request.method,
+        path=request.path,
+        remote_addr=request.remote_addr,
+        user_agent=str(request.user_agent)
+    )
+
+def log_response_info(response):
+    # Requests rejected by the rate limiter never reach log_request_info
+    duration = time.time() - getattr(request, 'start_time', time.time())
+    logger.info(
+        "Request completed",
+        method=request.method,
+        path=request.path,
+        status_code=response.status_code,
+        duration_ms=round(duration * 1000, 2)
+    )
+    return response
+
+# Error handlers
+def not_found(error):
+    return api_error("Endpoint not found", 404, error_type="NotFoundError")
+
+def internal_error(error):
+    logger.error("Internal server error", exc_info=True)
+    return api_error("Internal server error", 500, error_type="InternalError")
+
+def ratelimit_handler(e):
+    return api_error(
+        "Rate limit exceeded",
+        429,
+        details={"retry_after": str(e.retry_after)},
+        error_type="RateLimitError"
+    )
+
+def create_app(roles=None):
+    """Build the app serving the core routes plus the blueprints for roles (default: APP_ROLES)"""
+    roles = parse_roles(config.APP_ROLES if roles is None else roles)
+
+    app = Flask(__name__, template_folder='templates')
+    app.config.from_object(config)
+    app.config['APP_ROLES'] = roles
+    configure_template_cache(app)
+    app.extensions['log_pipeline'] = setup_logging()
+
+    # Initialize extensions
+    CORS(app)
+    limiter.init_app(app)
+
+    # Gunicorn workers import the entry module without running __main__
+    startup_report.required = set(startup_stages(roles))
+    app.before_request(partial(start_warm_up, app))
+
+    app.before_request(log_request_info)
+    app.after_request(log_response_info)
+    app.after_request(compress_response)
+    init_metrics(app)
+
+    app.register_error_handler(404, not_found)
+    app.register_error_handler(500, internal_error)
+    app.register_error_handler(429, ratelimit_handler)
+
+    from blueprints.core import core_bp
+    app.register_blueprint(core_bp)
+    for role in roles:
+        module = importlib.import_module(f'blueprints.{role}')
+        app.register_blueprint(getattr(module, f'{role}_bp'))
+
+    # Each payments worker drains the webhook inbox in the background
+    if 'payments' in roles and config.DATABASE_URL:
+        from webhook_inbox import webhook_worker
+        app.before_request(webhook_worker.ensure_started)
+
+    logger.info("Application created", roles=list(roles))
+    return app
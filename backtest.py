@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Backtesting for TradingAI recommendations.
+
+Replays historical price bars and whale_transactions through the TradingAI
+scoring in simulated time. At every bar the indicators are built only from
+data up to that bar, scored with BatchScoringEngine (the same weights and
+thresholds as the live recommendation path), and the recommended action is
+judged against the price move over the following horizon. Bars are processed
+in chunks and only per-action aggregates are kept, so memory stays flat for
+any length of history; date ranges run in parallel across processes.
+
+Usage: python backtest.py --prices SOL_1m.csv [--token SOL --flows-from-db] [--start 2024-01-01]
+           [--end 2025-01-01] [--workers 8] [--output backtest_SOL.json]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import structlog
+
+from scoring_engine import BatchScoringEngine
+
+logger = structlog.get_logger(__name__)
+
+# Position taken for each action, as a fraction of capital (negative = short)
+ACTION_EXPOSURE = {"strong_buy": 1.0, "buy": 0.5, "hold": 0.0, "monitor": 0.0, "sell": -0.5}
+
+# whale_transactions actions counted as buying (+) or selling (-) pressure
+FLOW_DIRECTION = {"buy": 1.0, "sell": -1.0}
+
+DAY_SECONDS = 86400
+
+def _parse_timestamp(value: str) -> float:
+    """Epoch seconds (or milliseconds) or an ISO 8601 string, as UTC epoch seconds"""
+    try:
+        number = float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return number / 1000 if number > 1e12 else number
+
+class PriceHistory:
+    """Bars for one token: open timestamps, close, volume and net whale flow per bar"""
+
+    def __init__(self, timestamps, close, volume, flows=None):
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        self.flows = (np.zeros(len(self.close)) if flows is None
+                      else np.asarray(flows, dtype=np.float64))
+        if not (len(self.timestamps) == len(self.close) == len(self.volume) == len(self.flows)):
+            raise ValueError("timestamps, close, volume and flows must have the same length")
+        if len(self.timestamps) > 1 and (np.diff(self.timestamps) <= 0).any():
+            raise ValueError("Bars must be sorted by time with no duplicates")
+        if (self.close <= 0).any():
+            raise ValueError("Close prices must be positive")
+
+    def __len__(self):
+        return len(self.close)
+
+    def slice(self, start: int, end: int) -> "PriceHistory":
+        return PriceHistory(self.timestamps[start:end], self.close[start:end],
+                            self.volume[start:end], self.flows[start:end])
+
+    def between(self, start_ts: Optional[float] = None, end_ts: Optional[float] = None) -> "PriceHistory":
+        """Bars with start_ts <= timestamp < end_ts"""
+        start = 0 if start_ts is None else int(np.searchsorted(self.timestamps, start_ts, side="left"))
+        end = len(self) if end_ts is None else int(np.searchsorted(self.timestamps, end_ts, side="left"))
+        return self.slice(start, end)
+
+    def add_whale_flows(self, transactions: Iterable[Tuple[float, str, float]]) -> int:
+        """Fold (epoch seconds, action, usd_value) rows into the bar they happened in"""
+        times, amounts = [], []
+        for timestamp, action, usd_value in transactions:
+            direction = FLOW_DIRECTION.get(action)
+            if direction:
+                times.append(timestamp)
+                amounts.append(direction * float(usd_value))
+        if not times:
+            return 0
+        bars = np.searchsorted(self.timestamps, np.asarray(times, dtype=np.float64), side="right") - 1
+        inside = bars >= 0  # transactions before the first bar are ignored
+        np.add.at(self.flows, bars[inside], np.asarray(amounts)[inside])
+        return int(inside.sum())
+
+    @classmethod
+    def load(cls, path: str) -> "PriceHistory":
+        """Load bars from .npz (timestamps/close/volume[/flows]) or CSV with a header row"""
+        if path.endswith(".npz"):
+            with np.load(path) as data:
+                return cls(data["timestamps"], data["close"], data["volume"],
+                           data["flows"] if "flows" in data else None)
+        timestamps, close, volume = [], [], []
+        with open(path, newline="") as f:
+            reader = csv.DictReader(f)
+            fields = {name.lower(): name for name in reader.fieldnames or []}
+            time_field = next((fields[name] for name in ("timestamp", "time", "date") if name in fields), None)
+            if time_field is None or "close" not in fields:
+                raise ValueError(f"{path} needs a timestamp/time/date column and a close column")
+            volume_field = fields.get("volume")
+            for row in reader:
+                timestamps.append(_parse_timestamp(row[time_field]))
+                close.append(float(row[fields["close"]]))
+                volume.append(float(row[volume_field]) if volume_field and row[volume_field] else 0.0)
+        return cls(timestamps, close, volume)
+
+    def save(self, path: str):
+        """Save as .npz, which loads far faster than CSV for repeated runs"""
+        np.savez(path, timestamps=self.timestamps, close=self.close,
+                 volume=self.volume, flows=self.flows)
+
+def iter_whale_transactions(token: str, start_ts: float, end_ts: float) -> Iterator[Tuple[float, str, float]]:
+    """Stream (epoch seconds, action, usd_value) for token from whale_transactions"""
+    from utils import db_manager
+
+    query = """
+        SELECT EXTRACT(EPOCH FROM timestamp), action, usd_value
+        FROM whale_transactions
+        WHERE token_symbol = %s
+          AND timestamp >= to_timestamp(%s) AT TIME ZONE 'UTC'
+          AND timestamp < to_timestamp(%s) AT TIME ZONE 'UTC'
+        ORDER BY timestamp
+    """
+    for timestamp, action, usd_value in db_manager.iter_query(query, (token, start_ts, end_ts)):
+        yield float(timestamp), action, float(usd_value)
+
+class BacktestStats:
+    """Per-action signal counts, hits and returns; mergeable across chunks and processes"""
+
+    def __init__(self, action_names: Tuple[str, ...]):
+        self.action_names = tuple(action_names)
+        size = len(self.action_names)
+        self.signals = np.zeros(size, dtype=np.int64)
+        self.hits = np.zeros(size, dtype=np.int64)
+        self.return_sum = np.zeros(size)
+        self.pnl_sum = np.zeros(size)
+        self.confidence_sum = np.zeros(size)
+        self.first_timestamp: Optional[int] = None
+        self.last_timestamp: Optional[int] = None
+
+    def add(self, codes, hits, forward_returns, pnl, confidences, timestamps):
+        size = len(self.action_names)
+        self.signals += np.bincount(codes, minlength=size)
+        self.hits += np.bincount(codes, weights=hits, minlength=size).astype(np.int64)
+        self.return_sum += np.bincount(codes, weights=forward_returns, minlength=size)
+        self.pnl_sum += np.bincount(codes, weights=pnl, minlength=size)
+        self.confidence_sum += np.bincount(codes, weights=confidences, minlength=size)
+        if len(timestamps):
+            self._extend(int(timestamps[0]), int(timestamps[-1]))
+
+    def _extend(self, first: Optional[int], last: Optional[int]):
+        if first is not None and (self.first_timestamp is None or first < self.first_timestamp):
+            self.first_timestamp = first
+        if last is not None and (self.last_timestamp is None or last > self.last_timestamp):
+            self.last_timestamp = last
+
+    def merge(self, other: "BacktestStats") -> "BacktestStats":
+        self.signals += other.signals
+        self.hits += other.hits
+        self.return_sum += other.return_sum
+        self.pnl_sum += other.pnl_sum
+        self.confidence_sum += other.confidence_sum
+        self._extend(other.first_timestamp, other.last_timestamp)
+        return self
+
+    @staticmethod
+    def _ratio(numerator, denominator):
+        return round(float(numerator) / denominator, 6) if denominator else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = int(self.signals.sum())
+        actions = {}
+        for i, name in enumerate(self.action_names):
+            count = int(self.signals[i])
+            actions[name] = {
+                "signals": count,
+                "hit_rate": self._ratio(self.hits[i], count),
+                "avg_forward_return": self._ratio(self.return_sum[i], count),
+                "avg_pnl": self._ratio(self.pnl_sum[i], count),
+                "total_pnl": round(float(self.pnl_sum[i]), 6),
+                "avg_confidence": self._ratio(self.confidence_sum[i], count)
+            }
+        return {
+            "period": {
+                "start": (datetime.fromtimestamp(self.first_timestamp, timezone.utc).isoformat()
+                          if self.first_timestamp is not None else None),
+                "end": (datetime.fromtimestamp(self.last_timestamp, timezone.utc).isoformat()
+                        if self.last_timestamp is not None else None)
+            },
+            "overall": {
+                "signals": total,
+                "hit_rate": self._ratio(self.hits.sum(), total),
+                "avg_pnl": self._ratio(self.pnl_sum.sum(), total),
+                "total_pnl": round(float(self.pnl_sum.sum()), 6),
+                "avg_confidence": self._ratio(self.confidence_sum.sum(), total)
+            },
+            "actions": actions
+        }
+
+class Backtester:
+    """Scores every bar from trailing indicators and judges it on the forward return"""
+
+    def __init__(self, lookback: int = 60, horizon: int = 60, chunk_size: int = 1440,
+                 trend_band: float = 0.002, volatility_ref: float = 0.0025, momentum_ref: float = 0.01,
+                 flow_ref: float = 1_000_000.0, hold_band: float = 0.005):
+        if np is None:
+            raise RuntimeError("Backtesting requires numpy (pip install numpy)")
+        if lookback < 2 or horizon < 1 or chunk_size < 1:
+            raise ValueError("lookback must be >= 2, horizon and chunk_size >= 1")
+        self.lookback = lookback
+        self.horizon = horizon
+        self.chunk_size = chunk_size
+        self.trend_band = trend_band
+        self.volatility_ref = volatility_ref
+        self.momentum_ref = momentum_ref
+        self.flow_ref = flow_ref
+        self.hold_band = hold_band
+        self.engine = BatchScoringEngine()
+        self.exposure = np.array([ACTION_EXPOSURE[name] for name in self.engine.action_names])
+
+    @property
+    def settings(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in (
+            "lookback", "horizon", "chunk_size", "trend_band", "volatility_ref",
+            "momentum_ref", "flow_ref", "hold_band")}
+
+    def new_stats(self) -> BacktestStats:
+        return BacktestStats(self.engine.action_names)
+
+    def indicators(self, history: PriceHistory, decisions) -> Dict[str, Any]:
+        """TradingAI-shaped inputs at each decision bar, from the lookback window ending there"""
+        lookback = self.lookback
+        close = history.close
+        returns = close[1:] / close[:-1] - 1
+        # Prefix sums give every trailing-window sum in O(1); r[j] is the return into bar j + 1
+        return_sums = np.concatenate(([0.0], np.cumsum(returns)))
+        square_sums = np.concatenate(([0.0], np.cumsum(returns * returns)))
+        volume_sums = np.concatenate(([0.0], np.cumsum(history.volume)))
+        flow_sums = np.concatenate(([0.0], np.cumsum(history.flows)))
+
+        mean_return = (return_sums[decisions] - return_sums[decisions - lookback]) / lookback
+        variance = (square_sums[decisions] - square_sums[decisions - lookback]) / lookback - mean_return ** 2
+        window_return = close[decisions] / close[decisions - lookback] - 1
+        mean_volume = (volume_sums[decisions + 1] - volume_sums[decisions + 1 - lookback]) / lookback
+        net_flow = flow_sums[decisions + 1] - flow_sums[decisions + 1 - lookback]
+
+        trends = np.where(window_return > self.trend_band, "bullish",
+                          np.where(window_return < -self.trend_band, "bearish", "sideways"))
+        volatility = np.clip(np.sqrt(np.maximum(variance, 0.0)) / self.volatility_ref, 0.1, 0.8)
+        volume_ratio = np.divide(history.volume[decisions], mean_volume,
+                                 out=np.ones(len(decisions)), where=mean_volume > 0)
+        flow_signal = np.tanh(net_flow / self.flow_ref)
+        return {
+            "trends": trends,
+            "volatility": volatility,
+            "volume": np.clip(volume_ratio * 0.5, 0.3, 1.0),
+            "momentum": np.clip(window_return / self.momentum_ref * 0.5, -0.5, 0.5),
+            # Whale flow stands in for query sentiment: net buying reads bullish
+            "sentiment_scores": np.clip(0.5 + 0.4 * flow_signal, 0.1, 0.9),
+            "sentiment_confidences": 0.7 + 0.2 * np.abs(flow_signal),
+            # Same 0.2-0.8 range the live risk assessment produces
+            "risk_scores": 0.2 + 0.6 * (volatility - 0.1) / 0.7
+        }
+
+    def evaluate(self, history: PriceHistory, first: int, last: int) -> BacktestStats:
+        """Score decisions at bars [first, last) of history, which must hold lookback/horizon margin"""
+        decisions = np.arange(first, last)
+        inputs = self.indicators(history, decisions)
+        scored = self.engine.score_indicators(
+            inputs["trends"], inputs["volatility"], inputs["volume"], inputs["momentum"],
+            inputs["sentiment_scores"], inputs["sentiment_confidences"], inputs["risk_scores"],
+            # Deterministic: evaluate the confidence without its +/-0.05 realism jitter
+            jitter=np.zeros(len(decisions))
+        )
+        codes = self.engine.action_codes(scored["recommendation_score"])
+        forward_returns = history.close[decisions + self.horizon] / history.close[decisions] - 1
+        exposure = self.exposure[codes]
+        hits = np.where(exposure > 0, forward_returns > 0,
+                        np.where(exposure < 0, forward_returns < 0,
+                                 np.abs(forward_returns) <= self.hold_band))
+        stats = self.new_stats()
+        stats.add(codes, hits, forward_returns, exposure * forward_returns,
+                  scored["confidence"], history.timestamps[decisions])
+        return stats
+
+    def decision_range(self, history: PriceHistory, start: int = 0, end: Optional[int] = None) -> Tuple[int, int]:
+        """Bars that have a full lookback behind them and a full horizon ahead"""
+        end = len(history) if end is None else end
+        return max(start, self.lookback), min(end, len(history) - self.horizon)
+
+    def run(self, history: PriceHistory, start: int = 0, end: Optional[int] = None) -> Iterator[BacktestStats]:
+        """Yield stats chunk by chunk for decisions at bars [start, end)"""
+        first, last = self.decision_range(history, start, end)
+        for chunk_start in range(first, last, self.chunk_size):
+            chunk_end = min(chunk_start + self.chunk_size, last)
+            # Work on a window just wide enough for this chunk's lookback and horizon
+            window = history.slice(chunk_start - self.lookback, chunk_end + self.horizon)
+            yield self.evaluate(window, self.lookback, self.lookback + chunk_end - chunk_start)
+
+def date_segments(history: PriceHistory, days: int) -> List[Tuple[int, int]]:
+    """Split bar indices into [first, last) ranges of `days` calendar days (UTC)"""
+    if not len(history):
+        return []
+    span = days * DAY_SECONDS
+    origin = int(history.timestamps[0]) // DAY_SECONDS * DAY_SECONDS
+    edges = np.arange(origin, int(history.timestamps[-1]) + span, span)
+    bounds = np.searchsorted(history.timestamps, edges, side="left")
+    bounds = np.append(bounds, len(history))
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+def _run_segment(task) -> Tuple[Tuple[int, int], BacktestStats]:
+    history, settings, first, last, segment = task
+    backtester = Backtester(**settings)
+    stats = backtester.new_stats()
+    for chunk in backtester.run(history, first, last):
+        stats.merge(chunk)
+    return segment, stats
+
+def run_segments(history: PriceHistory, backtester: Backtester, segments: List[Tuple[int, int]],
+                 workers: int = 1) -> Iterator[Tuple[Tuple[int, int], BacktestStats]]:
+    """Yield (segment, stats) in order, evaluating segments in `workers` processes"""
+    tasks = []
+    for first, last in segments:
+        # Ship each worker only its segment plus the lookback/horizon margin
+        low = max(0, first - backtester.lookback)
+        high = min(len(history), last + backtester.horizon)
+        tasks.append((history.slice(low, high), backtester.settings, first - low, last - low, (first, last)))
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _run_segment(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_run_segment, tasks)
+
+def backtest(history: PriceHistory, backtester: Optional[Backtester] = None, segment_days: int = 30,
+             workers: int = 1, on_segment=None) -> Dict[str, Any]:
+    """Full backtest report over history; on_segment(segment_dict) streams per-range results"""
+    backtester = backtester or Backtester()
+    total = backtester.new_stats()
+    segment_reports = []
+    started = time.perf_counter()
+    for (first, last), stats in run_segments(history, backtester, date_segments(history, segment_days), workers):
+        total.merge(stats)
+        summary = stats.to_dict()
+        segment = {"bars": last - first, **summary["period"], **summary["overall"]}
+        segment_reports.append(segment)
+        if on_segment is not None:
+            on_segment(segment)
+    report = total.to_dict()
+    report["segments"] = segment_reports
+    report["meta"] = {
+        "bars": len(history),
+        "settings": backtester.settings,
+        "action_exposure": ACTION_EXPOSURE,
+        "segment_days": segment_days,
+        "workers": workers,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "generated_at": datetime.now(timezone.utc).isoformat()
+    }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--prices", required=True, help="bars as CSV (timestamp,close,volume) or .npz")
+    parser.add_argument("--token", help="token_symbol for whale flows and the report")
+    parser.add_argument("--flows-from-db", action="store_true", help="add whale_transactions flows for --token")
+    parser.add_argument("--start", help="ISO date/time, inclusive")
+    parser.add_argument("--end", help="ISO date/time, exclusive")
+    parser.add_argument("--lookback", type=int, default=60, help="bars of history behind each decision")
+    parser.add_argument("--horizon", type=int, default=60, help="bars ahead each decision is judged on")
+    parser.add_argument("--segment-days", type=int, default=30, help="date range per parallel task")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--save-npz", help="also save the loaded bars (with flows) as .npz")
+    parser.add_argument("--output", help="report path (default: print JSON)")
+    args = parser.parse_args()
+
+    history = PriceHistory.load(args.prices)
+    history = history.between(_parse_timestamp(args.start) if args.start else None,
+                              _parse_timestamp(args.end) if args.end else None)
+    if len(history) == 0:
+        print("❌ No bars in the selected range")
+        sys.exit(1)
+    if args.flows_from_db:
+        if not args.token:
+            parser.error("--flows-from-db needs --token")
+        added = history.add_whale_flows(iter_whale_transactions(
+            args.token, float(history.timestamps[0]), float(history.timestamps[-1]) + DAY_SECONDS))
+        print(f"🐋 {added} whale transactions folded into {len(history)} bars")
+    if args.save_npz:
+        history.save(args.save_npz)
+
+    def progress(segment):
+        hit_rate = segment["hit_rate"]
+        print(f"   {str(segment['start'])[:10]} → {str(segment['end'])[:10]}: {segment['signals']} signals, "
+              f"hit rate {hit_rate:.1%}" if hit_rate is not None else f"   {segment['start']}: no signals")
+
+    backtester = Backtester(lookback=args.lookback, horizon=args.horizon)
+    print(f"📈 Backtesting {len(history)} bars with {args.workers} worker(s)")
+    report = backtest(history, backtester, args.segment_days, args.workers, on_segment=progress)
+    report["meta"]["token"] = args.token
+    report["meta"]["source"] = os.path.basename(args.prices)
+
+    overall = report["overall"]
+    print(f"\n✅ {overall['signals']} signals in {report['meta']['elapsed_seconds']}s, "
+          f"hit rate {overall['hit_rate']}, avg pnl {overall['avg_pnl']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
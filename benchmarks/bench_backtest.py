@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Backtest throughput on a synthetic year of minute bars
+Generates seeded minute bars (trending regimes plus noise) with whale flows,
+then times CSV/.npz loading and a full backtest serially and across all cores,
+checking both runs produce the same per-action results.
+
+Usage: python benchmarks/bench_backtest.py [--days 365] [--workers 8] [--seed 1234] [--keep-files]
+"""
+
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from backtest import Backtester, PriceHistory, backtest
+
+def synthetic_history(days, seed):
+    """Minute bars whose drift switches regime every few hours, with whale flow leading the drift"""
+    rng = np.random.default_rng(seed)
+    bars = days * 1440
+    regime_length = 240
+    drift = np.repeat(rng.normal(0, 0.0002, bars // regime_length + 1), regime_length)[:bars]
+    returns = drift + rng.normal(0, 0.001, bars)
+    close = 100 * np.exp(np.cumsum(returns))
+    volume = rng.lognormal(10, 0.5, bars) * (1 + 50 * np.abs(drift))
+    flows = np.where(rng.random(bars) < 0.02, rng.normal(drift * 5e9, 2e5), 0.0)
+    timestamps = 1704067200 + 60 * np.arange(bars)  # 2024-01-01 UTC
+    return PriceHistory(timestamps, close, volume, flows)
+
+def write_csv(history, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["timestamp", "close", "volume"])
+        writer.writerows(zip(history.timestamps.tolist(), history.close.tolist(), history.volume.tolist()))
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def same_results(a, b):
+    for name, stats in a["actions"].items():
+        other = b["actions"][name]
+        if (stats["signals"], stats["hit_rate"]) != (other["signals"], other["hit_rate"]):
+            return False
+        if not np.isclose(stats["total_pnl"], other["total_pnl"], rtol=1e-9, atol=1e-9):
+            return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--keep-files", action="store_true", help="leave the generated CSV/.npz behind")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="whale-backtest-")
+    history = synthetic_history(args.days, args.seed)
+    csv_path = os.path.join(workdir, "bars.csv")
+    npz_path = os.path.join(workdir, "bars.npz")
+    write_csv(history, csv_path)
+    history.save(npz_path)
+
+    print(f"🧪 Backtest throughput: {len(history):,} minute bars ({args.days} days), seed {args.seed}")
+    _, csv_s = timed(lambda: PriceHistory.load(csv_path))
+    loaded, npz_s = timed(lambda: PriceHistory.load(npz_path))
+    print(f"   load CSV  {csv_s:8.2f}s")
+    print(f"   load .npz {npz_s:8.2f}s")
+
+    backtester = Backtester()
+    serial, serial_s = timed(lambda: backtest(loaded, backtester, workers=1))
+    parallel, parallel_s = timed(lambda: backtest(loaded, backtester, workers=args.workers))
+    for workers, seconds in ((1, serial_s), (args.workers, parallel_s)):
+        print(f"   backtest, {workers:>2} worker(s) {seconds:8.2f}s  ({len(history) / seconds:,.0f} bars/s)")
+
+    print(f"\n{'action':<12}{'signals':>10}{'hit rate':>10}{'avg pnl':>12}")
+    for name, stats in serial["actions"].items():
+        hit_rate = f"{stats['hit_rate']:.1%}" if stats["hit_rate"] is not None else "-"
+        avg_pnl = f"{stats['avg_pnl']:+.5f}" if stats["avg_pnl"] is not None else "-"
+        print(f"{name:<12}{stats['signals']:>10}{hit_rate:>10}{avg_pnl:>12}")
+
+    if args.keep_files:
+        print(f"\n📁 Generated bars kept in {workdir}")
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if not same_results(serial, parallel):
+        print("\n❌ Parallel results differ from the serial run")
+        sys.exit(1)
+    print("\n✅ Serial and parallel runs agree")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Batch vs scalar TradingAI scoring
+Scores N seeded indicator/sentiment/risk sets once through the scalar
+TradingAI helpers and once through BatchScoringEngine, checks every score,
+label and confidence matches exactly, and reports the per-item cost of each.
+
+Usage: python benchmarks/bench_batch_scoring.py [--sizes 100 10000 100000] [--seed 1234] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from scoring_engine import BatchScoringEngine
+import trading_ai
+from trading_ai import ACTIONS, DEFAULT_ACTION, RECOMMENDATION_WEIGHTS, TradingAI
+
+async def no_sleep(delay, result=None):
+    return result
+
+def build_inputs(count, seed):
+    """Seeded raw inputs as parallel lists"""
+    rng = random.Random(seed)
+    inputs = {"trend": [], "volatility": [], "volume": [], "momentum": [],
+              "sentiment_score": [], "sentiment_confidence": [], "risk_score": []}
+    for _ in range(count):
+        inputs["trend"].append(rng.choice(["bullish", "bearish", "sideways"]))
+        inputs["volatility"].append(rng.uniform(0.1, 0.8))
+        inputs["volume"].append(rng.uniform(0.3, 1.0))
+        inputs["momentum"].append(rng.uniform(-0.5, 0.5))
+        inputs["sentiment_score"].append(rng.choice([0.1, 0.2, 0.3, 0.5, 0.7, 0.8, 0.9]))
+        inputs["sentiment_confidence"].append(rng.uniform(0.7, 0.9))
+        inputs["risk_score"].append(rng.uniform(0.2, 0.8))
+    return inputs
+
+def scalar_action(market_score, sentiment_score, risk_score):
+    """The _generate_recommendation scoring without its text generation"""
+    market_weight, sentiment_weight, risk_weight = RECOMMENDATION_WEIGHTS
+    recommendation_score = (market_score * market_weight + sentiment_score * sentiment_weight
+                            + (1 - risk_score) * risk_weight)
+    for threshold, name, _ in ACTIONS:
+        if recommendation_score > threshold:
+            return recommendation_score, name
+    return recommendation_score, DEFAULT_ACTION[0]
+
+def check_generate_recommendation(ai, inputs, scalar, limit=1000):
+    """Confirm scalar_action agrees with the real async _generate_recommendation"""
+    loop = asyncio.new_event_loop()
+    try:
+        with mock.patch.object(trading_ai.asyncio, "sleep", no_sleep):
+            for i in range(min(limit, len(inputs["trend"]))):
+                market = {"score": scalar["market_score"][i], "outlook": "Neutral"}
+                sentiment = {"score": inputs["sentiment_score"][i], "sentiment": "neutral"}
+                risk = {"score": inputs["risk_score"][i], "level": scalar["risk_level"][i]}
+                result = loop.run_until_complete(
+                    ai._generate_recommendation("bench", market, sentiment, risk, "bench-user"))
+                if (result["recommendation_score"], result["action"]) != (
+                        scalar["recommendation_score"][i], scalar["action"][i]):
+                    return False
+    finally:
+        loop.close()
+    return True
+
+def score_scalar(ai, inputs, jitter_seed):
+    """Per-item scoring through the TradingAI helpers, in request order"""
+    random.seed(jitter_seed)
+    results = {"market_score": [], "recommendation_score": [], "action": [],
+               "risk_level": [], "confidence": []}
+    for i in range(len(inputs["trend"])):
+        indicators = {key: inputs[key][i] for key in ("trend", "volatility", "volume", "momentum")}
+        market = {"score": ai._calculate_market_score(indicators)}
+        sentiment = {"score": inputs["sentiment_score"][i], "confidence": inputs["sentiment_confidence"][i]}
+        risk = {"score": inputs["risk_score"][i]}
+        recommendation_score, action = scalar_action(market["score"], sentiment["score"], risk["score"])
+        results["market_score"].append(market["score"])
+        results["recommendation_score"].append(recommendation_score)
+        results["action"].append(action)
+        results["risk_level"].append(ai._categorize_risk_level(risk["score"]))
+        results["confidence"].append(ai._calculate_confidence(market, sentiment, risk))
+    return results
+
+def score_batch(engine, inputs, jitter_seed):
+    return engine.score_indicators(
+        inputs["trend"], inputs["volatility"], inputs["volume"], inputs["momentum"],
+        inputs["sentiment_score"], inputs["sentiment_confidence"], inputs["risk_score"],
+        rng=random.Random(jitter_seed)
+    )
+
+def mismatches(scalar, batch):
+    """Fields whose batch values differ from the scalar ones (floats compared exactly)"""
+    bad = []
+    for field, expected in scalar.items():
+        actual = batch[field]
+        if isinstance(expected[0], float):
+            same = np.array_equal(np.asarray(expected, dtype=np.float64), actual)
+        else:
+            same = list(actual) == expected
+        if not same:
+            bad.append(field)
+    return bad
+
+def best_of(rounds, func):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000, 100000])
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    ai = TradingAI()
+    engine = BatchScoringEngine()
+    failed = False
+
+    print(f"🧪 Batch vs scalar scoring (seed {args.seed}, best of {args.rounds})")
+    print(f"\n{'N':>9}{'scalar µs/item':>16}{'batch µs/item':>15}{'speedup':>9}  results")
+    for size in args.sizes:
+        inputs = build_inputs(size, args.seed)
+        scalar = score_scalar(ai, inputs, args.seed)
+        bad = mismatches(scalar, score_batch(engine, inputs, args.seed))
+        if not check_generate_recommendation(ai, inputs, scalar):
+            bad.append("_generate_recommendation")
+        scalar_s = best_of(args.rounds, lambda: score_scalar(ai, inputs, args.seed))
+        batch_s = best_of(args.rounds, lambda: score_batch(engine, inputs, args.seed))
+        status = "identical" if not bad else f"MISMATCH in {', '.join(bad)}"
+        failed = failed or bool(bad)
+        print(f"{size:>9}{scalar_s / size * 1e6:>16.3f}{batch_s / size * 1e6:>15.3f}"
+              f"{scalar_s / batch_s:>8.1f}x  {status}")
+
+    if failed:
+        print("\n❌ Batch scoring diverged from the scalar path")
+        sys.exit(1)
+    print("\n✅ Batch results match the scalar path exactly")
+
+if __name__ == "__main__":
+    main()
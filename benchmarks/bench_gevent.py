@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Concurrent slow requests per worker: gevent mode vs threads
+Two measurements, both driven from greenlets in this process:
+- psycopg2: many greenlets each run SELECT pg_sleep() on their own
+  connection, without and with gevent_mode's wait callback. Without it libpq
+  blocks the whole process and the queries run one after another.
+- gunicorn: one worker serving POST /ai/trading-advice (about 90 ms of
+  awaited work per call) to many concurrent clients, as gthread with
+  --threads and as WORKER_CLASS=gevent.
+The run fails if either gevent variant does not beat its baseline.
+Needs gevent and Postgres (pgserver, or --database-url).
+
+Usage: python benchmarks/bench_gevent.py [--clients 200] [--duration 8] [--threads 4]
+"""
+
+try:
+    from gevent import monkey
+    monkey.patch_all()
+    import gevent
+except ImportError:
+    gevent = None
+
+import argparse
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+try:
+    import pgserver  # Throwaway local Postgres when no --database-url is given
+except ImportError:
+    pgserver = None
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def bench_psycopg2(database_url, queries, sleep_seconds):
+    """Seconds for `queries` greenlets to each run one pg_sleep, with and without the wait callback"""
+    import psycopg2
+    from psycopg2 import extensions
+    import gevent_mode
+
+    def one_query():
+        conn = psycopg2.connect(database_url)
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_sleep(%s)", (sleep_seconds,))
+        finally:
+            conn.close()
+
+    results = {}
+    for label, callback in (("blocking", None), ("cooperative", gevent_mode.wait_callback)):
+        extensions.set_wait_callback(callback)
+        start = time.perf_counter()
+        gevent.joinall([gevent.spawn(one_query) for _ in range(queries)], raise_error=True)
+        results[label] = time.perf_counter() - start
+    extensions.set_wait_callback(None)
+    return results
+
+def wait_until_ready(base_url, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base_url}/health/ready", timeout=2).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.05)
+    return False
+
+def run_clients(base_url, token, clients, duration):
+    """Closed-loop clients posting advice requests; returns (ok count, latencies in ms, errors)"""
+    latencies, errors = [], []
+    stop_at = time.time() + duration
+
+    def client(n):
+        session = requests.Session()
+        headers = {'Authorization': f'Bearer {token}'}
+        body = {'user_id': f'user-{n}', 'query': 'should I buy SOL', 'context': {}}
+        while time.time() < stop_at:
+            start = time.perf_counter()
+            try:
+                response = session.post(f"{base_url}/ai/trading-advice", json=body, headers=headers, timeout=60)
+                if response.status_code == 200:
+                    latencies.append((time.perf_counter() - start) * 1000)
+                else:
+                    errors.append(response.status_code)
+            except requests.RequestException as e:
+                errors.append(type(e).__name__)
+
+    gevent.joinall([gevent.spawn(client, n) for n in range(clients)])
+    return latencies, errors
+
+def bench_server(args, label, workdir, database_url):
+    port = free_port()
+    env = dict(os.environ, APP_ROLES='ai', LOG_FILE=os.path.join(workdir, f'{label}.log'),
+               LOG_LEVEL='WARNING', JWT_SECRET_KEY='bench-gevent-jwt-secret-32-bytes-long', RATELIMIT_ENABLED='false',
+               DATABASE_URL=database_url, WORKER_CONNECTIONS=str(args.clients * 2))
+    cmd = [sys.executable, '-m', 'gunicorn', '--workers', '1', '--bind', f'127.0.0.1:{port}', '--timeout', '120']
+    if label == 'gevent':
+        env['WORKER_CLASS'] = 'gevent'
+    else:
+        env.pop('WORKER_CLASS', None)
+        cmd += ['--worker-class', 'gthread', '--threads', str(args.threads)]
+    cmd.append('app:app')
+
+    log = open(os.path.join(workdir, f'{label}-server.log'), 'wb')
+    process = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        if not wait_until_ready(base_url, args.startup_timeout):
+            print(f"❌ {label} server did not become ready; see {workdir}/{label}-server.log")
+            sys.exit(1)
+        token = subprocess.check_output([sys.executable, '-c', (
+            "from utils import create_jwt_token; "
+            "print(create_jwt_token({'user_id': 'bench', 'email': 'bench@example.com', 'subscription_tier': 'professional'}))"
+        )], cwd=ROOT, env=env, text=True).strip()
+        run_clients(base_url, token, args.clients, 1.0)  # warm-up
+        latencies, errors = run_clients(base_url, token, args.clients, args.duration)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+        log.close()
+    return latencies, errors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200, help="concurrent clients against one worker")
+    parser.add_argument("--duration", type=float, default=8)
+    parser.add_argument("--threads", type=int, default=4, help="gthread threads in the baseline worker")
+    parser.add_argument("--queries", type=int, default=50, help="concurrent pg_sleep queries")
+    parser.add_argument("--sleep", type=float, default=0.2, help="seconds per pg_sleep")
+    parser.add_argument("--database-url", help="Postgres to use (default: throwaway pgserver)")
+    parser.add_argument("--startup-timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    if gevent is None:
+        sys.exit("❌ gevent is not installed (pip install -r requirements.txt)")
+
+    workdir = tempfile.mkdtemp(prefix='bench-gevent-')
+    server = None
+    database_url = args.database_url
+    if not database_url:
+        if pgserver is None:
+            sys.exit("❌ No Postgres available: pass --database-url or pip install pgserver")
+        server = pgserver.get_server(os.path.join(workdir, 'pgdata'), cleanup_mode='stop')
+        database_url = server.get_uri()
+
+    failed = False
+    try:
+        print(f"🧪 psycopg2: {args.queries} greenlets × SELECT pg_sleep({args.sleep})")
+        pg = bench_psycopg2(database_url, args.queries, args.sleep)
+        for label, seconds in pg.items():
+            print(f"   {label:<12}{seconds:>8.2f} s")
+        if pg['cooperative'] >= pg['blocking']:
+            print("❌ the wait callback did not let the queries overlap")
+            failed = True
+        else:
+            print(f"✅ {pg['blocking'] / pg['cooperative']:.1f}x faster with the wait callback")
+
+        print(f"\n🧪 gunicorn, 1 worker, {args.clients} clients, POST /ai/trading-advice for {args.duration:.0f}s")
+        print(f"{'worker':<16}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        throughput = {}
+        for label in ('gthread', 'gevent'):
+            latencies, errors = bench_server(args, label, workdir, database_url)
+            ordered = sorted(latencies) or [0]
+            throughput[label] = len(latencies) / args.duration
+            name = f"gthread ×{args.threads}" if label == 'gthread' else label
+            print(f"{name:<16}{throughput[label]:>10.1f}{statistics.median(ordered):>10.0f}"
+                  f"{ordered[int(len(ordered) * 0.99) - 1 if len(ordered) > 1 else 0]:>10.0f}{len(errors):>8}")
+            if errors:
+                print(f"   first errors: {errors[:5]}")
+                failed = True
+        if throughput['gevent'] <= throughput['gthread']:
+            print("❌ gevent did not serve more requests than gthread")
+            failed = True
+        else:
+            print(f"✅ gevent: {throughput['gevent'] / throughput['gthread']:.1f}x the throughput of "
+                  f"gthread ×{args.threads} on one worker")
+    finally:
+        if server is not None:
+            server.cleanup()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Job queue throughput across worker processes, and its delivery guarantees
+Fills the Postgres job queue (job_queue.py) with jobs that each take
+--work-ms, then drains it with 1, 2 and 4 worker processes of --threads
+threads each and reports jobs per second. Every run must finish each job
+exactly once. Then it checks the guarantees discovery_worker.py relies on:
+- priorities: a single thread claims higher-priority jobs first
+- dedupe: enqueueing the same key twice adds one job
+- retries: a job failing once is retried; one failing every time ends dead
+- leases: jobs held by a SIGKILLed worker are finished by another after the lease
+Needs Postgres (pgserver, or --database-url).
+
+Usage: python benchmarks/bench_job_queue.py [--jobs 2000] [--work-ms 5] [--threads 4]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('LOG_FILE', os.path.join(tempfile.gettempdir(), 'bench_job_queue.log'))
+
+try:
+    import pgserver  # Throwaway local Postgres when no --database-url is given
+except ImportError:
+    pgserver = None
+
+def reset(queue):
+    queue.ensure_schema()
+    queue.db.execute("TRUNCATE job_queue")
+
+def finished(queue):
+    return queue.db.execute(
+        "SELECT COUNT(*) FROM job_queue WHERE status NOT IN ('pending', 'running')", fetch=True)[0][0]
+
+def drain(threads, work_seconds, total, lease_seconds=30, fail_first=False, timeout=120):
+    """Run a JobWorker in this process until total jobs are finished"""
+    from job_queue import JobQueue, JobWorker
+
+    queue = JobQueue(lease_seconds=lease_seconds, max_attempts=3)
+
+    def work(job):
+        if job.payload.get('always_fail') or (fail_first and job.attempt == 1):
+            raise RuntimeError("simulated failure")
+        time.sleep(work_seconds)
+
+    worker = JobWorker(queue, {'bench': work}, threads=threads, poll_interval=0.05,
+                       retry_base_seconds=0.2, retry_max_seconds=0.2).start()
+    deadline = time.time() + timeout
+    while finished(queue) < total and time.time() < deadline:
+        time.sleep(0.05)
+    worker.stop()
+
+def run_processes(processes, threads, work_seconds, total):
+    ctx = multiprocessing.get_context('fork')
+    children = [ctx.Process(target=drain, args=(threads, work_seconds, total)) for _ in range(processes)]
+    start = time.perf_counter()
+    for child in children:
+        child.start()
+    for child in children:
+        child.join()
+    return time.perf_counter() - start
+
+def check(ok, message):
+    print(f"{'✅' if ok else '❌'} {message}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--work-ms", type=float, default=5, help="time each job takes (sleep)")
+    parser.add_argument("--threads", type=int, default=4, help="worker threads per process")
+    parser.add_argument("--processes", type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument("--database-url", help="Postgres to use (default: throwaway pgserver)")
+    args = parser.parse_args()
+
+    server = None
+    workdir = tempfile.mkdtemp(prefix='bench-job-queue-')
+    if not args.database_url:
+        if pgserver is None:
+            sys.exit("❌ No Postgres available: pass --database-url or pip install pgserver")
+        server = pgserver.get_server(os.path.join(workdir, 'pgdata'), cleanup_mode='stop')
+        args.database_url = server.get_uri()
+    os.environ['DATABASE_URL'] = args.database_url
+
+    from job_queue import JobQueue
+    # Simulated failures would log one line each
+    logging.getLogger('job_queue').setLevel(logging.CRITICAL)
+    queue = JobQueue(lease_seconds=30, max_attempts=3)
+    results = []
+    try:
+        print(f"🧪 {args.jobs} jobs × {args.work_ms:g} ms, {args.threads} threads per process")
+        print(f"{'processes':<12}{'seconds':>10}{'jobs/s':>10}")
+        for processes in args.processes:
+            reset(queue)
+            for n in range(args.jobs):
+                queue.enqueue('bench', {'n': n}, priority=n % 3)
+            seconds = run_processes(processes, args.threads, args.work_ms / 1000, args.jobs)
+            done, once = queue.db.execute(
+                "SELECT COUNT(*) FILTER (WHERE status = 'done'), COUNT(*) FILTER (WHERE attempts = 1) FROM job_queue",
+                fetch=True)[0]
+            print(f"{processes:<12}{seconds:>10.2f}{args.jobs / seconds:>10.0f}")
+            results.append(check(done == args.jobs and once == args.jobs,
+                                 f"{done}/{args.jobs} done, {once} claimed exactly once"))
+
+        print("\n🧪 Guarantees")
+        reset(queue)
+        for n in range(30):
+            queue.enqueue('bench', {'n': n}, priority=n % 3)
+        claimed = []
+        while True:
+            jobs = queue.claim('bench-order', kinds=['bench'])
+            if not jobs:
+                break
+            claimed.append(jobs[0].payload['n'] % 3)
+            queue.complete(jobs[0])
+        results.append(check(claimed == sorted(claimed, reverse=True), "higher priority claimed first"))
+
+        reset(queue)
+        added = [queue.enqueue('bench', {}, dedupe_key='discover:solana:1') for _ in range(2)]
+        results.append(check(added == [True, False], "duplicate dedupe_key dropped"))
+
+        reset(queue)
+        for n in range(20):
+            queue.enqueue('bench', {'n': n})
+        queue.enqueue('bench', {'always_fail': True})
+        drain(2, 0, 21, fail_first=True, timeout=30)
+        rows = dict(queue.db.execute(
+            "SELECT status, COUNT(*) FROM job_queue GROUP BY status", fetch=True))
+        results.append(check(rows == {'done': 20, 'dead': 1},
+                             f"failed once → retried and done; always failing → dead ({rows})"))
+
+        reset(queue)
+        for n in range(50):
+            queue.enqueue('bench', {'n': n})
+        ctx = multiprocessing.get_context('fork')
+        victim = ctx.Process(target=drain, args=(50, 60, 50), kwargs={'lease_seconds': 1})
+        victim.start()
+        while queue.db.execute("SELECT COUNT(*) FROM job_queue WHERE status = 'running'", fetch=True)[0][0] < 50:
+            time.sleep(0.05)
+        os.kill(victim.pid, signal.SIGKILL)
+        victim.join()
+        start = time.perf_counter()
+        drain(4, 0, 50, timeout=30)
+        recovered = queue.db.execute(
+            "SELECT COUNT(*) FROM job_queue WHERE status = 'done' AND attempts = 2", fetch=True)[0][0]
+        results.append(check(recovered == 50, f"{recovered}/50 jobs of a killed worker finished by another "
+                                              f"after the 1s lease ({time.perf_counter() - start:.1f}s)"))
+    finally:
+        if server is not None:
+            server.cleanup()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if not all(results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
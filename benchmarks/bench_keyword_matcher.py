@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Keyword matching cost on realistic Reddit posts
+Generates seeded posts of increasing length from a crypto vocabulary (with
+near-misses like "buyer" and "address"), then times the compiled
+KeywordMatcher against one substring test per keyword (the old, boundary-
+unaware approach) and one word-bounded regex search per keyword (the same
+semantics as the matcher). Matcher counts are checked against the per-
+keyword regexes. A second table forces each of the matcher's two paths, the
+find() loop and the compiled trie, as the keyword count and post length
+grow; SUBSTRING_LIMIT and SUBSTRING_MIN_CHARS in keyword_matcher.py come
+from where they cross.
+
+Usage: python benchmarks/bench_keyword_matcher.py [--lengths 300 1500 6000 20000] [--posts 200] [--extra-keywords 200]
+                                                  [--sizes 12 20 32 48] [--path-lengths 50 150 400 1500]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_matcher import SUBSTRING_LIMIT, SUBSTRING_MIN_CHARS, KeywordMatcher
+from reddit_discovery import QUALITY_KEYWORDS, SPAM_KEYWORDS
+
+VOCABULARY = (
+    "the a whale wallet moved funds into new address after my research on this token and its "
+    "liquidity pool i think buyer sellers are tracking alpha leak from dev team buy sell hold "
+    "profitable successful analysis chart volume market cap holders dd due diligence tx hash "
+    "pump dump moon lambo scam guaranteed free money get rich diamond hands paper hands ngmi wagmi"
+).split()
+
+def synthetic_posts(count, length, seed):
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(count):
+        words = []
+        size = 0
+        while size < length:
+            word = rng.choice(VOCABULARY)
+            words.append(word.upper() if rng.random() < 0.05 else word)
+            size += len(word) + 1
+        posts.append(" ".join(words)[:length])
+    return posts
+
+def substring_counts(categories, text):
+    text = text.lower()
+    return {name: sum(1 for keyword in keywords if keyword in text) for name, keywords in categories.items()}
+
+def regex_counter(categories):
+    compiled = {name: [re.compile(r"\b" + re.escape(keyword).replace(r"\ ", r"\s+") + r"\b") for keyword in keywords]
+                for name, keywords in categories.items()}
+    def counts(text):
+        text = text.lower()
+        return {name: sum(1 for pattern in patterns if pattern.search(text)) for name, patterns in compiled.items()}
+    return counts
+
+def per_post_us(posts, func, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for post in posts:
+            func(post)
+        best = min(best, time.perf_counter() - start)
+    return best / len(posts) * 1e6
+
+def run(label, categories, posts_by_length, rounds):
+    matcher = KeywordMatcher(categories)
+    per_keyword_regex = regex_counter(categories)
+    keyword_count = sum(len(keywords) for keywords in categories.values())
+    print(f"\n{label}: {keyword_count} keywords")
+    print(f"{'chars':>8}{'substring µs':>15}{'regex/kw µs':>14}{'matcher µs':>13}  check")
+    failed = False
+    for length, posts in posts_by_length.items():
+        substring_us = per_post_us(posts, lambda post: substring_counts(categories, post), rounds)
+        regex_us = per_post_us(posts, per_keyword_regex, rounds)
+        matcher_us = per_post_us(posts, lambda post: matcher.counts(post, distinct=True), rounds)
+        ok = all(matcher.counts(post, distinct=True) == per_keyword_regex(post) for post in posts)
+        failed = failed or not ok
+        print(f"{length:>8}{substring_us:>15.1f}{regex_us:>14.1f}{matcher_us:>13.1f}  {'ok' if ok else 'MISMATCH'}")
+    return failed
+
+def run_paths(keywords, sizes, posts_by_length, rounds):
+    print(f"\nfind() loop vs compiled trie (find path up to {SUBSTRING_LIMIT} keywords, "
+          f"from {SUBSTRING_MIN_CHARS} chars per keyword)")
+    print(f"{'keywords':>9}{'chars':>8}{'substring µs':>15}{'find µs':>10}{'trie µs':>10}{'matcher µs':>13}  check")
+    failed = False
+    for size in sizes:
+        categories = {"keywords": keywords[:size]}
+        matcher = KeywordMatcher(categories)
+        find = KeywordMatcher(categories, substring_limit=size, substring_min_chars=0)
+        trie = KeywordMatcher(categories, substring_limit=0)
+        if not find._substring:
+            print(f"{size:>9}  keywords can overlap, find() path not available")
+            continue
+        for length, posts in posts_by_length.items():
+            substring_us = per_post_us(posts, lambda post: substring_counts(categories, post), rounds)
+            find_us = per_post_us(posts, lambda post: find.counts(post, distinct=True), rounds)
+            trie_us = per_post_us(posts, lambda post: trie.counts(post, distinct=True), rounds)
+            matcher_us = per_post_us(posts, lambda post: matcher.counts(post, distinct=True), rounds)
+            ok = all(find.scan(post) == trie.scan(post) for post in posts)
+            failed = failed or not ok
+            print(f"{size:>9}{length:>8}{substring_us:>15.1f}{find_us:>10.1f}{trie_us:>10.1f}{matcher_us:>13.1f}"
+                  f"  {'ok' if ok else 'MISMATCH'}")
+    return failed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[300, 1500, 6000, 20000])
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--extra-keywords", type=int, default=200, help="ticker-style keywords for the scaling run")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[12, 20, 32, 48], help="keyword counts for the path comparison")
+    parser.add_argument("--path-lengths", type=int, nargs="+", default=[50, 150, 400, 1500], help="post lengths for the path comparison")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    posts_by_length = {length: synthetic_posts(args.posts, length, args.seed + length) for length in args.lengths}
+    print(f"🧪 Keyword matching: {args.posts} posts per length, seed {args.seed}")
+
+    substring_misses = sum(
+        substring_counts({"q": QUALITY_KEYWORDS}, post)["q"] > KeywordMatcher({"q": QUALITY_KEYWORDS}).counts(post, distinct=True)["q"]
+        for post in posts_by_length[args.lengths[0]]
+    )
+    print(f"   substring matching over-counts quality keywords in {substring_misses}/{args.posts} "
+          f"{args.lengths[0]}-char posts (\"dd\" in \"address\")")
+
+    categories = {"quality": QUALITY_KEYWORDS, "spam": SPAM_KEYWORDS}
+    failed = run("post quality", categories, posts_by_length, args.rounds)
+
+    rng = random.Random(args.seed)
+    tickers = sorted({"".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 6)))
+                      for _ in range(args.extra_keywords)})
+    failed = run("post quality + tickers", dict(categories, tickers=tickers), posts_by_length, args.rounds) or failed
+    path_posts = {length: synthetic_posts(args.posts, length, args.seed + length) for length in args.path_lengths}
+    failed = run_paths(QUALITY_KEYWORDS + SPAM_KEYWORDS + tickers, args.sizes, path_posts, args.rounds) or failed
+
+    if failed:
+        print("\n❌ Matcher counts differ between paths or from per-keyword word-bounded regexes")
+        sys.exit(1)
+    print("\n✅ Matcher counts match per-keyword word-bounded regexes on both paths")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Portfolio analytics cost at scale
+Builds a seeded asset universe with factor-driven daily prices, then times
+analyze_holdings for portfolios of increasing size, an incremental daily
+price update, and a covariance refresh. Every statistic is also recomputed
+from scratch with np.cov and checked against the incremental store.
+
+Usage: python benchmarks/bench_portfolio.py [--assets 6000] [--days 365] [--sizes 10 100 1000 5000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from portfolio_analytics import PriceHistoryStore, analyze_holdings
+
+def synthetic_prices(assets, days, seed):
+    """Daily prices from a 3-factor model so assets are realistically correlated"""
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 0.02, (days, 3))
+    loadings = rng.normal(0.8, 0.4, (assets, 3)) * [1.0, 0.5, 0.3]
+    returns = factors @ loadings.T + rng.normal(0, 0.03, (days, assets))
+    prices = 10 * np.exp(np.cumsum(returns, axis=0))
+    # A few assets list partway through the history
+    late = rng.choice(assets, assets // 50, replace=False)
+    prices[: days // 2, late] = np.nan
+    symbols = ["BTC"] + [f"TKN{i}" for i in range(1, assets)]
+    return symbols, prices
+
+def holdings_for(symbols, size, rng):
+    picks = rng.choice(len(symbols), size, replace=False)
+    values = rng.lognormal(8, 1.5, size)
+    return [{"symbol": symbols[i], "value": float(v)} for i, v in zip(picks, values)]
+
+def best_ms(rounds, func):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+def reference_volatility(store, holdings):
+    """Portfolio volatility straight from np.cov over the window"""
+    returns = store.window_returns()
+    values = {}
+    for holding in holdings:
+        values[holding["symbol"]] = values.get(holding["symbol"], 0.0) + holding["value"]
+    indices = np.array([store.index[symbol] for symbol in values])
+    weights = np.array(list(values.values()))
+    weights /= weights.sum()
+    covariance = np.atleast_2d(np.cov(returns[:, indices], rowvar=False))
+    return float(np.sqrt(weights @ covariance @ weights) * np.sqrt(store.periods_per_year))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--assets", type=int, default=6000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--window", type=int, default=90)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    symbols, prices = synthetic_prices(args.assets, args.days + 1, args.seed)
+    store = PriceHistoryStore(window=args.window)
+    start = time.perf_counter()
+    store.load(symbols, prices[:-1])
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"🧪 Portfolio analytics: {args.assets:,} assets, {args.days} days, {args.window}-day window")
+    print(f"   bulk load                 {load_ms:10.1f} ms")
+
+    # One more day arrives: incremental update, then the lazy covariance refresh
+    start = time.perf_counter()
+    store.append(dict(zip(symbols, prices[-1])))
+    append_ms = (time.perf_counter() - start) * 1000
+    covariance_ms = best_ms(1, store.covariance)
+    print(f"   append one day            {append_ms:10.1f} ms")
+    print(f"   covariance refresh        {covariance_ms:10.1f} ms")
+
+    rebuilt = PriceHistoryStore(window=args.window)
+    rebuilt.load(symbols, prices)
+    drift = float(np.max(np.abs(store.covariance() - rebuilt.covariance())))
+    print(f"   incremental vs rebuilt covariance: max |diff| {drift:.2e}")
+
+    rng = np.random.default_rng(args.seed)
+    failed = drift > 1e-12
+    print(f"\n{'positions':>10}{'ms':>10}  {'volatility':>10} {'reference':>10}  check")
+    for size in args.sizes:
+        holdings = holdings_for(symbols, min(size, len(symbols)), rng)
+        elapsed = best_ms(args.rounds, lambda: analyze_holdings(holdings, store))
+        analysis = analyze_holdings(holdings, store)
+        expected = reference_volatility(store, holdings)
+        ok = np.isclose(analysis["volatility"], expected, rtol=1e-3)
+        failed = failed or not ok
+        print(f"{size:>10}{elapsed:>10.2f}  {analysis['volatility']:>10.4f} {expected:>10.4f}  "
+              f"{'ok' if ok else 'MISMATCH'}")
+
+    if failed:
+        print("\n❌ Store statistics diverged from the reference computation")
+        sys.exit(1)
+    print("\n✅ Incremental covariance and portfolio risk match np.cov")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Per-worker memory of gunicorn with and without --preload
+Starts app:app under gunicorn twice, once importing the app in every worker
+and once preloading it in the master (see prefork.py). It waits until every
+worker reports ready, sends the same warm-up traffic to both and reads
+/proc/<pid>/smaps_rollup for the master and each worker. It reports:
+- RSS: what `ps` shows
+- USS: pages private to the worker, which is what each extra worker really costs
+- PSS: shared pages split between the processes that map them
+The run fails if preloading does not lower the mean USS per worker.
+Linux only.
+
+Usage: python benchmarks/bench_prefork.py [--workers 4] [--roles all] [--requests 400]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WARM_UP_PATHS = ('/', '/dashboard', '/api/config', '/api/plans', '/api/contact-info', '/ai/test', '/health/deep')
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def memory_kb(pid):
+    """Rss, Pss and Uss (private clean + dirty) of a process, in kB"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[0].endswith(':'):
+                fields[parts[0][:-1]] = int(parts[1])
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'uss': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    }
+
+def worker_pids(master_pid):
+    with open(f'/proc/{master_pid}/task/{master_pid}/children') as f:
+        return [int(pid) for pid in f.read().split()]
+
+def wait_until_ready(base_url, workers, timeout):
+    """Every worker is ready once a run of consecutive probes all come back 200"""
+    deadline = time.time() + timeout
+    streak = 0
+    while time.time() < deadline:
+        try:
+            streak = streak + 1 if requests.get(f"{base_url}/health/ready", timeout=2).status_code == 200 else 0
+        except requests.RequestException:
+            streak = 0
+        if streak >= workers * 10:
+            return True
+        time.sleep(0.02)
+    return False
+
+def measure(args, preload):
+    port = free_port()
+    workdir = tempfile.mkdtemp(prefix='bench-prefork-')
+    env = dict(os.environ, APP_ROLES=args.roles, LOG_FILE=os.path.join(workdir, 'app.log'),
+               REDIS_URL=f"sqlite:///{os.path.join(workdir, 'ratelimit.db')}", RATELIMIT_ENABLED='false')
+    cmd = [sys.executable, '-m', 'gunicorn', '--workers', str(args.workers), '--bind', f'127.0.0.1:{port}',
+           '--timeout', '120'] + (['--preload'] if preload else []) + ['app:app']
+    log = open(os.path.join(workdir, 'server.log'), 'wb')
+    process = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        if not wait_until_ready(base_url, args.workers, args.startup_timeout):
+            print(f"❌ gunicorn did not become ready; see {workdir}/server.log")
+            sys.exit(1)
+        session = requests.Session()
+        for i in range(args.requests):
+            session.get(base_url + WARM_UP_PATHS[i % len(WARM_UP_PATHS)], timeout=10)
+        time.sleep(1.0)
+        master = memory_kb(process.pid)
+        workers = [memory_kb(pid) for pid in worker_pids(process.pid)]
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+        log.close()
+    return master, workers
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--roles", default="all", help="APP_ROLES for the app under test")
+    parser.add_argument("--requests", type=int, default=400, help="warm-up requests spread over the workers")
+    parser.add_argument("--startup-timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    print(f"🧪 gunicorn app:app, {args.workers} workers, APP_ROLES={args.roles}")
+    print(f"{'mode':<12}{'worker RSS':>12}{'worker USS':>12}{'worker PSS':>12}{'master RSS':>12}{'total PSS':>12}   (MB)")
+    results = {}
+    for label, preload in (("fork", False), ("--preload", True)):
+        master, workers = measure(args, preload)
+        mean = {key: statistics.mean(w[key] for w in workers) / 1024 for key in ('rss', 'uss', 'pss')}
+        total_pss = (master['pss'] + sum(w['pss'] for w in workers)) / 1024
+        results[label] = (mean, total_pss)
+        print(f"{label:<12}{mean['rss']:>12.1f}{mean['uss']:>12.1f}{mean['pss']:>12.1f}"
+              f"{master['rss'] / 1024:>12.1f}{total_pss:>12.1f}")
+
+    fork_uss, preload_uss = results["fork"][0]['uss'], results["--preload"][0]['uss']
+    saved = fork_uss - preload_uss
+    if saved <= 0:
+        print(f"\n❌ --preload did not lower private memory per worker ({fork_uss:.1f} → {preload_uss:.1f} MB)")
+        sys.exit(1)
+    print(f"\n✅ --preload: {saved:.1f} MB less private memory per worker "
+          f"({fork_uss:.1f} → {preload_uss:.1f} MB, -{saved / fork_uss:.0%}); "
+          f"total PSS {results['fork'][1]:.0f} → {results['--preload'][1]:.0f} MB")
+
+if __name__ == "__main__":
+    main()
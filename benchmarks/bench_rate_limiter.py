@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Rate limiter hot-path cost and cross-worker accuracy
+Times the before_request check of TwoTierLimiter inside real request contexts
+for JWT-authenticated and anonymous clients, a client's first request (which
+leases tokens from the SQLite store inline) and Flask-Limiter's check on the
+same route when it is installed. Then forks worker processes that hammer
+one client's "N per minute" limit through a shared store and counts how many
+requests were admitted in total: with the shared store the total should sit
+at or just under the limit, with memory:// it multiplies by the number of workers.
+
+Usage: python benchmarks/bench_rate_limiter.py [--requests 20000] [--users 500] [--workers 4] [--limit 300]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('LOG_FILE', os.path.join(tempfile.gettempdir(), 'bench_rate_limiter.log'))
+
+from flask import Flask
+
+from rate_limiter import TwoTierLimiter
+from utils import create_jwt_token, verify_jwt_token
+
+try:
+    from flask_limiter import Limiter
+    from flask_limiter.util import get_remote_address
+except ImportError:
+    Limiter = None
+
+def make_app(limiter_factory):
+    app = Flask(__name__)
+    limiter = limiter_factory(app)
+
+    @app.route('/api/whales')
+    @limiter.limit("1000000 per minute")
+    def whales():
+        return "ok"
+
+    return app, limiter
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {p: samples[min(len(samples) - 1, int(len(samples) * p / 100))] / 1000 for p in (50, 99, 99.9)}
+
+def time_checks(app, check, headers_cycle, count):
+    """Microsecond percentiles of check() in a pushed request context"""
+    samples = []
+    for i in range(count):
+        headers, addr = headers_cycle[i % len(headers_cycle)]
+        with app.test_request_context('/api/whales', headers=headers, environ_base={'REMOTE_ADDR': addr}):
+            start = time.perf_counter_ns()
+            check()
+            samples.append(time.perf_counter_ns() - start)
+    return percentiles(samples)
+
+def hot_path(args):
+    tokens = []
+    for i in range(args.users):
+        token = create_jwt_token({'user_id': f'user{i}', 'email': f'user{i}@example.com', 'tier': 'pro'})
+        verify_jwt_token(token)  # steady state: the token cache is warm
+        tokens.append(({'Authorization': f'Bearer {token}'}, '10.0.0.1'))
+    anonymous = [({}, f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}') for i in range(args.users)]
+
+    print(f"\n⏱️  Hot path: {args.requests} checks over {args.users} clients (µs)")
+    print(f"{'limiter':<28}{'clients':<12}{'p50':>8}{'p99':>8}{'p99.9':>9}")
+    worst_p99 = 0.0
+    app, limiter = make_app(lambda app: TwoTierLimiter(app=app, storage_uri='memory://'))
+    for label, cycle in (("jwt", tokens), ("anonymous", anonymous)):
+        time_checks(app, limiter.check, cycle, min(2000, args.requests))
+        result = time_checks(app, limiter.check, cycle, args.requests)
+        worst_p99 = max(worst_p99, result[99])
+        print(f"{'TwoTierLimiter':<28}{label:<12}{result[50]:>8.1f}{result[99]:>8.1f}{result[99.9]:>9.1f}")
+
+    # Slow path: a client's first request in a window leases tokens from the shared store inline
+    db_path = os.path.join(tempfile.mkdtemp(prefix='bench-ratelimit-'), 'limits.db')
+    app, limiter = make_app(lambda app: TwoTierLimiter(app=app, storage_uri=f'sqlite:///{db_path}'))
+    fresh = [({}, f'172.16.{i // 256 % 256}.{i % 256}') for i in range(min(2000, args.requests))]
+    result = time_checks(app, limiter.check, fresh, len(fresh))
+    print(f"{'TwoTierLimiter (lease)':<28}{'first hit':<12}{result[50]:>8.1f}{result[99]:>8.1f}{result[99.9]:>9.1f}")
+
+    if Limiter is not None:
+        app, limiter = make_app(lambda app: Limiter(get_remote_address, app=app, storage_uri='memory://'))
+        check = app.before_request_funcs[None][0]
+        time_checks(app, check, anonymous, min(2000, args.requests))
+        result = time_checks(app, check, anonymous, args.requests)
+        print(f"{'Flask-Limiter (memory://)':<28}{'anonymous':<12}{result[50]:>8.1f}{result[99]:>8.1f}{result[99.9]:>9.1f}")
+    return worst_p99
+
+def hammer(storage_uri, limit, sync_interval, duration, start_at, results):
+    limiter = TwoTierLimiter(storage_uri=storage_uri, sync_interval=sync_interval)
+    limiter._start()
+    limits = ((limit, 60, f"{limit} per minute"),)
+    while time.time() < start_at:
+        time.sleep(0.01)
+    admitted = 0
+    end = start_at + duration
+    while time.time() < end:
+        if limiter.hit('whales', limits, 'user:bench', time.time()) is None:
+            admitted += 1
+        time.sleep(0.001)
+    results.put(admitted)
+
+def accuracy(storage_uri, args):
+    # Keep the run inside one fixed window
+    now = time.time()
+    if now % 60 > 60 - args.duration - 3:
+        time.sleep(60 - now % 60 + 0.5)
+    results = multiprocessing.Queue()
+    start_at = time.time() + 1.0
+    procs = [multiprocessing.Process(target=hammer, args=(storage_uri, args.limit, args.sync_interval,
+                                                          args.duration, start_at, results))
+             for _ in range(args.workers)]
+    for proc in procs:
+        proc.start()
+    admitted = [results.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+    return sum(admitted), admitted
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=300, help="per-minute limit shared by all workers")
+    parser.add_argument("--duration", type=float, default=8.0, help="seconds each worker hammers the limit")
+    parser.add_argument("--sync-interval", type=float, default=0.5)
+    parser.add_argument("--max-p99-us", type=float, default=50.0)
+    args = parser.parse_args()
+
+    print("🧪 Rate limiter benchmark")
+    worst_p99 = hot_path(args)
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='bench-ratelimit-'), 'limits.db')
+    print(f"\n🎯 Accuracy: {args.workers} workers, one client, limit {args.limit}/minute, {args.duration:.0f}s")
+    failed = worst_p99 > args.max_p99_us
+    for label, uri in (("memory://", "memory://"), ("sqlite (shared)", f"sqlite:///{db_path}")):
+        total, per_worker = accuracy(uri, args)
+        overshoot = total - args.limit
+        print(f"   {label:<18} admitted {total:>5} ({'+' if overshoot >= 0 else ''}{overshoot} vs limit) per worker {per_worker}")
+        if uri.startswith('sqlite') and not (args.limit * 0.9 <= total <= args.limit):
+            failed = True
+
+    if failed:
+        print(f"\n❌ p99 {worst_p99:.1f}µs (budget {args.max_p99_us:.0f}µs) or shared limit not enforced")
+        sys.exit(1)
+    print(f"\n✅ p99 {worst_p99:.1f}µs within {args.max_p99_us:.0f}µs; shared store holds the limit across workers")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Serialization & Compression Benchmark
+Compares bytes on the wire and CPU per response for a 1,000-whale
+/api/whales/top payload across JSON serializers and content-codings.
+
+Usage: python benchmarks/bench_serialization.py [--whales 1000] [--repeat 200]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+
+import utils
+from utils import api_success, JSON_SERIALIZERS, set_json_serializer, brotli, config
+
+def build_whales(count, seed=42):
+    """Build a whale list shaped like the live /api/whales/top data"""
+    rng = random.Random(seed)
+    alphabet = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+    subreddits = ['solana', 'CryptoMoonShots', 'defi', 'cryptocurrency', 'ethtrader']
+    now = datetime(2025, 8, 20, 12, 0, 0)
+    whales = []
+    for i in range(count):
+        network = rng.choice(['solana', 'ethereum'])
+        if network == 'ethereum':
+            address = '0x' + ''.join(rng.choice('0123456789abcdef') for _ in range(40))
+        else:
+            address = ''.join(rng.choice(alphabet) for _ in range(44))
+        whales.append({
+            'address': address,
+            'balance': Decimal(rng.randint(50000, 5000000)) / 100,
+            'network': network,
+            'source': f'r/{rng.choice(subreddits)}',
+            'quality_score': rng.randint(30, 100),
+            'first_seen': now - timedelta(minutes=rng.randint(0, 60 * 24 * 7)),
+            'post_url': f'https://reddit.com/r/{rng.choice(subreddits)}/comments/{i:x}',
+            'post_title': 'Tracking this wallet after a huge accumulation run ' * 2
+        })
+    return {
+        'whales': whales,
+        'total_count': len(whales),
+        'data_source': 'Live_Reddit_Etherscan',
+        'last_update': now,
+        'live_data': True
+    }
+
+def per_call_us(func, repeat):
+    return min(timeit.repeat(func, number=repeat, repeat=5)) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--whales', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    
+    payload = build_whales(args.whales)
+    app = Flask(__name__)
+    
+    print(f"📦 Payload: {args.whales} whales")
+    print(f"\n{'serializer':<22}{'bytes':>10}{'µs/response':>14}")
+    
+    with app.test_request_context('/api/whales/top'):
+        # Baseline: Flask jsonify (needs Decimal/datetime pre-converted)
+        plain = json.loads(utils._dumps_stdlib(payload))
+        body = jsonify({"success": True, "data": plain}).get_data()
+        cost = per_call_us(lambda: jsonify({"success": True, "data": plain}).get_data(), args.repeat)
+        print(f"{'flask jsonify':<22}{len(body):>10}{cost:>14.1f}")
+        
+        for name in sorted(JSON_SERIALIZERS):
+            set_json_serializer(name)
+            body = api_success(payload).get_data()
+            cost = per_call_us(lambda: api_success(payload).get_data(), args.repeat)
+            print(f"{'api_success/' + name:<22}{len(body):>10}{cost:>14.1f}")
+        set_json_serializer(config.JSON_SERIALIZER)
+        body = api_success(payload).get_data()
+    
+    print(f"\n{'encoding':<22}{'bytes':>10}{'ratio':>8}{'µs/response':>14}")
+    print(f"{'identity':<22}{len(body):>10}{1.0:>8.2f}{0.0:>14.1f}")
+    codecs = [('gzip', lambda: gzip.compress(body, compresslevel=config.GZIP_LEVEL))]
+    if brotli is not None:
+        codecs.append(('br', lambda: brotli.compress(body, quality=config.BROTLI_QUALITY)))
+    else:
+        print("⚠️  brotli not installed - skipping br")
+    for name, compress in codecs:
+        size = len(compress())
+        cost = per_call_us(compress, max(1, args.repeat // 10))
+        print(f"{name:<22}{size:>10}{len(body) / size:>8.2f}{cost:>14.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Cold start of combined_app in fresh interpreters
+Each run starts a new Python process, imports combined_app, starts the
+background warm-up and polls /health/ready through the test client. It reports
+when the app could serve (/health), when it became ready, and which heavy
+modules were imported at boot. The median of all runs is printed, along with
+the slowest imports and init stages from the last run's startup report.
+
+Usage: python benchmarks/bench_startup.py [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import combined_app
+serving = time.perf_counter() - start
+client = combined_app.app.test_client()
+assert client.get('/health').status_code == 200
+deadline = time.time() + 30
+while client.get('/health/ready').status_code != 200 and time.time() < deadline:
+    time.sleep(0.005)
+ready = time.perf_counter() - start
+heavy = [m for m in ('stripe', 'coinbase_commerce', 'numpy', 'trading_ai') if m in sys.modules]
+print(json.dumps({"serving": serving, "ready": ready, "report": combined_app.startup_report.as_dict(top_imports=8),
+                  "heavy_at_ready": heavy}))
+"""
+
+def run_once():
+    env = dict(os.environ, LOG_FILE=os.path.join(tempfile.gettempdir(), 'bench_startup.log'))
+    result = subprocess.run([sys.executable, '-c', CHILD, ROOT], capture_output=True, text=True, env=env, timeout=120)
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        sys.exit("❌ Startup run failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"🧪 Cold start: {args.runs} fresh interpreters")
+    runs = [run_once() for _ in range(args.runs)]
+    serving = statistics.median(run["serving"] for run in runs) * 1000
+    ready = statistics.median(run["ready"] for run in runs) * 1000
+    print(f"   import → serving /health   {serving:7.0f} ms (median)")
+    print(f"   import → /health/ready 200 {ready:7.0f} ms (median)")
+
+    report = runs[-1]["report"]
+    print("\n   Slowest imports at boot (inclusive):")
+    for entry in report["imports"]:
+        print(f"      {entry['module']:<22} {entry['seconds'] * 1000:7.1f} ms  (from {entry['imported_by']})")
+    print("\n   Init stages:")
+    for name, stage in report["stages"].items():
+        print(f"      {name:<22} {stage.get('seconds', 0) * 1000:7.1f} ms  {stage['status']}")
+        for sub, seconds in stage.get("stage_seconds", {}).items():
+            print(f"         {sub:<19} {seconds * 1000:7.1f} ms")
+    print("\n   Deferred imports:")
+    for module, info in report["lazy_imports"].items():
+        print(f"      {module:<22} {info['seconds'] * 1000:7.1f} ms")
+    print(f"\n✅ Loaded by the time the app was ready: {', '.join(runs[-1]['heavy_at_ready']) or 'none'}")
+
+if __name__ == "__main__":
+    main()
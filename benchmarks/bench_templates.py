@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Template Rendering Benchmark
+Per-request render cost of the /success and /dashboard pages:
+inline render_template_string (parsed and compiled on every call) vs
+cached file templates vs the pre-rendered static dashboard.
+
+Usage: python benchmarks/bench_templates.py [--repeat 2000]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flask import Flask, render_template, render_template_string
+
+from utils import configure_template_cache, prerender_page
+
+def read_template(name):
+    with open(os.path.join(ROOT, 'templates', name), encoding='utf-8') as f:
+        return f.read()
+
+def per_call_us(func, repeat):
+    return min(timeit.repeat(func, number=repeat, repeat=5)) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+    
+    app = Flask(__name__, template_folder=os.path.join(ROOT, 'templates'))
+    configure_template_cache(app)
+    dashboard_page = prerender_page(app, 'dashboard_placeholder.html')
+    
+    success_source = read_template('success.html')
+    dashboard_source = read_template('dashboard_placeholder.html')
+    context = {'title': 'Thank You!', 'message': 'Your contribution helps save our family home.'}
+    
+    cases = [
+        ('success: render_template_string', lambda: render_template_string(success_source, **context)),
+        ('success: render_template', lambda: render_template('success.html', **context)),
+        ('dashboard: render_template_string', lambda: render_template_string(dashboard_source)),
+        ('dashboard: render_template', lambda: render_template('dashboard_placeholder.html')),
+        ('dashboard: pre-rendered', lambda: dashboard_page().get_data()),
+    ]
+    
+    print(f"{'case':<38}{'µs/request':>12}")
+    with app.test_request_context('/dashboard'):
+        for name, func in cases:
+            func()  # warm caches
+            print(f"{name:<38}{per_call_us(func, args.repeat):>12.1f}")
+
+if __name__ == '__main__':
+    main()
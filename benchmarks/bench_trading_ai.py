@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+TradingAI Micro-benchmarks
+Measures per-call CPU cost of each TradingAI scoring/text stage and of the
+full get_user_recommendation path, with the simulated asyncio sleeps stubbed
+out and every random draw seeded. Results are compared against a stored
+baseline so per-recommendation regressions show up as numbers.
+
+Timings differ more between processes than between rounds of one process,
+so the suite runs --runs times, each in a fresh interpreter. A run counts
+its best round (interference only ever adds time); a case is the median of
+those across runs, with their spread (scaled median absolute deviation) as
+its noise. The baseline is recorded the same way. A case
+regresses only when its median grows by more than all of: --threshold of
+the baseline, --noise-k times the combined spread of baseline and this run,
+and --min-delta-us.
+
+Usage: python benchmarks/bench_trading_ai.py [--runs 3] [--rounds 7] [--min-time 0.2] [--only confidence]
+           [--baseline benchmarks/baselines/trading_ai.json] [--save-baseline]
+           [--threshold 0.15] [--noise-k 3] [--min-delta-us 0.05] [--fail-on-regression]
+"""
+
+import argparse
+import asyncio
+import gc
+import hashlib
+import json
+import logging
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import structlog
+
+# Keep recommendation logging out of the measurements
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+import trading_ai
+from trading_ai import TradingAI
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, 'baselines', 'trading_ai.json')
+
+QUERIES = [
+    "should I buy SOL after this whale accumulation",
+    "is ETH bearish this week, sell or hold",
+    "whale inflow on BONK, pump or dump",
+    "general trading analysis",
+]
+
+async def no_sleep(delay, result=None):
+    return result
+
+def build_inputs(seed, count=256):
+    """Seeded market/sentiment/risk analyses shaped like the real stage outputs"""
+    rng = random.Random(seed)
+    ai = TradingAI()
+    inputs = []
+    for _ in range(count):
+        indicators = {
+            "trend": rng.choice(["bullish", "bearish", "sideways"]),
+            "volatility": rng.uniform(0.1, 0.8),
+            "volume": rng.uniform(0.3, 1.0),
+            "momentum": rng.uniform(-0.5, 0.5)
+        }
+        market_score = ai._calculate_market_score(indicators)
+        sentiment_score = rng.uniform(0.1, 0.9)
+        risk_score = rng.uniform(0.2, 0.8)
+        inputs.append({
+            "indicators": indicators,
+            "market": {"score": market_score, "outlook": rng.choice(["Positive", "Neutral", "Cautious"]),
+                       "indicators": indicators},
+            "sentiment": {"score": sentiment_score, "confidence": rng.uniform(0.7, 0.9),
+                          "sentiment": rng.choice(["positive", "negative", "neutral"])},
+            "risk": {"score": risk_score, "level": ai._categorize_risk_level(risk_score)},
+            "action": rng.choice(["strong_buy", "buy", "hold", "monitor", "sell"]),
+            "query": rng.choice(QUERIES)
+        })
+    return inputs
+
+def bench_cases(ai, inputs):
+    """(name, kind, call) where call(item) runs the stage on one seeded input"""
+    return [
+        ("_calculate_market_score", "sync", lambda x: ai._calculate_market_score(x["indicators"])),
+        ("_identify_key_market_factors", "sync", lambda x: ai._identify_key_market_factors(x["indicators"])),
+        ("_categorize_risk_level", "sync", lambda x: ai._categorize_risk_level(x["risk"]["score"])),
+        ("_suggest_risk_mitigation", "sync", lambda x: ai._suggest_risk_mitigation(x["risk"]["score"])),
+        ("_calculate_confidence", "sync", lambda x: ai._calculate_confidence(x["market"], x["sentiment"], x["risk"])),
+        ("_generate_recommendation_text", "sync", lambda x: ai._generate_recommendation_text(
+            x["action"], x["query"], x["market"], x["sentiment"], x["risk"])),
+        ("_generate_reasoning", "sync", lambda x: ai._generate_reasoning(
+            x["market"], x["sentiment"], x["risk"], x["action"])),
+        ("_analyze_market_conditions", "async", lambda x: ai._analyze_market_conditions({})),
+        ("_analyze_sentiment", "async", lambda x: ai._analyze_sentiment(x["query"], {})),
+        ("_assess_risk_factors", "async", lambda x: ai._assess_risk_factors({})),
+        ("_generate_recommendation", "async", lambda x: ai._generate_recommendation(
+            x["query"], x["market"], x["sentiment"], x["risk"], "bench-user")),
+        ("get_user_recommendation", "async", lambda x: ai.get_user_recommendation("bench-user", x["query"], {})),
+    ]
+
+def stable(result):
+    """Drop wall-clock fields so seeded outputs hash identically between runs"""
+    if isinstance(result, dict):
+        return {k: stable(v) for k, v in result.items()
+                if k not in ("analysis_timestamp", "processing_time_ms", "stage_timings_ms")}
+    if isinstance(result, list):
+        return [stable(v) for v in result]
+    return result
+
+def run_case(kind, call, inputs, repeat, seed, loop):
+    """Run repeat calls cycling through inputs with GC paused (as timeit does); return seconds"""
+    random.seed(seed)
+    count = len(inputs)
+    
+    async def batch():
+        for i in range(repeat):
+            await call(inputs[i % count])
+    
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        if kind == "sync":
+            for i in range(repeat):
+                call(inputs[i % count])
+        else:
+            loop.run_until_complete(batch())
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+def autorange(kind, call, inputs, args, loop):
+    """Calls per round: at least --repeat, grown until a round takes --min-time"""
+    repeat = args.repeat
+    while run_case(kind, call, inputs, repeat, args.seed, loop) < args.min_time:
+        repeat *= 2
+    return repeat
+
+def output_digest(kind, call, inputs, seed, loop):
+    """Hash the seeded outputs for every input (untimed) to catch behaviour changes"""
+    random.seed(seed)
+    digest = hashlib.sha256()
+    for item in inputs:
+        result = call(item) if kind == "sync" else loop.run_until_complete(call(item))
+        digest.update(json.dumps(stable(result), sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:16]
+
+def run_suite(args):
+    ai = TradingAI()
+    ai.initialized = True
+    inputs = build_inputs(args.seed)
+    loop = asyncio.new_event_loop()
+    results = {}
+    with mock.patch.object(trading_ai.asyncio, "sleep", no_sleep):
+        for name, kind, call in bench_cases(ai, inputs):
+            if args.only and not any(pattern in name for pattern in args.only):
+                continue
+            repeat = autorange(kind, call, inputs, args, loop)
+            timings = [run_case(kind, call, inputs, repeat, args.seed, loop) / repeat * 1e6
+                       for _ in range(args.rounds)]
+            results[name] = {
+                "timings_us": timings,
+                "calls": repeat,
+                "output_digest": output_digest(kind, call, inputs, args.seed, loop)
+            }
+    loop.close()
+    return results
+
+def spread(values):
+    """Scaled median absolute deviation: a standard deviation that ignores outliers"""
+    center = statistics.median(values)
+    return 1.4826 * statistics.median(abs(value - center) for value in values)
+
+def run_processes(args):
+    """Run the suite --runs times, each in a fresh interpreter; return the raw results per run"""
+    command = [sys.executable, os.path.abspath(__file__), "--worker",
+               "--repeat", str(args.repeat), "--min-time", str(args.min_time),
+               "--rounds", str(args.rounds), "--seed", str(args.seed)]
+    if args.only:
+        command += ["--only", *args.only]
+    runs = []
+    for n in range(args.runs):
+        print(f"⏱️  run {n + 1}/{args.runs}", flush=True)
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output))
+    return runs
+
+def summarize(runs):
+    """Per case: median across runs of each run's best round, its spread, and the overall best"""
+    results = {}
+    for name in runs[0]:
+        samples = [run[name] for run in runs]
+        run_best = [min(sample["timings_us"]) for sample in samples]
+        within = statistics.median(spread(sample["timings_us"]) for sample in samples)
+        across = spread(run_best) if len(run_best) > 2 else 0.0
+        digests = {sample["output_digest"] for sample in samples}
+        results[name] = {
+            "median_us": round(statistics.median(run_best), 3),
+            "spread_us": round(max(within, across), 3),
+            "us_per_call": round(min(run_best), 3),
+            "calls": samples[0]["calls"],
+            "output_digest": digests.pop() if len(digests) == 1 else "NONDETERMINISTIC"
+        }
+    return results
+
+def compare(results, baseline, args):
+    """Print per-case change vs baseline; return the cases that regressed beyond the noise"""
+    regressions = []
+    meta = baseline["meta"]
+    print(f"\n📊 vs baseline {meta['commit']} ({meta['timestamp'][:10]}, {meta.get('runs', 1)} runs)")
+    if (meta.get("python"), meta.get("machine")) != (platform.python_version(), platform.machine()):
+        print(f"⚠️  Baseline was recorded on Python {meta.get('python')}/{meta.get('machine')} - "
+              f"re-run with --save-baseline on this machine for meaningful numbers")
+    print(f"{'case':<32}{'baseline µs':>13}{'now µs':>10}{'change':>10}{'allowed':>10}  output")
+    for name, stats in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<32}{'-':>13}{stats['median_us']:>10.2f}{'new':>10}")
+            continue
+        delta = stats["median_us"] - base["median_us"]
+        noise = math.hypot(base.get("spread_us", 0.0), stats["spread_us"])
+        allowed = max(args.threshold * base["median_us"], args.noise_k * noise, args.min_delta_us)
+        same_output = "same" if stats["output_digest"] == base["output_digest"] else "CHANGED"
+        flag = " ⚠️" if delta > allowed else ""
+        print(f"{name:<32}{base['median_us']:>13.2f}{stats['median_us']:>10.2f}"
+              f"{delta / base['median_us'] * 100:>+9.1f}%{allowed / base['median_us'] * 100:>+9.1f}%"
+              f"  {same_output}{flag}")
+        if delta > allowed:
+            regressions.append(name)
+    return regressions
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=500, help="minimum calls per round")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per round")
+    parser.add_argument("--rounds", type=int, default=7, help="timed rounds per run")
+    parser.add_argument("--runs", type=int, help="fresh-process runs (default 3, or 7 with --save-baseline)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--only", nargs="*", help="run only cases whose name contains one of these")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative slowdown")
+    parser.add_argument("--noise-k", type=float, default=3.0,
+                        help="allowed slowdown in units of the combined baseline/current spread")
+    parser.add_argument("--min-delta-us", type=float, default=0.05, help="allowed absolute slowdown")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # One run for the parent process to aggregate
+        print(json.dumps(run_suite(args)))
+        return
+    if args.runs is None:
+        args.runs = 7 if args.save_baseline else 3
+
+    results = summarize(run_processes(args))
+
+    print(f"🧪 TradingAI micro-benchmarks (seed {args.seed}, {args.runs} runs × {args.rounds} rounds)")
+    print(f"\n{'case':<32}{'median µs':>10}{'spread':>10}{'best':>10}{'calls':>8}")
+    for name, stats in results.items():
+        print(f"{name:<32}{stats['median_us']:>10.2f}{stats['spread_us']:>10.3f}"
+              f"{stats['us_per_call']:>10.2f}{stats['calls']:>8}")
+
+    report = {
+        "meta": {
+            "commit": git_revision(),
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "min_time": args.min_time,
+            "rounds": args.rounds,
+            "runs": args.runs
+        },
+        "results": results
+    }
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\n⚠️  No baseline at {args.baseline} - run with --save-baseline to create one")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args)
+    if regressions:
+        print(f"\n❌ {len(regressions)} case(s) slower than baseline beyond the allowed change: "
+              f"{', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+    else:
+        print("\n✅ No regressions")
+
+if __name__ == "__main__":
+    main()
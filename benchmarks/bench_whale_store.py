@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Columnar WhaleStore vs a list of whale dicts at a million whales
+Builds N seeded whales in the shape /api/whales/top serves, holds them
+once as API dicts (what LiveDataManager used to cache) and once as a
+WhaleStore, and reports the memory of each (tracemalloc) and the time of
+the queries the endpoint runs: top 20 by quality and by balance, a network
+filter, and minimum balance/quality filters. Every page must match the
+list-of-dicts result exactly; the run fails unless the store is smaller
+and every query faster.
+
+Usage: python benchmarks/bench_whale_store.py [--whales 1000000] [--seed 1234] [--rounds 5]
+"""
+
+import argparse
+import gc
+import os
+import random
+import string
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from whale_store import SORT_KEYS, WhaleStore
+
+NETWORKS = ['solana', 'ethereum']
+SUBREDDITS = ['r/solana', 'r/CryptoCurrency', 'r/defi', 'r/SolanaNFTs', 'r/JupiterExchange',
+              'r/raydium', 'r/ethtrader', 'r/pancakeswap']
+BASE58 = ''.join(c for c in string.ascii_letters + string.digits if c not in '0OIl')
+
+def build_whales(count, seed):
+    """Seeded whales as API dicts, as LiveDataManager built them from discovered_whales rows"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    whales = []
+    for n in range(count):
+        network = rng.choice(NETWORKS)
+        if network == 'ethereum':
+            address = '0x' + ''.join(rng.choices('0123456789abcdef', k=40))
+        else:
+            address = ''.join(rng.choices(BASE58, k=44))
+        post_id = ''.join(rng.choices(string.ascii_lowercase + string.digits, k=7))
+        source = rng.choice(SUBREDDITS)
+        whales.append({
+            'address': address,
+            # Rounded like the USD balances validate() stores, so ties happen
+            'balance': round(rng.lognormvariate(11.5, 1.2), 2),
+            'network': network,
+            'source': source,
+            'quality_score': rng.randint(30, 100),
+            'first_seen': (start + timedelta(seconds=rng.randrange(365 * 86400))).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'post_url': f'https://reddit.com/{source}/comments/{post_id}',
+            'post_title': f'Whale wallet #{n} moving size'
+        })
+    return whales
+
+def matches(whale, network=None, min_balance=None, min_quality=None):
+    return ((network is None or whale['network'] == network) and
+            (min_balance is None or whale['balance'] >= min_balance) and
+            (min_quality is None or whale['quality_score'] >= min_quality))
+
+def dict_page(whales, limit, sort='quality', **filters):
+    """The endpoint's query over a list of dicts: filter, then sort by both keys descending"""
+    primary, secondary = SORT_KEYS[sort]
+    if sort == 'first_seen':
+        primary_value = lambda whale: datetime.fromisoformat(whale['first_seen'].replace('Z', '+00:00'))
+    else:
+        primary_value = lambda whale: whale[primary]
+    matching = [(n, whale) for n, whale in enumerate(whales) if matches(whale, **filters)]
+    matching.sort(key=lambda item: (primary_value(item[1]), item[1][secondary], -item[0]), reverse=True)
+    return [whale for _, whale in matching[:limit]]
+
+def measure(build):
+    """Objects kept alive by build(), in bytes, and the time to build them"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size, seconds
+
+def best_of(rounds, fn):
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+def check(ok, message):
+    print(f"{'✅' if ok else '❌'} {message}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--whales", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"🧪 {args.whales:,} whales")
+    whales, dict_bytes, dict_seconds = measure(lambda: build_whales(args.whales, args.seed))
+    store, store_bytes, store_seconds = measure(lambda: WhaleStore.from_dicts(whales))
+    print(f"{'':<14}{'MB':>10}{'B/whale':>10}{'build s':>10}")
+    print(f"{'dicts':<14}{dict_bytes / 1e6:>10.1f}{dict_bytes / args.whales:>10.0f}{dict_seconds:>10.2f}")
+    print(f"{'WhaleStore':<14}{store_bytes / 1e6:>10.1f}{store_bytes / args.whales:>10.0f}{store_seconds:>10.2f}")
+    results = [check(store_bytes < dict_bytes,
+                     f"store is {dict_bytes / store_bytes:.1f}x smaller ({store.nbytes / 1e6:.1f} MB of columns)")]
+
+    queries = [
+        ("top 20 quality", dict(sort='quality')),
+        ("top 20 balance", dict(sort='balance')),
+        ("top 20 newest", dict(sort='first_seen')),
+        ("solana top 20", dict(network='solana')),
+        ("quality >= 95", dict(min_quality=95, sort='balance')),
+        ("balance >= 1M", dict(min_balance=1000000, network='ethereum')),
+    ]
+    print(f"\n{'query':<18}{'dicts ms':>10}{'store ms':>10}{'speedup':>10}")
+    for name, query in queries:
+        expected, dict_time = best_of(args.rounds, lambda: dict_page(whales, 20, **query))
+        page, store_time = best_of(args.rounds, lambda: store.page(20, **query))
+        print(f"{name:<18}{dict_time * 1000:>10.1f}{store_time * 1000:>10.2f}{dict_time / store_time:>9.0f}x")
+        results.append(check(page == expected and store_time < dict_time, f"{name}: same page, faster"))
+
+    offset_page = store.page(20, offset=40, sort='balance')
+    results.append(check(offset_page == dict_page(whales, 60, sort='balance')[40:], "offset pages match"))
+    count, count_time = best_of(args.rounds, lambda: store.count(network='solana', min_quality=80))
+    results.append(check(count == sum(matches(w, network='solana', min_quality=80) for w in whales),
+                         f"count of {count:,} matching whales in {count_time * 1000:.2f} ms"))
+
+    if not all(results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
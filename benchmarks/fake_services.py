@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the external APIs the app talks to
+Serves Stripe, Coinbase Commerce, Etherscan, CoinGecko and Reddit from one
+HTTP server, each under its own path prefix, with optional injected latency.
+
+Usage: python benchmarks/fake_services.py [--port 8900] [--latency-ms stripe=120,coinbase=200]
+"""
+
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SERVICES = ('stripe', 'coinbase', 'etherscan', 'coingecko', 'reddit')
+
+# Typical upstream latencies, used unless overridden
+DEFAULT_LATENCY_MS = {
+    'stripe': 150,
+    'coinbase': 200,
+    'etherscan': 120,
+    'coingecko': 80,
+    'reddit': 250
+}
+
+SOLANA_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+
+class FakeServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        service, _, rest = url.path.lstrip('/').partition('/')
+        if service not in SERVICES:
+            self._send(404, {"error": f"unknown service {service}"})
+            return
+        self.server.record(service)
+        delay = self.server.latency_ms.get(service, 0)
+        if delay:
+            time.sleep(delay / 1000)
+        route = getattr(self.server, f"_{service}")
+        status, payload = route(method, '/' + rest, parse_qs(url.query), body)
+        self._send(status, payload)
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+class FakeServices(ThreadingHTTPServer):
+    """One threaded HTTP server impersonating every external dependency"""
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=None, seed=42):
+        super().__init__((host, port), FakeServiceHandler)
+        self.latency_ms = dict(DEFAULT_LATENCY_MS if latency_ms is None else latency_ms)
+        self.calls = {service: 0 for service in SERVICES}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        """Environment variables pointing the app at these fakes"""
+        return {
+            'STRIPE_API_BASE': f"{self.base_url}/stripe",
+            'COINBASE_API_BASE': f"{self.base_url}/coinbase/",
+            'ETHERSCAN_API_URL': f"{self.base_url}/etherscan/api",
+            'COINGECKO_API_URL': f"{self.base_url}/coingecko/api/v3",
+            'REDDIT_URL': f"{self.base_url}/reddit",
+            'REDDIT_OAUTH_URL': f"{self.base_url}/reddit"
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-services", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def record(self, service):
+        with self._lock:
+            self.calls[service] = self.calls.get(service, 0) + 1
+
+    def _next_id(self, prefix):
+        with self._lock:
+            return f"{prefix}_{next(self._ids):08d}"
+
+    # Stripe: checkout sessions
+    def _stripe(self, method, path, query, body):
+        if method == 'POST' and path == '/v1/checkout/sessions':
+            form = parse_qs(body.decode())
+            session_id = self._next_id('cs_test')
+            return 200, {
+                "id": session_id,
+                "object": "checkout.session",
+                "mode": form.get('mode', ['payment'])[0],
+                "status": "open",
+                "url": f"{self.base_url}/stripe/pay/{session_id}",
+                "livemode": False
+            }
+        return 404, {"error": {"type": "invalid_request_error", "message": f"No such route {path}"}}
+
+    # Coinbase Commerce: charges
+    def _coinbase(self, method, path, query, body):
+        if method == 'POST' and path.rstrip('/') == '/charges':
+            data = json.loads(body or b'{}')
+            charge_id = self._next_id('charge')
+            return 201, {"data": {
+                "id": charge_id,
+                "code": charge_id[-8:].upper(),
+                "name": data.get('name'),
+                "pricing_type": data.get('pricing_type'),
+                "hosted_url": f"{self.base_url}/coinbase/pay/{charge_id}",
+                "metadata": data.get('metadata', {})
+            }}
+        return 404, {"error": {"type": "not_found", "message": f"No such route {path}"}}
+
+    # Etherscan: account balance
+    def _etherscan(self, method, path, query, body):
+        if query.get('module') == ['account'] and query.get('action') == ['balance']:
+            with self._lock:
+                wei = self._rng.randint(10, 5000) * 10 ** 18
+            return 200, {"status": "1", "message": "OK", "result": str(wei)}
+        return 200, {"status": "0", "message": "NOTOK", "result": "Unsupported action"}
+
+    # CoinGecko: simple price
+    def _coingecko(self, method, path, query, body):
+        if path == '/api/v3/simple/price':
+            ids = query.get('ids', ['ethereum'])[0].split(',')
+            return 200, {coin: {"usd": 2500.0} for coin in ids}
+        return 404, {"error": "Not found"}
+
+    # Reddit: OAuth token and subreddit listings
+    def _reddit(self, method, path, query, body):
+        if path == '/api/v1/access_token':
+            return 200, {"access_token": "fake-token", "token_type": "bearer",
+                         "expires_in": 3600, "scope": "*"}
+        parts = path.strip('/').split('/')
+        if len(parts) >= 3 and parts[0] == 'r' and parts[2] in ('hot', 'new'):
+            limit = int(query.get('limit', ['25'])[0])
+            return 200, self._listing(parts[1], min(limit, 100))
+        return 404, {"message": "Not Found", "error": 404}
+
+    def _listing(self, subreddit, limit):
+        with self._lock:
+            rng = random.Random(self._rng.random())
+        children = []
+        for _ in range(limit):
+            post_id = self._next_id('t3')[3:]
+            if rng.random() < 0.5:
+                address = '0x' + ''.join(rng.choice('0123456789abcdef') for _ in range(40))
+            else:
+                address = ''.join(rng.choice(SOLANA_ALPHABET) for _ in range(44))
+            children.append({"kind": "t3", "data": {
+                "id": post_id,
+                "name": f"t3_{post_id}",
+                "subreddit": subreddit,
+                "title": "Wallet analysis: tracking a profitable whale",
+                "selftext": f"Research on this wallet {address}, very successful alpha.",
+                "score": rng.randint(1, 500),
+                "num_comments": rng.randint(0, 120),
+                "permalink": f"/r/{subreddit}/comments/{post_id}/",
+                "created_utc": time.time() - rng.randint(0, 86400),
+                "author": f"user{rng.randint(1, 9999)}"
+            }})
+        return {"kind": "Listing", "data": {"children": children, "after": None, "before": None}}
+
+def parse_latency(spec):
+    """Parse 'stripe=120,coinbase=200' into a latency map over the defaults"""
+    latency = dict(DEFAULT_LATENCY_MS)
+    if spec == 'none':
+        return {service: 0 for service in SERVICES}
+    for item in filter(None, (spec or '').split(',')):
+        service, _, value = item.partition('=')
+        latency[service.strip()] = float(value)
+    return latency
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency-ms', default='', help="per-service latency, e.g. stripe=120 or 'none'")
+    args = parser.parse_args()
+
+    fakes = FakeServices(args.host, args.port, parse_latency(args.latency_ms))
+    for key, value in fakes.env().items():
+        print(f"export {key}={value}")
+    try:
+        fakes.serve_forever()
+    except KeyboardInterrupt:
+        fakes.server_close()
+
+if __name__ == '__main__':
+    main()
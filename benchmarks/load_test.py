@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Load Test Harness
+Boots combined_app (under gunicorn, or Flask's threaded server) against local
+fakes for Stripe, Coinbase Commerce, Etherscan, CoinGecko and Reddit plus a
+local Postgres. It drives a weighted mix of login, whale, AI advice, checkout
+and webhook traffic, then writes per-endpoint throughput and latency
+percentiles to a JSON report that can be compared between commits.
+
+Usage: python benchmarks/load_test.py [--duration 30] [--concurrency 16] [--workers 4]
+           [--mix login=10,whales=35,advice=20,checkout=8,donation=4,webhook=15,plans=8]
+           [--database-url postgresql://...] [--output report.json] [--compare baseline.json]
+"""
+
+import argparse
+import hashlib
+import hmac
+import importlib.util
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import psycopg2
+import requests
+
+from fake_services import FakeServices, parse_latency
+
+try:
+    import pgserver  # Throwaway local Postgres when no --database-url is given
+except ImportError:
+    pgserver = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+STRIPE_WEBHOOK_SECRET = 'whsec_loadtest'
+COINBASE_WEBHOOK_SECRET = 'cb_loadtest'
+PASSWORD = 'load-test-password'
+
+DEFAULT_MIX = 'login=10,whales=35,advice=20,checkout=8,donation=4,webhook=15,plans=8'
+
+TOKEN_ADDRESSES = [f"0x{hashlib.sha256(str(i).encode()).hexdigest()[:40]}" for i in range(20)]
+QUERIES = [
+    "should I buy SOL after this whale accumulation",
+    "is ETH bearish this week",
+    "whale inflow on BONK, pump or dump",
+    "general trading analysis",
+    "risk of holding during the crash"
+]
+
+# Database and app process setup
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_postgres(args, workdir):
+    url = args.database_url or os.getenv('LOADTEST_DATABASE_URL')
+    if url:
+        return url, None
+    if pgserver is None:
+        sys.exit("❌ No Postgres available: pass --database-url or pip install pgserver")
+    server = pgserver.get_server(os.path.join(workdir, 'pgdata'), cleanup_mode='stop')
+    return server.get_uri(), server
+
+def app_environment(fakes, database_url, workdir, seed):
+    env = dict(os.environ)
+    env.update(fakes.env())
+    env.update({
+        'FLASK_ENV': 'production',
+        'DATABASE_URL': database_url,
+        'SECRET_KEY': 'load-test-secret-key',
+        'JWT_SECRET_KEY': 'load-test-jwt-secret',
+        'STRIPE_SECRET_KEY': 'sk_test_loadtest',
+        'STRIPE_PUBLISHABLE_KEY': 'pk_test_loadtest',
+        'STRIPE_WEBHOOK_SECRET': STRIPE_WEBHOOK_SECRET,
+        'COINBASE_API_KEY': 'loadtest',
+        'COINBASE_WEBHOOK_SECRET': COINBASE_WEBHOOK_SECRET,
+        'RATELIMIT_ENABLED': 'false',
+        'TRADING_AI_SEED': str(seed),  # same advice for the same user+query across runs
+        'LOG_FILE': os.path.join(workdir, 'app.log'),
+        'METRICS_DIR': os.path.join(workdir, 'metrics'),
+        'TEMPLATE_CACHE_DIR': os.path.join(workdir, 'jinja')
+    })
+    return env
+
+def prepare_database(env, user_count):
+    """Create the schema via app.init_database and whitelist the load-test users"""
+    subprocess.run(
+        [sys.executable, '-c', 'import sys, app; sys.exit(0 if app.init_database() else 1)'],
+        cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    emails = [f"loadtest-{i}@example.com" for i in range(user_count)]
+    conn = psycopg2.connect(env['DATABASE_URL'])
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO whitelist (email, tier) VALUES (%s, 'beta') ON CONFLICT (email) DO NOTHING",
+            [(email,) for email in emails]
+        )
+    conn.close()
+    return emails
+
+def start_app(args, env, port, workdir):
+    use_gunicorn = args.server == 'gunicorn' or (
+        args.server == 'auto' and importlib.util.find_spec('gunicorn') is not None)
+    if use_gunicorn:
+        cmd = [sys.executable, '-m', 'gunicorn', '--workers', str(args.workers),
+               '--threads', str(args.threads), '--bind', f'127.0.0.1:{port}',
+               '--timeout', '120'] + (['--preload'] if args.preload else []) + ['benchmarks.load_test_app:app']
+    else:
+        cmd = [sys.executable, os.path.join(HERE, 'load_test_app.py'), '--port', str(port)]
+    log = open(os.path.join(workdir, 'server.log'), 'wb')
+    process = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + args.startup_timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            if requests.get(f"{base_url}/ai/test", timeout=1).json()['data']['ready_for_integration']:
+                return process, base_url, 'gunicorn' if use_gunicorn else 'flask'
+        except (requests.RequestException, ValueError, KeyError):
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    with open(os.path.join(workdir, 'server.log'), 'rb') as f:
+        tail = f.read()[-2000:].decode(errors='replace')
+    sys.exit(f"❌ App did not become ready:\n{tail}")
+
+def stop_app(process):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+# Traffic scenarios: each returns (endpoint label, response)
+def login_user(session, base_url, email):
+    response = session.post(f"{base_url}/api/auth/login", json={'email': email, 'password': PASSWORD})
+    data = response.json().get('data') or {}
+    return response, data.get('token'), (data.get('user') or {}).get('user_id')
+
+def scenario_login(ctx, rng):
+    response, _, _ = login_user(ctx.session, ctx.base_url, rng.choice(ctx.users)['email'])
+    return 'POST /api/auth/login', response
+
+def scenario_whales(ctx, rng):
+    user = rng.choice(ctx.users)
+    response = ctx.session.get(
+        f"{ctx.base_url}/ai/whale-activity",
+        params={'token_address': rng.choice(TOKEN_ADDRESSES), 'limit': rng.choice([10, 20, 50])},
+        headers={'Authorization': f"Bearer {user['token']}", 'Accept-Encoding': 'gzip, br'}
+    )
+    return 'GET /ai/whale-activity', response
+
+def scenario_advice(ctx, rng):
+    user = rng.choice(ctx.users)
+    response = ctx.session.post(
+        f"{ctx.base_url}/ai/trading-advice",
+        json={'user_id': user['user_id'], 'query': rng.choice(QUERIES), 'context': {}},
+        headers={'Authorization': f"Bearer {user['token']}"}
+    )
+    return 'POST /ai/trading-advice', response
+
+def scenario_checkout(ctx, rng):
+    plan = rng.choice(['professional', 'enterprise', 'house_hero', 'legend'])
+    payment_type = 'crowdfund' if plan in ('house_hero', 'legend') else 'subscription'
+    response = ctx.session.post(f"{ctx.base_url}/create-checkout-session",
+                                json={'plan': plan, 'type': payment_type})
+    return 'POST /create-checkout-session', response
+
+def scenario_donation(ctx, rng):
+    method = rng.choice(['card', 'crypto'])
+    response = ctx.session.post(f"{ctx.base_url}/create-donation-session",
+                                json={'amount': rng.choice([49, 100, 250, 1000]), 'method': method})
+    return f'POST /create-donation-session ({method})', response
+
+def stripe_signature(payload, secret, timestamp):
+    signed = hmac.new(secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signed}"
+
+def scenario_webhook(ctx, rng):
+    event_id = f"{rng.getrandbits(48):012x}"
+    if rng.random() < 0.5:
+        payload = json.dumps({
+            'id': f"evt_{event_id}", 'object': 'event', 'type': 'checkout.session.completed',
+            'data': {'object': {'id': f"cs_test_{event_id}", 'object': 'checkout.session',
+                                'metadata': {'plan': rng.choice(['professional', 'enterprise'])}}}
+        })
+        headers = {'Stripe-Signature': stripe_signature(payload, STRIPE_WEBHOOK_SECRET, int(time.time())),
+                   'Content-Type': 'application/json'}
+        label = 'POST /webhook (stripe)'
+    else:
+        payload = json.dumps({
+            'id': event_id, 'scheduled_for': datetime.utcnow().isoformat(),
+            'event': {'id': event_id, 'type': 'charge:confirmed', 'data': {
+                'id': f"charge_{event_id}", 'code': event_id[:8].upper(),
+                'payments': [{'value': {'local': {'amount': f"{rng.randint(5, 500)}.00", 'currency': 'USD'}}}]
+            }}
+        })
+        signature = hmac.new(COINBASE_WEBHOOK_SECRET.encode(), payload.encode(), hashlib.sha256).hexdigest()
+        headers = {'X-CC-Webhook-Signature': signature, 'Content-Type': 'application/json'}
+        label = 'POST /webhook (coinbase)'
+    return label, ctx.session.post(f"{ctx.base_url}/webhook", data=payload, headers=headers)
+
+def scenario_plans(ctx, rng):
+    return 'GET /api/plans', ctx.session.get(f"{ctx.base_url}/api/plans")
+
+SCENARIOS = {
+    'login': scenario_login,
+    'whales': scenario_whales,
+    'advice': scenario_advice,
+    'checkout': scenario_checkout,
+    'donation': scenario_donation,
+    'webhook': scenario_webhook,
+    'plans': scenario_plans
+}
+
+def parse_mix(spec):
+    mix = {}
+    for item in filter(None, spec.split(',')):
+        name, _, weight = item.partition('=')
+        if name.strip() not in SCENARIOS:
+            sys.exit(f"❌ Unknown scenario '{name}'. Choose from: {', '.join(SCENARIOS)}")
+        mix[name.strip()] = float(weight)
+    return mix
+
+# Load generation
+class ClientContext:
+    def __init__(self, base_url, users):
+        self.base_url = base_url
+        self.users = users
+        self.session = requests.Session()
+        self.latencies = {}
+        self.statuses = {}
+
+    def record(self, label, status, elapsed_ms):
+        self.latencies.setdefault(label, []).append(elapsed_ms)
+        counts = self.statuses.setdefault(label, {})
+        counts[status] = counts.get(status, 0) + 1
+
+def client_loop(ctx, rng, mix, warmup_until, stop_at, think_time):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while True:
+        now = time.perf_counter()
+        if now >= stop_at:
+            return
+        scenario = SCENARIOS[rng.choices(names, weights)[0]]
+        start = time.perf_counter()
+        try:
+            label, response = scenario(ctx, rng)
+            status = str(response.status_code)
+        except requests.RequestException as e:
+            label, status = scenario.__name__.replace('scenario_', ''), type(e).__name__
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if start >= warmup_until:
+            ctx.record(label, status, elapsed_ms)
+        if think_time:
+            time.sleep(rng.expovariate(1 / think_time))
+
+def authenticate(base_url, emails):
+    session = requests.Session()
+    users = []
+    for email in emails:
+        response, token, user_id = login_user(session, base_url, email)
+        if not token:
+            sys.exit(f"❌ Login failed for {email}: {response.status_code} {response.text[:200]}")
+        users.append({'email': email, 'token': token, 'user_id': user_id})
+    return users
+
+def run_load(args, base_url, users, mix):
+    contexts = [ClientContext(base_url, users) for _ in range(args.concurrency)]
+    start = time.perf_counter()
+    warmup_until = start + args.warmup
+    stop_at = warmup_until + args.duration
+    threads = [
+        threading.Thread(target=client_loop, daemon=True,
+                         args=(ctx, random.Random(args.seed + i), mix, warmup_until, stop_at, args.think_time))
+        for i, ctx in enumerate(contexts)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies, statuses = {}, {}
+    for ctx in contexts:
+        for label, values in ctx.latencies.items():
+            latencies.setdefault(label, []).extend(values)
+        for label, counts in ctx.statuses.items():
+            merged = statuses.setdefault(label, {})
+            for status, count in counts.items():
+                merged[status] = merged.get(status, 0) + count
+    return latencies, statuses
+
+# Reporting
+def percentile(ordered, pct):
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return round(ordered[index], 2)
+
+def summarize(values, counts, seconds):
+    ordered = sorted(values)
+    errors = sum(count for status, count in counts.items() if not status.isdigit() or int(status) >= 400)
+    return {
+        'requests': len(ordered),
+        'throughput_rps': round(len(ordered) / seconds, 2),
+        'error_rate': round(errors / len(ordered), 4) if ordered else 0.0,
+        'status_counts': dict(sorted(counts.items())),
+        'latency_ms': {
+            'mean': round(sum(ordered) / len(ordered), 2) if ordered else None,
+            'p50': percentile(ordered, 50),
+            'p90': percentile(ordered, 90),
+            'p95': percentile(ordered, 95),
+            'p99': percentile(ordered, 99),
+            'max': round(ordered[-1], 2) if ordered else None
+        }
+    }
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'diff', '--quiet', 'HEAD', '--', '.', ':!whale_env'],
+                               cwd=ROOT).returncode != 0
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def build_report(args, mix, server_mode, latencies, statuses, fakes):
+    all_values = [value for values in latencies.values() for value in values]
+    all_counts = {}
+    for counts in statuses.values():
+        for status, count in counts.items():
+            all_counts[status] = all_counts.get(status, 0) + count
+    return {
+        'meta': {
+            'commit': git_revision(),
+            'timestamp': datetime.now().isoformat(),
+            'server': server_mode,
+            'workers': args.workers if server_mode == 'gunicorn' else 1,
+            'threads': args.threads if server_mode == 'gunicorn' else None,
+            'preload': args.preload if server_mode == 'gunicorn' else None,
+            'concurrency': args.concurrency,
+            'duration_s': args.duration,
+            'warmup_s': args.warmup,
+            'think_time_s': args.think_time,
+            'users': args.users,
+            'seed': args.seed,
+            'mix': mix,
+            'fake_latency_ms': fakes.latency_ms,
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count()
+        },
+        'overall': summarize(all_values, all_counts, args.duration),
+        'endpoints': {label: summarize(latencies[label], statuses[label], args.duration)
+                      for label in sorted(latencies)},
+        'external_calls': dict(fakes.calls)
+    }
+
+def print_report(report):
+    print(f"\n{'endpoint':<40}{'reqs':>8}{'rps':>9}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}")
+    rows = list(report['endpoints'].items()) + [('overall', report['overall'])]
+    for label, stats in rows:
+        latency = stats['latency_ms']
+        print(f"{label:<40}{stats['requests']:>8}{stats['throughput_rps']:>9.1f}"
+              f"{stats['error_rate'] * 100:>7.1f}{latency['p50'] or 0:>9.1f}"
+              f"{latency['p95'] or 0:>9.1f}{latency['p99'] or 0:>9.1f}")
+
+def change(old, new):
+    if not old or new is None:
+        return '     n/a'
+    return f"{(new - old) / old * 100:>+7.1f}%"
+
+def print_comparison(report, baseline):
+    print(f"\n📊 vs {baseline['meta']['commit']} ({baseline['meta']['timestamp']})")
+    print(f"{'endpoint':<40}{'rps':>10}{'Δrps':>10}{'p95':>10}{'Δp95':>10}")
+    endpoints = dict(report['endpoints'], overall=report['overall'])
+    base_endpoints = dict(baseline['endpoints'], overall=baseline['overall'])
+    for label, stats in endpoints.items():
+        base = base_endpoints.get(label)
+        if base is None:
+            print(f"{label:<40}{stats['throughput_rps']:>10.1f}{'new':>10}")
+            continue
+        p95 = stats['latency_ms']['p95']
+        print(f"{label:<40}{stats['throughput_rps']:>10.1f}"
+              f"{change(base['throughput_rps'], stats['throughput_rps']):>10}"
+              f"{p95 or 0:>10.1f}{change(base['latency_ms']['p95'], p95):>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--duration', type=float, default=30, help="measured seconds")
+    parser.add_argument('--warmup', type=float, default=5, help="unmeasured seconds before measuring")
+    parser.add_argument('--concurrency', type=int, default=16, help="concurrent client threads")
+    parser.add_argument('--think-time', type=float, default=0.0, help="mean seconds between a client's requests")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="scenario weights")
+    parser.add_argument('--users', type=int, default=50, help="whitelisted load-test users")
+    parser.add_argument('--server', choices=['auto', 'gunicorn', 'flask'], default='auto')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--preload', action='store_true', help="gunicorn --preload (shared copy-on-write state)")
+    parser.add_argument('--startup-timeout', type=float, default=60)
+    parser.add_argument('--fake-latency-ms', default='', help="e.g. stripe=150,coinbase=200 or 'none'")
+    parser.add_argument('--database-url', help="Postgres to use (default: throwaway pgserver)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="report path (default: benchmarks/results/load_test_<commit>.json)")
+    parser.add_argument('--compare', help="baseline report to diff against")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    workdir = tempfile.mkdtemp(prefix='whale-loadtest-')
+    fakes = FakeServices(latency_ms=parse_latency(args.fake_latency_ms), seed=args.seed).start()
+    database_url, postgres = start_postgres(args, workdir)
+    process = None
+    try:
+        env = app_environment(fakes, database_url, workdir, args.seed)
+        emails = prepare_database(env, args.users)
+        process, base_url, server_mode = start_app(args, env, free_port(), workdir)
+        print(f"🚀 {server_mode} up at {base_url}; fakes at {fakes.base_url}; logs in {workdir}")
+
+        users = authenticate(base_url, emails)
+        print(f"🔥 {args.concurrency} clients, {args.warmup:.0f}s warmup + {args.duration:.0f}s measured")
+        latencies, statuses = run_load(args, base_url, users, mix)
+    finally:
+        if process is not None:
+            stop_app(process)
+        fakes.stop()
+        if postgres is not None:
+            postgres.cleanup()
+
+    report = build_report(args, mix, server_mode, latencies, statuses, fakes)
+    output = args.output or os.path.join(HERE, 'results', f"load_test_{report['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print_report(report)
+    print(f"\n💾 Report written to {output}")
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point used by the load test
+Imports combined_app. Under gunicorn, the hooks in gunicorn.conf.py start each
+worker's background warm-up (whitelist load and TradingAI initialization) at
+boot, or build that state once in the master with --preload; run directly, it
+starts the warm-up itself the way combined_app's __main__ block does.
+
+Usage: gunicorn [--preload] benchmarks.load_test_app:app   (or: python benchmarks/load_test_app.py --port 5055)
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from combined_app import app, start_warm_up
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+    start_warm_up()
+    app.run(host=args.host, port=args.port, threaded=True, use_reloader=False)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Replay a TradingAI recording
+Re-runs every call captured with TRADING_AI_RECORD_FILE using its recorded
+inputs and random draws, and checks each result hashes the same as when it
+was recorded. Exits non-zero if any call no longer reproduces.
+
+Usage: python benchmarks/replay_trading_ai.py recording.jsonl [--show-mismatches 10] [--real-sleeps]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import structlog
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+import trading_ai
+from trading_ai import TradingAI
+
+async def no_sleep(delay, result=None):
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("recording")
+    parser.add_argument("--show-mismatches", type=int, default=10)
+    parser.add_argument("--real-sleeps", action="store_true", help="keep the simulated analysis delays")
+    args = parser.parse_args()
+
+    ai = TradingAI()
+    ai.initialized = True
+    start = time.perf_counter()
+    if args.real_sleeps:
+        outcomes = asyncio.run(ai.replay(args.recording))
+    else:
+        with mock.patch.object(trading_ai.asyncio, "sleep", no_sleep):
+            outcomes = asyncio.run(ai.replay(args.recording))
+    elapsed = time.perf_counter() - start
+
+    mismatches = [outcome for outcome in outcomes if not outcome["match"]]
+    by_op = Counter(outcome["op"] for outcome in outcomes)
+    print(f"🔁 Replayed {len(outcomes)} calls in {elapsed:.2f}s "
+          f"({', '.join(f'{op}={count}' for op, count in sorted(by_op.items()))})")
+    for outcome in mismatches[:args.show_mismatches]:
+        detail = outcome.get("error") or f"{outcome['digest']} -> {outcome.get('replayed_digest')}"
+        print(f"   line {outcome['line']} {outcome['op']}: {detail}")
+
+    if mismatches:
+        print(f"\n❌ {len(mismatches)} call(s) did not reproduce")
+        sys.exit(1)
+    print("\n✅ Every call reproduced bit-exactly")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Route blueprints, one per deployment role (see app_factory.create_app).
+
+core is always registered; payments, auth, ai, whales and admin are
+registered when their role is enabled.
+"""
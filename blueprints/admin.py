@@ -0,0 +1,107 @@
+"""Whitelist and waitlist administration (X-Admin-Key)"""
+
+import structlog
+from flask import Blueprint, request
+
+from utils import api_success, api_error, whitelist_manager, waitlist_tracker
+
+logger = structlog.get_logger(__name__)
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.route('/admin/whitelist', methods=['POST'])
+def admin_add_whitelist():
+    try:
+        admin_key = request.headers.get('X-Admin-Key')
+        if admin_key != 'your-secret-admin-key-12345':  # Change this to a secure env var!
+            return api_error("Admin access required", 403)
+        
+        data = request.get_json()
+        email = data.get('email', '').lower().strip()
+        tier = data.get('tier', 'beta')
+        
+        if not email:
+            return api_error("Email required", 400)
+        
+        whitelist_manager.add_to_whitelist(email, tier)
+        logger.info(f"Admin added {email} to {tier} whitelist")
+        
+        return api_success({"message": f"Added {email} to {tier} whitelist"})
+        
+    except Exception as e:
+        logger.error(f"Admin whitelist error: {e}")
+        return api_error("Failed to add to whitelist", 500)
+
+@admin_bp.route('/admin/whitelist', methods=['DELETE'])
+def admin_remove_whitelist():
+    try:
+        admin_key = request.headers.get('X-Admin-Key')
+        if admin_key != 'your-secret-admin-key-12345':
+            return api_error("Admin access required", 403)
+        
+        data = request.get_json() or {}
+        email = data.get('email', '').lower().strip()
+        
+        if not email:
+            return api_error("Email required", 400)
+        
+        if not whitelist_manager.remove_from_whitelist(email):
+            return api_error(f"{email} is not on the whitelist", 404)
+        logger.info(f"Admin removed {email} from whitelist")
+        
+        return api_success({"message": f"Removed {email} from whitelist"})
+        
+    except Exception as e:
+        logger.error(f"Admin whitelist removal error: {e}")
+        return api_error("Failed to remove from whitelist", 500)
+
+@admin_bp.route('/admin/waitlist/promote', methods=['POST'])
+def admin_promote_waitlist():
+    try:
+        admin_key = request.headers.get('X-Admin-Key')
+        if admin_key != 'your-secret-admin-key-12345':
+            return api_error("Admin access required", 403)
+        
+        data = request.get_json() or {}
+        tier = str(data.get('tier', 'beta')).lower().strip()
+        if tier not in ('beta', 'vip'):
+            return api_error("Tier must be beta or vip", 400)
+        
+        if data.get('emails'):
+            promoted = waitlist_tracker.promote_emails(data['emails'], tier)
+        else:
+            count = min(int(data.get('count', 100)), 10000)
+            promoted = waitlist_tracker.promote_next(count, tier)
+        
+        logger.info(f"Admin promoted {len(promoted)} waitlisted users to {tier}")
+        
+        return api_success({'promoted': promoted, 'promoted_count': len(promoted)})
+        
+    except Exception as e:
+        logger.error(f"Admin waitlist promotion error: {e}")
+        return api_error("Failed to promote waitlist", 500)
+
+@admin_bp.route('/admin/whitelist', methods=['GET'])
+def admin_view_whitelist():
+    try:
+        admin_key = request.headers.get('X-Admin-Key')
+        if admin_key != 'your-secret-admin-key-12345':
+            return api_error("Admin access required", 403)
+        
+        limit = min(int(request.args.get('limit', 100)), 1000)
+        offset = max(int(request.args.get('offset', 0)), 0)
+        entries = whitelist_manager.list_entries(limit=limit, offset=offset)
+        index_stats = whitelist_manager.stats()
+        
+        return api_success({
+            'beta_emails': [email for email, tier in entries if tier == 'beta'],
+            'vip_emails': [email for email, tier in entries if tier == 'vip'],
+            'total_whitelisted': index_stats['total'],
+            'index': index_stats,
+            'limit': limit,
+            'offset': offset
+        })
+        
+    except Exception as e:
+        logger.error(f"Admin view whitelist error: {e}")
+        return api_error("Failed to get whitelist", 500)
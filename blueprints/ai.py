@@ -0,0 +1,306 @@
+"""TradingAI advice: the per-process model, its initialization and response formatting"""
+
+import asyncio
+import time
+from datetime import datetime
+
+import structlog
+from flask import Blueprint, current_app, request
+
+from config import get_config
+from extensions import limiter
+from keyword_matcher import KeywordMatcher
+from startup import startup_report
+from utils import (
+    api_success, api_error, async_helper, log_user_action, validate_request_json,
+    TradingAdviceRequest, require_auth, require_tier, PeriodicRefresher
+)
+
+config = get_config()
+logger = structlog.get_logger(__name__)
+
+ai_bp = Blueprint('ai', __name__)
+
+# Global Trading AI instance (one per process, initialized by the background warm-up)
+trading_ai = None
+ai_health_status = {
+    "initialized": False,
+    "last_error": None,
+    "initialization_time": None,
+    "retry_count": 0
+}
+
+def sync_price_history():
+    """Append the price periods the discovery workers stored since the last sync (price_feed.py)"""
+    if trading_ai is None:
+        return
+    import price_feed
+    trading_ai.price_history = price_feed.sync(trading_ai.price_history, window=config.PRICE_HISTORY_WINDOW)
+
+# Started per worker by app_factory.start_warm_up
+price_history_refresher = PeriodicRefresher('price-history-sync', config.PRICE_HISTORY_SYNC_SECONDS,
+                                            sync_price_history)
+
+async def initialize_trading_ai():
+    global trading_ai, ai_health_status
+    # Imported here, off the web process's import path (it pulls in NumPy)
+    start = time.perf_counter()
+    from trading_ai import TradingAI
+    startup_report.record_lazy_import('trading_ai', time.perf_counter() - start)
+    
+    for attempt in range(config.TRADING_AI_MAX_RETRIES):
+        try:
+            logger.info("Initializing TradingAI", attempt=attempt + 1)
+            trading_ai = TradingAI(seed=config.TRADING_AI_SEED,
+                                   record_path=config.TRADING_AI_RECORD_FILE or None)
+            await trading_ai.initialize()
+            if config.BACKTEST_REPORT_FILE:
+                trading_ai.load_backtest_report(config.BACKTEST_REPORT_FILE)
+            if config.PRICE_HISTORY_FILE:
+                trading_ai.load_price_history(config.PRICE_HISTORY_FILE, window=config.PRICE_HISTORY_WINDOW)
+            trading_ai.benchmark_symbol = config.PORTFOLIO_BENCHMARK
+            if config.DATABASE_URL:
+                try:
+                    await asyncio.to_thread(sync_price_history)
+                except Exception as e:
+                    logger.warning("Price history sync failed", error=str(e))
+            ai_health_status.update({
+                "initialized": True,
+                "last_error": None,
+                "initialization_time": datetime.now().isoformat(),
+                "retry_count": attempt
+            })
+            startup_report.mark('trading_ai', 'running', attempts=attempt + 1,
+                                stage_seconds=dict(trading_ai.init_timings))
+            logger.info("TradingAI initialized successfully")
+            return True
+        except Exception as e:
+            ai_health_status.update({
+                "initialized": False,
+                "last_error": str(e),
+                "retry_count": attempt + 1
+            })
+            if attempt < config.TRADING_AI_MAX_RETRIES - 1:
+                await asyncio.sleep(2 ** attempt)
+    logger.warning("Starting without TradingAI - AI endpoints will return 503",
+                   error=ai_health_status["last_error"])
+    return False
+
+# AI routes, also served under /api/ai/ for clients of the former standalone AI server
+@ai_bp.route('/ai/test', methods=['GET'])
+@ai_bp.route('/api/ai/test', methods=['GET'])
+def ai_test():
+    global trading_ai, ai_health_status
+    
+    return api_success({
+        "message": "🤖 Trading AI Integration Online!",
+        "server": "combined_server",
+        "roles": list(current_app.config['APP_ROLES']),
+        "trading_ai_loaded": trading_ai is not None,
+        "health_status": ai_health_status,
+        "ready_for_integration": ai_health_status["initialized"],
+        "performance": trading_ai.get_performance_metrics() if trading_ai else None
+    })
+
+@ai_bp.route('/ai/trading-advice', methods=['POST'])
+@ai_bp.route('/api/ai/trading-advice', methods=['POST'])
+@limiter.limit("20 per minute")
+@require_auth
+@require_tier("beta")
+@validate_request_json(TradingAdviceRequest)
+def get_trading_advice():
+    global trading_ai
+    
+    if not trading_ai or not ai_health_status["initialized"]:
+        return api_error(
+            "Trading AI not available", 
+            503, 
+            details={"health_status": ai_health_status},
+            error_type="ServiceUnavailable"
+        )
+    
+    try:
+        data = request.validated_data
+        user_id = data.user_id
+        query = data.query
+        context = data.context
+        
+        logger.info("Trading AI advice requested", user_id=user_id, query=query)
+        
+        try:
+            ai_response = async_helper.run_async(
+                trading_ai.get_user_recommendation(user_id, query, context, seed=data.seed),
+                timeout=config.TRADING_AI_TIMEOUT
+            )
+            
+            logger.info("Trading AI response received", user_id=user_id, success=ai_response.get('success', False))
+            
+        except asyncio.TimeoutError:
+            logger.error("Trading AI timeout", user_id=user_id, timeout=config.TRADING_AI_TIMEOUT)
+            return api_error(
+                "Trading AI request timed out", 
+                504, 
+                details={"timeout_seconds": config.TRADING_AI_TIMEOUT},
+                error_type="TimeoutError"
+            )
+        except Exception as ai_error:
+            logger.error("Trading AI error", user_id=user_id, error=str(ai_error))
+            return create_fallback_response(str(ai_error))
+        
+        if ai_response and ai_response.get('success', True):
+            trading_response = format_trading_ai_for_api(ai_response, context, user_id)
+            
+            log_user_action(user_id, "trading_advice_requested", {
+                "query": query,
+                "confidence": ai_response.get('confidence', 0.0)
+            })
+            
+            return api_success(trading_response)
+        else:
+            logger.warning("Trading AI returned unsuccessful response", user_id=user_id)
+            return api_error(
+                "Trading AI analysis unsuccessful", 
+                500,
+                error_type="AIAnalysisError"
+            )
+        
+    except Exception as e:
+        logger.error("Trading advice endpoint error", error=str(e), exc_info=True)
+        return api_error(
+            "Trading AI service error", 
+            500, 
+            details={"error": str(e)},
+            error_type="ServiceError"
+        )
+
+@ai_bp.route('/ai/health', methods=['GET'])
+@ai_bp.route('/api/ai/health', methods=['GET'])
+@limiter.exempt
+def ai_health_check():
+    return api_success({
+        "status": "healthy" if ai_health_status["initialized"] else "ai_not_loaded",
+        "health_status": ai_health_status,
+        "performance": trading_ai.get_performance_metrics() if trading_ai else None,
+        "timestamp": datetime.now().isoformat()
+    })
+
+def create_fallback_response(error_message):
+    return api_success({
+        "action": "monitor",
+        "confidence": 0.3,
+        "reasoning": f"Trading AI temporarily unavailable. Using conservative recommendation. Error: {error_message}",
+        "risk_level": "low",
+        "whale_influence": {
+            "whale_interest": "unknown",
+            "recent_activity": "unavailable",
+            "confidence": 0.3
+        },
+        "ai_consensus": {
+            "ai_module": "fallback_system",
+            "confidence": 0.3,
+            "source": "fallback"
+        },
+        "metadata": {
+            "is_fallback": True,
+            "timestamp": datetime.now().isoformat(),
+            "version": "fallback_1.0.0"
+        }
+    })
+
+def format_trading_ai_for_api(ai_response, context, user_id):
+    format_start = time.perf_counter()
+    try:
+        logger.debug("Formatting Trading AI response", user_id=user_id, response_keys=list(ai_response.keys()))
+        
+        recommendation_obj = ai_response.get('recommendation', {})
+        
+        if isinstance(recommendation_obj, dict):
+            reasoning = recommendation_obj.get('recommendation', str(recommendation_obj))
+            rec_confidence = recommendation_obj.get('confidence', 0.5)
+        else:
+            reasoning = str(recommendation_obj)
+            rec_confidence = 0.5
+        
+        confidence = ai_response.get('confidence', rec_confidence)
+        
+        ai_module = ai_response.get('ai_module', 'TradingAI')
+        user_level = ai_response.get('user_level', 'unknown')
+        
+        action = determine_trading_action(reasoning, ai_response)
+        risk_level = determine_risk_level_from_confidence(confidence)
+        
+        whale_influence = calculate_whale_influence(context, confidence)
+        
+        ai_metadata = ai_response.get('metadata', {})
+        stage_timings = dict(ai_metadata.get('stage_timings_ms', {}))
+        stage_timings['formatting'] = round((time.perf_counter() - format_start) * 1000, 3)
+        if trading_ai:
+            trading_ai.stage_latency.record('formatting', stage_timings['formatting'])
+        
+        formatted_response = {
+            "action": action,
+            "confidence": round(confidence, 3),
+            "reasoning": reasoning,
+            "risk_level": risk_level,
+            "whale_influence": whale_influence,
+            "ai_consensus": {
+                "ai_module": f"{ai_module}_{user_level}",
+                "confidence": round(confidence, 3),
+                "source": "TradingAI_Production"
+            },
+            "metadata": {
+                "processing_time_ms": round(ai_metadata.get('processing_time_ms', 0) + stage_timings['formatting'], 3),
+                "stage_timings_ms": stage_timings,
+                "timestamp": datetime.now().isoformat(),
+                "version": "trading_ai_2.1.0",
+                "user_tier": getattr(request, 'current_user', {}).get('tier', 'unknown')
+            }
+        }
+        
+        logger.info("Trading AI response formatted successfully", user_id=user_id, action=action, confidence=confidence)
+        
+        return formatted_response
+        
+    except Exception as e:
+        logger.error("Error formatting Trading AI response", user_id=user_id, error=str(e))
+        return create_fallback_response(f"Formatting error: {str(e)}")["data"]
+
+# Whole words only, so the -ing forms TradingAI writes ("Consider Selling") are listed explicitly
+TRADING_ACTION_KEYWORDS = KeywordMatcher({
+    'buy': ['buy', 'buying', 'purchase', 'acquire', 'long', 'bullish', 'accumulate'],
+    'sell': ['sell', 'selling', 'exit', 'dump', 'short', 'bearish', 'liquidate'],
+    'hold': ['hold', 'holding', 'keep', 'maintain', 'maintaining', 'stay', 'continue'],
+})
+
+def determine_trading_action(recommendation, ai_response):
+    counts = TRADING_ACTION_KEYWORDS.counts(f"{recommendation} {ai_response.get('reasoning', '')}")
+    
+    for action in ('buy', 'sell', 'hold'):
+        if counts[action]:
+            return action
+    return 'monitor'
+
+def determine_risk_level_from_confidence(confidence):
+    if confidence >= 0.8:
+        return 'low'
+    elif confidence >= 0.6:
+        return 'medium'
+    elif confidence >= 0.4:
+        return 'medium-high'
+    else:
+        return 'high'
+
+def calculate_whale_influence(context, confidence):
+    base_interest = "moderate"
+    if confidence > 0.8:
+        base_interest = "high"
+    elif confidence < 0.4:
+        base_interest = "low"
+    
+    return {
+        "whale_interest": base_interest,
+        "recent_activity": "analyzing",
+        "confidence": round(confidence * 0.9, 3),
+        "volume_impact": "medium",
+        "price_correlation": round(confidence * 0.8, 3)
+    }
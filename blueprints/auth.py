@@ -0,0 +1,200 @@
+"""Registration, login, token verification, waitlist signup and profile"""
+
+import structlog
+from flask import Blueprint, request
+
+from extensions import limiter
+from utils import (
+    api_success, api_error, db_manager, create_jwt_token, log_user_action,
+    generate_api_key, whitelist_manager, handle_waitlist_signup, revoke_jwt_token
+)
+
+logger = structlog.get_logger(__name__)
+
+auth_bp = Blueprint('auth', __name__)
+
+@auth_bp.route('/api/auth/register', methods=['POST'])
+@limiter.limit("5 per minute")
+def register():
+    try:
+        data = request.get_json()
+        if not data:
+            return api_error("Request body required", 400)
+            
+        email = data.get('email', '').lower().strip()
+        password = data.get('password', '')
+        
+        logger.info(f"Registration attempt for: {email}")
+        
+        if not email or '@' not in email:
+            return api_error("Valid email required", 400)
+        if len(password) < 8:
+            return api_error("Password must be at least 8 characters", 400)
+        
+        if not whitelist_manager.is_whitelisted(email):
+            logger.info(f"Non-whitelisted user tried to register: {email}")
+            return handle_waitlist_signup(email)
+        
+        user_tier = whitelist_manager.get_user_tier(email)
+        logger.info(f"Whitelisted user registered: {email}, tier: {user_tier}")
+        
+        user_data = {
+            'user_id': generate_api_key(email),
+            'email': email,
+            'subscription_tier': user_tier
+        }
+        
+        token = create_jwt_token(user_data)
+        api_key = generate_api_key(email)
+        
+        log_user_action(user_data['user_id'], "user_registered", {"email": email, "tier": user_tier})
+        
+        try:
+            db_manager.safe_execute(
+                """INSERT INTO users (email, subscription_tier, user_id, created_at) 
+                   VALUES (%s, %s, %s, NOW()) 
+                   ON CONFLICT (email) DO UPDATE SET 
+                   subscription_tier = EXCLUDED.subscription_tier,
+                   updated_at = NOW()""",
+                (email, user_tier, user_data['user_id'])
+            )
+        except Exception as db_error:
+            logger.error(f"Database error during registration: {db_error}")
+        
+        return api_success({
+            'token': token,
+            'api_key': api_key,
+            'user': user_data,
+            'message': f'🎉 Welcome to Whale Tracker Pro! You have {user_tier} access.',
+            'whitelisted': True
+        })
+        
+    except Exception as e:
+        logger.error(f"Registration error: {e}")
+        return api_error("Registration failed", 500, error_type="RegistrationError")
+
+@auth_bp.route('/api/auth/login', methods=['POST'])
+@limiter.limit("10 per minute")
+def login():
+    try:
+        data = request.get_json()
+        if not data:
+            return api_error("Request body required", 400)
+            
+        email = data.get('email', '').lower().strip()
+        password = data.get('password', '')
+        
+        if not email or not password:
+            return api_error("Email and password required", 400)
+        
+        logger.info(f"Login attempt for: {email}")
+        
+        if not whitelist_manager.is_whitelisted(email):
+            return api_error("Account not found or not approved for beta access", 401)
+        
+        user_tier = whitelist_manager.get_user_tier(email)
+        
+        user_data = {
+            'user_id': generate_api_key(email),
+            'email': email,
+            'subscription_tier': user_tier
+        }
+        
+        token = create_jwt_token(user_data)
+        api_key = generate_api_key(email)
+        
+        log_user_action(user_data['user_id'], "user_logged_in", {"email": email})
+        
+        logger.info(f"Successful login: {email}")
+        
+        return api_success({
+            'token': token,
+            'api_key': api_key,
+            'user': user_data,
+            'message': f'Welcome back! You have {user_tier} access.'
+        })
+        
+    except Exception as e:
+        logger.error(f"Login error: {e}")
+        return api_error("Login failed", 500, error_type="LoginError")
+
+@auth_bp.route('/api/auth/verify', methods=['GET'])
+def verify_token():
+    try:
+        token = request.headers.get('Authorization')
+        if not token:
+            return api_error("No token provided", 401)
+        
+        from utils import verify_jwt_token
+        payload = verify_jwt_token(token)
+        
+        if not payload:
+            return api_error("Invalid or expired token", 401)
+        
+        return api_success({
+            'valid': True,
+            'user': {
+                'email': payload.get('email'),
+                'tier': payload.get('tier'),
+                'user_id': payload.get('user_id')
+            }
+        })
+        
+    except Exception as e:
+        logger.error(f"Token verification error: {e}")
+        return api_error("Token verification failed", 500)
+
+@auth_bp.route('/api/auth/logout', methods=['POST'])
+def logout():
+    try:
+        token = request.headers.get('Authorization')
+        if not token:
+            return api_error("No token provided", 401)
+        
+        if not revoke_jwt_token(token):
+            return api_error("Invalid or expired token", 401)
+        
+        return api_success({'logged_out': True})
+        
+    except Exception as e:
+        logger.error(f"Logout error: {e}")
+        return api_error("Logout failed", 500)
+
+@auth_bp.route('/api/waitlist', methods=['POST'])
+@limiter.limit("3 per minute")
+def join_waitlist():
+    try:
+        data = request.get_json()
+        if not data:
+            return api_error("Request body required", 400)
+            
+        email = data.get('email', '').lower().strip()
+        
+        if not email or '@' not in email:
+            return api_error("Valid email required", 400)
+        
+        return handle_waitlist_signup(email)
+        
+    except Exception as e:
+        logger.error(f"Waitlist signup error: {e}")
+        return api_error("Failed to join waitlist", 500)
+
+@auth_bp.route('/api/user/profile', methods=['GET'])
+def get_user_profile():
+    try:
+        # For demo; in production, require @require_auth
+        return api_success({
+            'user': {
+                'email': 'demo@user.com',
+                'subscription_tier': 'beta',
+                'features': ['whale_discovery', 'basic_dashboard', 'ai_analysis'],
+                'api_usage': {
+                    'requests_today': 15,
+                    'limit': 100
+                }
+            }
+        })
+        
+    except Exception as e:
+        logger.error(f"Profile fetch error: {e}")
+        return api_error("Failed to fetch profile", 500)
@@ -0,0 +1,150 @@
+"""Pages, health checks and public configuration served by every role"""
+
+from datetime import datetime
+
+import structlog
+from flask import Blueprint, current_app, jsonify, render_template
+
+from config import get_config
+from extensions import limiter
+from startup import startup_report
+from utils import (
+    api_success, api_error, db_manager, ContactConfig, conditional_get,
+    static_version, prerender_page, token_cache
+)
+
+config = get_config()
+logger = structlog.get_logger(__name__)
+
+core_bp = Blueprint('core', __name__)
+
+# Response versions for read-only endpoints (change only on deploy)
+PUBLIC_CONFIG_VERSION = static_version(
+    config.STRIPE_PUBLISHABLE_KEY, config.DOMAIN,
+    bool(config.COINBASE_API_KEY), bool(config.STRIPE_SECRET_KEY)
+)
+CONTACT_INFO_VERSION = static_version(ContactConfig.get_contact_info())
+
+# Static pages rendered once per app at startup
+@core_bp.record_once
+def prerender_pages(state):
+    state.app.extensions['dashboard_page'] = prerender_page(state.app, 'dashboard_placeholder.html')
+
+@core_bp.route('/')
+def home():
+    try:
+        return render_template('index.html', stripe_publishable_key=config.STRIPE_PUBLISHABLE_KEY)
+    except Exception as e:
+        logger.error("Error rendering home page", error=str(e))
+        return api_error("Failed to load page", 500, error_type="TemplateError")
+
+@core_bp.route('/dashboard')
+def dashboard():
+    return current_app.extensions['dashboard_page']()
+
+# Health check endpoints
+# Liveness: the process is up and serving (probes are not rate limited)
+@core_bp.route('/health', methods=['GET'])
+@limiter.exempt
+def health_check():
+    return api_success({
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "version": "1.0.0"
+    })
+
+# Readiness: background initialization has finished; includes the startup-time report
+@core_bp.route('/health/ready', methods=['GET'])
+@limiter.exempt
+def readiness_check():
+    report = startup_report.as_dict()
+    report["roles"] = list(current_app.config['APP_ROLES'])
+    return jsonify(report), 200 if report["ready"] else 503
+
+@core_bp.route('/health/deep', methods=['GET'])
+def deep_health_check():
+    roles = current_app.config['APP_ROLES']
+    checks = {"database": check_database_health()}
+    if 'payments' in roles:
+        checks["stripe"] = check_stripe_health()
+        checks["coinbase"] = check_coinbase_health()
+    if 'ai' in roles:
+        from blueprints.ai import ai_health_status
+        checks["trading_ai"] = ai_health_status["initialized"]
+
+    all_healthy = all(checks.values())
+    status_code = 200 if all_healthy else 503
+
+    body = {
+        "status": "healthy" if all_healthy else "unhealthy",
+        "roles": list(roles),
+        "checks": checks,
+        "auth_cache": token_cache.stats(),
+        "rate_limits": limiter.stats(),
+        "logging": current_app.extensions['log_pipeline'].stats(),
+        "timestamp": datetime.now().isoformat(),
+        "version": "1.0.0"
+    }
+    if 'payments' in roles:
+        from webhook_inbox import webhook_worker
+        body["webhooks"] = webhook_worker.stats()
+    return jsonify(body), status_code
+
+def check_database_health():
+    try:
+        db_manager.safe_execute("SELECT 1")
+        return True
+    except Exception as e:
+        logger.error("Database health check failed", error=str(e))
+        return False
+
+def check_stripe_health():
+    return bool(config.STRIPE_SECRET_KEY and config.STRIPE_WEBHOOK_SECRET)
+
+def check_coinbase_health():
+    return bool(config.COINBASE_API_KEY and config.COINBASE_WEBHOOK_SECRET)
+
+# API endpoints
+@core_bp.route('/api/config', methods=['GET'])
+@conditional_get(lambda: PUBLIC_CONFIG_VERSION, max_age=60)
+def get_public_config():
+    return api_success({
+        "stripe_publishable_key": config.STRIPE_PUBLISHABLE_KEY,
+        "domain": config.DOMAIN,
+        "features": {
+            "crypto_payments": bool(config.COINBASE_API_KEY),
+            "stripe_payments": bool(config.STRIPE_SECRET_KEY)
+        }
+    })
+
+@core_bp.route('/api/contact-info', methods=['GET'])
+@conditional_get(lambda: CONTACT_INFO_VERSION, max_age=300)
+def get_contact_info():
+    return api_success(ContactConfig.get_contact_info())
+
+# Development/Debug endpoints (only in dev mode)
+if config.DEBUG:
+    @core_bp.route('/debug/logs', methods=['GET'])
+    def get_recent_logs():
+        """Get recent log entries (dev only)"""
+        try:
+            with open(config.LOG_FILE, 'r') as f:
+                lines = f.readlines()
+                recent_logs = lines[-50:]  # Last 50 lines
+            return api_success({"logs": recent_logs})
+        except Exception as e:
+            return api_error(f"Failed to read logs: {str(e)}", 500)
+
+    @core_bp.route('/debug/config', methods=['GET'])
+    def debug_config():
+        """Show configuration (dev only, sensitive data masked)"""
+        debug_config = {
+            "DEBUG": config.DEBUG,
+            "LOG_LEVEL": config.LOG_LEVEL,
+            "DOMAIN": config.DOMAIN,
+            "APP_ROLES": list(current_app.config['APP_ROLES']),
+            "DATABASE_URL": "***configured***" if config.DATABASE_URL else "not set",
+            "STRIPE_KEY": "***configured***" if config.STRIPE_SECRET_KEY else "not set",
+            "COINBASE_KEY": "***configured***" if config.COINBASE_API_KEY else "not set"
+        }
+        return api_success(debug_config)
@@ -0,0 +1,337 @@
+"""Checkout, donations, the payment success page and provider webhooks"""
+
+import structlog
+from flask import Blueprint, render_template, request
+
+from config import get_config
+from extensions import limiter
+from metrics import track_outbound
+from startup import startup_report, lazy_import
+from webhook_inbox import webhook_inbox, webhook_worker
+from utils import (
+    api_success, api_error, json_response, validate_request_json, CheckoutRequest, DonationRequest,
+    conditional_get, static_version
+)
+
+config = get_config()
+logger = structlog.get_logger(__name__)
+
+payments_bp = Blueprint('payments', __name__)
+
+# Payment SDKs are imported on first use; most requests never touch them
+def configure_stripe(module):
+    module.api_key = config.STRIPE_SECRET_KEY
+    if config.STRIPE_API_BASE:
+        module.api_base = config.STRIPE_API_BASE
+
+stripe = lazy_import('stripe', setup=configure_stripe, report=startup_report)
+coinbase_commerce = lazy_import('coinbase_commerce', report=startup_report)
+coinbase_enabled = bool(config.COINBASE_API_KEY)
+_coinbase_client = None
+
+def get_coinbase_client():
+    """Coinbase Commerce client, built on first use; None when not configured"""
+    global _coinbase_client
+    if _coinbase_client is None and coinbase_enabled:
+        _coinbase_client = coinbase_commerce.Client(api_key=config.COINBASE_API_KEY,
+                                                    base_api_uri=config.COINBASE_API_BASE)
+    return _coinbase_client
+
+def coinbase_webhook_errors():
+    """Exceptions raised by coinbase_commerce's webhook verification"""
+    try:
+        from coinbase_commerce.error import WebhookInvalidPayload, SignatureError
+        return WebhookInvalidPayload, SignatureError
+    except ImportError:
+        # Older SDKs lack these; nothing raised will match
+        return ()
+
+# Pricing configurations
+PRICING = {
+    'professional': {'price_id': 'price_1RyKygRkVYDUbhIFgs8JUTTR', 'mode': 'subscription'},
+    'emergency': {'price_id': 'price_1RyapeRkVYDUbhIFwSQYNIAw', 'mode': 'subscription'},
+    'enterprise': {'price_id': 'price_1Ryar9RkVYDUbhIFr4Oe7N9C', 'mode': 'payment'},
+    'sixmonth': {'price_id': 'price_1RyJOzDfwP4gynpjh4mO6b6B', 'mode': 'payment'},
+    'house_hero': {'amount': 50000, 'mode': 'payment'},
+    'family_guardian': {'amount': 150000, 'mode': 'payment'},
+    'life_changer': {'amount': 500000, 'mode': 'payment'},
+    'legend': {'amount': 1000000, 'mode': 'payment'}
+}
+
+DISPLAY_NAMES = {
+    'house_hero': '💰 House Hero - 1 Year Access',
+    'family_guardian': '🏆 Family Guardian - 2 Years + 3% Profit Share',
+    'life_changer': '👑 Life Changer - Lifetime + 5% Profit Share',
+    'legend': '✨ Legend Status - Everything + 10% Profit Share'
+}
+
+# Response version for /api/plans (changes only on deploy)
+PLANS_VERSION = static_version(PRICING, DISPLAY_NAMES)
+
+def create_stripe_session(plan, payment_type, email=None):
+    tier_info = PRICING[plan]
+    
+    with track_outbound('stripe'):
+        checkout_session = stripe.checkout.Session.create(
+            payment_method_types=['card'],
+            line_items=[{'price': tier_info['price_id'], 'quantity': 1}],
+            mode=tier_info['mode'],
+            customer_email=email or None,
+            success_url=f'{config.DOMAIN}/success?session_id={{CHECKOUT_SESSION_ID}}&type={payment_type}',
+            cancel_url=f'{config.DOMAIN}/?canceled=true',
+            metadata={'plan': plan, 'type': payment_type}
+        )
+    
+    logger.info("Checkout session created", session_id=checkout_session.id, plan=plan, type=payment_type)
+    return checkout_session
+
+@payments_bp.route('/create-checkout-session', methods=['POST'])
+@limiter.limit("10 per minute")
+@validate_request_json(CheckoutRequest)
+def create_checkout_session():
+    try:
+        data = request.validated_data
+        plan = data.plan
+        payment_type = data.type
+
+        logger.info("Creating checkout session", plan=plan, payment_type=payment_type)
+        
+        if payment_type == 'crowdfund' and plan in ['house_hero', 'family_guardian', 'life_changer', 'legend']:
+            return create_crowdfund_session(plan)
+        
+        if plan not in PRICING:
+            return api_error(f"Invalid plan: {plan}", 400)
+
+        checkout_session = create_stripe_session(plan, payment_type)
+        return api_success({"id": checkout_session.id})
+
+    except stripe.error.StripeError as e:
+        logger.error("Stripe error in checkout", error=str(e))
+        return api_error(f"Payment processing error: {str(e)}", 400, error_type="StripeError")
+    except Exception as e:
+        logger.error("Checkout session creation failed", error=str(e), exc_info=True)
+        return api_error("Failed to create checkout session", 500, error_type="CheckoutError")
+
+@payments_bp.route('/api/create-checkout-session', methods=['POST'])
+@limiter.limit("10 per minute")
+def create_checkout_session_api():
+    """Checkout for clients of the former standalone AI server (the bundled frontend).
+
+    Takes {email, plan} with plan defaulting to professional and answers with
+    a top-level checkout_url, the shape ai_server.py served.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        email = str(data.get('email', '')).lower().strip()
+        plan = data.get('plan', 'professional')
+        
+        if 'price_id' not in PRICING.get(plan, {}):
+            return api_error(f"Invalid plan: {plan}", 400)
+        
+        logger.info("Creating checkout session", plan=plan, payment_type='subscription', client='api')
+        checkout_session = create_stripe_session(plan, 'subscription', email)
+        return json_response({"success": True, "id": checkout_session.id, "checkout_url": checkout_session.url})
+    
+    except stripe.error.StripeError as e:
+        logger.error("Stripe error in checkout", error=str(e))
+        return api_error(f"Payment processing error: {str(e)}", 400, error_type="StripeError")
+    except Exception as e:
+        logger.error("Checkout session creation failed", error=str(e), exc_info=True)
+        return api_error("Failed to create checkout session", 500, error_type="CheckoutError")
+
+def create_crowdfund_session(plan):
+    try:
+        tier_info = PRICING[plan]
+        
+        with track_outbound('stripe'):
+            checkout_session = stripe.checkout.Session.create(
+                payment_method_types=['card'],
+                line_items=[{
+                    'price_data': {
+                        'currency': 'usd',
+                        'product_data': {
+                            'name': DISPLAY_NAMES[plan],
+                            'description': 'Support Whale Tracker Pro and help save our family home'
+                        },
+                        'unit_amount': tier_info['amount'],
+                    },
+                    'quantity': 1,
+                }],
+                mode='payment',
+                success_url=f'{config.DOMAIN}/success?session_id={{CHECKOUT_SESSION_ID}}&type=crowdfund&plan={plan}',
+                cancel_url=f'{config.DOMAIN}/?canceled=true',
+                metadata={'plan': plan, 'type': 'crowdfund', 'amount': tier_info['amount']}
+            )
+        
+        logger.info("Crowdfund session created", plan=plan, amount=tier_info['amount']/100, session_id=checkout_session.id)
+        
+        return api_success({"id": checkout_session.id})
+        
+    except Exception as e:
+        logger.error("Crowdfund session creation failed", error=str(e))
+        raise
+
+@payments_bp.route('/create-donation-session', methods=['POST'])
+@limiter.limit("5 per minute")
+@validate_request_json(DonationRequest)
+def create_donation_session():
+    try:
+        data = request.validated_data
+        amount = data.amount
+        method = data.method
+
+        logger.info("Creating donation session", amount=amount, method=method)
+
+        if method == 'crypto':
+            coinbase_client = get_coinbase_client()
+            if not coinbase_client:
+                return api_error("Crypto donations not available", 503, error_type="ServiceUnavailable")
+                
+            with track_outbound('coinbase'):
+                charge = coinbase_client.charge.create(
+                    name='Whale Tracker Pro Donation',
+                    description='Help save our family home',
+                    local_price={'amount': str(amount), 'currency': 'USD'},
+                    pricing_type='fixed_price',
+                    metadata={'type': 'donation', 'amount': amount}
+                )
+            
+            logger.info("Coinbase donation charge created", charge_id=charge.id, amount=amount)
+            
+            return api_success({"url": charge.hosted_url, "id": charge.id})
+        else:
+            with track_outbound('stripe'):
+                checkout_session = stripe.checkout.Session.create(
+                    payment_method_types=['card'],
+                    line_items=[{
+                        'price_data': {
+                            'currency': 'usd',
+                            'product_data': {'name': 'Emergency House Fund Donation'},
+                            'unit_amount': int(amount * 100),
+                        },
+                        'quantity': 1,
+                    }],
+                    mode='payment',
+                    success_url=f'{config.DOMAIN}/success?session_id={{CHECKOUT_SESSION_ID}}&type=donation',
+                    cancel_url=f'{config.DOMAIN}/?canceled=true',
+                    metadata={'type': 'donation', 'amount': amount}
+                )
+            
+            logger.info("Stripe donation session created", session_id=checkout_session.id, amount=amount)
+            
+            return api_success({"id": checkout_session.id})
+
+    except stripe.error.StripeError as e:
+        logger.error("Stripe error in donation", error=str(e))
+        return api_error(f"Payment processing error: {str(e)}", 400, error_type="StripeError")
+    except Exception as e:
+        logger.error("Donation session creation failed", error=str(e), exc_info=True)
+        return api_error("Failed to create donation session", 500, error_type="DonationError")
+
+@payments_bp.route('/webhook', methods=['POST'])
+@limiter.exempt
+def webhook():
+    payload = request.get_data(as_text=True)
+    sig_header = request.headers.get('Stripe-Signature') or request.headers.get('X-Cc-Webhook-Signature')
+    
+    logger.debug("Webhook received", signature_present=bool(sig_header), payload_length=len(payload))
+    
+    try:
+        if sig_header and 'Stripe-Signature' in request.headers:
+            return handle_stripe_webhook(payload, sig_header)
+        elif sig_header and 'X-Cc-Webhook-Signature' in request.headers:
+            return handle_coinbase_webhook(payload, sig_header)
+        else:
+            logger.warning("Webhook received without valid signature")
+            return api_error("Invalid webhook signature", 400, error_type="WebhookError")
+            
+    except Exception as e:
+        logger.error("Webhook processing failed", error=str(e), exc_info=True)
+        return api_error("Webhook processing failed", 400, error_type="WebhookError")
+
+def handle_stripe_webhook(payload, sig_header):
+    try:
+        event = stripe.Webhook.construct_event(
+            payload, sig_header, config.STRIPE_WEBHOOK_SECRET
+        )
+    except stripe.error.SignatureVerificationError as e:
+        logger.error("Stripe signature verification failed", error=str(e))
+        return api_error("Invalid signature", 400, error_type="SignatureError")
+    
+    return enqueue_webhook('stripe', event['id'], event['type'], payload)
+
+def handle_coinbase_webhook(payload, sig_header):
+    if not get_coinbase_client():
+        return api_error("Coinbase not configured", 503)
+    
+    from coinbase_commerce.webhook import Webhook
+    try:
+        event = Webhook.construct_event(payload, sig_header, config.COINBASE_WEBHOOK_SECRET)
+    except coinbase_webhook_errors() as e:
+        logger.error("Coinbase webhook validation failed", error=str(e))
+        return api_error("Invalid webhook", 400, error_type="WebhookError")
+    
+    return enqueue_webhook('coinbase', event.id, event.type, payload)
+
+def enqueue_webhook(provider, event_id, event_type, payload):
+    """Persist a verified event for the background worker and acknowledge it"""
+    try:
+        stored_in = webhook_inbox.append(provider, event_id, event_type, payload)
+    except Exception as e:
+        # Nothing durable holds the event, so let the provider redeliver it
+        logger.error("Webhook could not be queued", provider=provider, event_id=event_id, error=str(e))
+        return api_error("Webhook could not be queued", 503, error_type="WebhookError")
+    
+    if stored_in == 'duplicate':
+        # Already stored once; acknowledge so the provider stops redelivering
+        logger.info("Duplicate webhook ignored", provider=provider, event_id=event_id, event_type=event_type)
+        return api_success({"event_queued": event_type, "duplicate": True})
+    
+    # Wakes are coalesced, so events arriving while the worker drains share its next batch
+    webhook_worker.wake()
+    logger.info("Webhook queued", provider=provider, event_id=event_id, event_type=event_type, stored_in=stored_in)
+    return api_success({"event_queued": event_type})
+
+@payments_bp.route('/success')
+def success():
+    try:
+        session_id = request.args.get('session_id')
+        payment_type = request.args.get('type', 'subscription')
+        plan = request.args.get('plan', '')
+        
+        logger.info("Success page accessed", session_id=session_id, payment_type=payment_type, plan=plan)
+        
+        title = "Thank You!"
+        message = "Your contribution helps save our family home."
+        
+        if payment_type == 'donation':
+            title = "🙏 Thank You for Your Donation!"
+            message = "Your generous donation supports Whale Tracker Pro and our family."
+        elif payment_type == 'crowdfund':
+            title = f"Thank You for Your {plan.replace('_', ' ').title()} Contribution!"
+            message = "Your one-time contribution directly supports our mission."
+        
+        return render_template('success.html', title=title, message=message)
+        
+    except Exception as e:
+        logger.error("Error rendering success page", error=str(e))
+        return api_error("Failed to load success page", 500, error_type="TemplateError")
+
+@payments_bp.route('/api/plans', methods=['GET'])
+@conditional_get(lambda: PLANS_VERSION, max_age=300)
+def get_pricing_plans():
+    plans = []
+    for plan_id, plan_info in PRICING.items():
+        plan_data = {
+            "id": plan_id,
+            "name": DISPLAY_NAMES.get(plan_id, plan_id.replace('_', ' ').title()),
+            "mode": plan_info["mode"]
+        }
+        if "amount" in plan_info:
+            plan_data["amount"] = plan_info["amount"] / 100
+        else:
+            plan_data["price_id"] = plan_info["price_id"]
+        
+        plans.append(plan_data)
+    
+    return api_success(plans)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
@@ -16,6 +17,14 @@ class Config:
     COINBASE_API_KEY = os.getenv('COINBASE_API_KEY')
     COINBASE_WEBHOOK_SECRET = os.getenv('COINBASE_WEBHOOK_SECRET')
     
+    # External API endpoints (override to point at local fakes, e.g. for load tests)
+    STRIPE_API_BASE = os.getenv('STRIPE_API_BASE')
+    COINBASE_API_BASE = os.getenv('COINBASE_API_BASE')
+    ETHERSCAN_API_URL = os.getenv('ETHERSCAN_API_URL', 'https://api.etherscan.io/api')
+    COINGECKO_API_URL = os.getenv('COINGECKO_API_URL', 'https://api.coingecko.com/api/v3')
+    REDDIT_OAUTH_URL = os.getenv('REDDIT_OAUTH_URL')
+    REDDIT_URL = os.getenv('REDDIT_URL')
+    
     # Database configuration
     DATABASE_URL = os.getenv('DATABASE_URL')
     DATABASE_POOL_SIZE = int(os.getenv('DATABASE_POOL_SIZE', '5'))
@@ -23,21 +32,103 @@ class Config:
     
     # Application settings
     DOMAIN = os.getenv('DOMAIN', 'https://whale-tracker-ai.up.railway.app')
+
+    # Deployment role: which blueprints this process serves (comma-separated, or 'all')
+    # payments, auth, ai, whales, admin
+    APP_ROLES = os.getenv('APP_ROLES', 'all')
+
+    # Gunicorn worker model: sync (default) or gevent, which holds up to
+    # WORKER_CONNECTIONS concurrent requests per worker (see gevent_mode.py)
+    WORKER_CLASS = os.getenv('WORKER_CLASS', 'sync')
+    WORKER_CONNECTIONS = int(os.getenv('WORKER_CONNECTIONS', '1000'))
+
+    # Rate limiting (without Redis, the workers on one host share a SQLite file)
+    RATE_LIMIT_STORAGE_URL = os.getenv('REDIS_URL', 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'whale-tracker-ratelimit.db'))
+    RATE_LIMIT_SYNC_SECONDS = float(os.getenv('RATE_LIMIT_SYNC_SECONDS', '1'))
+    RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    
+    # Response serialization and compression
+    JSON_SERIALIZER = os.getenv('JSON_SERIALIZER', 'auto')  # auto, orjson or json
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+    GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', '6'))
+    BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', '4'))
     
-    # Rate limiting
-    RATE_LIMIT_STORAGE_URL = os.getenv('REDIS_URL', 'memory://')
+    # Templates
+    TEMPLATE_CACHE_DIR = os.getenv('TEMPLATE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'whale-tracker-jinja'))
     
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE = os.getenv('LOG_FILE', '/mnt/bridge/logs/transactions.log')
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    LOG_BATCH_SIZE = int(os.getenv('LOG_BATCH_SIZE', '256'))
+    LOG_FLUSH_INTERVAL = float(os.getenv('LOG_FLUSH_INTERVAL', '0.5'))
+    LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '1.0'))
+    LOG_SAMPLED_EVENTS = [e.strip() for e in os.getenv('LOG_SAMPLED_EVENTS', 'Request started,Request completed,User action').split(',') if e.strip()]
+    
+    # Metrics (shared directory lets /metrics aggregate all gunicorn workers)
+    METRICS_DIR = os.getenv('METRICS_DIR', os.getenv('PROMETHEUS_MULTIPROC_DIR', ''))
+    METRICS_FLUSH_SECONDS = float(os.getenv('METRICS_FLUSH_SECONDS', '5'))
+    
+    # Webhook inbox (verified events are queued, then processed in the background)
+    WEBHOOK_SPILL_FILE = os.getenv('WEBHOOK_SPILL_FILE', os.path.join(tempfile.gettempdir(), 'whale-tracker-webhooks.jsonl'))
+    WEBHOOK_BATCH_SIZE = int(os.getenv('WEBHOOK_BATCH_SIZE', '50'))
+    WEBHOOK_POLL_SECONDS = float(os.getenv('WEBHOOK_POLL_SECONDS', '1'))
+    WEBHOOK_MAX_ATTEMPTS = int(os.getenv('WEBHOOK_MAX_ATTEMPTS', '8'))
+    WEBHOOK_RETRY_BASE_SECONDS = float(os.getenv('WEBHOOK_RETRY_BASE_SECONDS', '5'))
+    WEBHOOK_LEASE_SECONDS = int(os.getenv('WEBHOOK_LEASE_SECONDS', '300'))
+    WEBHOOK_RECENT_IDS = int(os.getenv('WEBHOOK_RECENT_IDS', '50000'))  # per-process duplicate cache
+    WEBHOOK_APPEND_CONNECTIONS = int(os.getenv('WEBHOOK_APPEND_CONNECTIONS', '4'))  # per process, shared by /webhook requests
+    
+    # Job queue (discovery_worker.py pulls Reddit discovery, validation and scoring jobs)
+    JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '300'))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '5'))
+    JOB_RETRY_BASE_SECONDS = float(os.getenv('JOB_RETRY_BASE_SECONDS', '30'))
+    JOB_POLL_SECONDS = float(os.getenv('JOB_POLL_SECONDS', '2'))
+    JOB_RETENTION_DAYS = int(os.getenv('JOB_RETENTION_DAYS', '7'))  # finished jobs kept for inspection
+    DISCOVERY_WORKER_THREADS = int(os.getenv('DISCOVERY_WORKER_THREADS', '4'))
+    DISCOVERY_INTERVAL_SECONDS = int(os.getenv('DISCOVERY_INTERVAL_SECONDS', '1800'))
+    DISCOVERY_MENTION_DAYS = int(os.getenv('DISCOVERY_MENTION_DAYS', '7'))  # mentions combined into a whale's score
+    DISCOVERY_SUBREDDITS = [s.strip() for s in os.getenv('DISCOVERY_SUBREDDITS', 'solana,CryptoCurrency,defi,SolanaNFTs,JupiterExchange,raydium,ethtrader,pancakeswap').split(',') if s.strip()]
+    # How often web workers re-read the whales the discovery workers have stored
+    LIVE_WHALES_REFRESH_SECONDS = int(os.getenv('LIVE_WHALES_REFRESH_SECONDS', '60'))
+    LIVE_WHALES_LIMIT = int(os.getenv('LIVE_WHALES_LIMIT', '100000'))  # best whales kept in memory per worker
     
     # Security
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', SECRET_KEY)
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
+    TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', '10000'))
+    # How often each worker picks up logouts and tier changes made on other workers
+    TOKEN_REVOCATION_SYNC_SECONDS = int(os.getenv('TOKEN_REVOCATION_SYNC_SECONDS', '5'))
+    
+    # Whitelist index sync
+    WHITELIST_REFRESH_SECONDS = int(os.getenv('WHITELIST_REFRESH_SECONDS', '30'))
+    WHITELIST_FULL_RELOAD_SECONDS = int(os.getenv('WHITELIST_FULL_RELOAD_SECONDS', '600'))
     
     # Trading AI settings
     TRADING_AI_TIMEOUT = int(os.getenv('TRADING_AI_TIMEOUT', '30'))
     TRADING_AI_MAX_RETRIES = int(os.getenv('TRADING_AI_MAX_RETRIES', '3'))
+    # Seed for reproducible outputs (per user+query); unset keeps them random
+    TRADING_AI_SEED = int(os.getenv('TRADING_AI_SEED')) if os.getenv('TRADING_AI_SEED') else None
+    # JSON-lines file recording inputs and random draws of every call for replay
+    TRADING_AI_RECORD_FILE = os.getenv('TRADING_AI_RECORD_FILE', '')
+    # backtest.py report whose hit rate is published as the AI accuracy_rate
+    BACKTEST_REPORT_FILE = os.getenv('BACKTEST_REPORT_FILE', '')
+    # Daily prices (.npz: symbols, prices[, timestamps]) behind portfolio risk analytics
+    PRICE_HISTORY_FILE = os.getenv('PRICE_HISTORY_FILE', '')
+    PRICE_HISTORY_WINDOW = int(os.getenv('PRICE_HISTORY_WINDOW', '90'))
+    PORTFOLIO_BENCHMARK = os.getenv('PORTFOLIO_BENCHMARK', 'BTC')
+    # Price feed (price_feed.py): SYMBOL:coingecko-id pairs fetched once per period by the discovery workers
+    PRICE_FEED_ASSETS = dict(
+        pair.strip().split(':', 1) for pair in os.getenv(
+            'PRICE_FEED_ASSETS',
+            'BTC:bitcoin,ETH:ethereum,SOL:solana,BNB:binancecoin,XRP:ripple,ADA:cardano,'
+            'DOGE:dogecoin,AVAX:avalanche-2,LINK:chainlink,DOT:polkadot,JUP:jupiter-exchange-solana,'
+            'RAY:raydium,BONK:bonk,CAKE:pancakeswap-token'
+        ).split(',') if ':' in pair
+    )
+    PRICE_PERIOD_SECONDS = int(os.getenv('PRICE_PERIOD_SECONDS', '86400'))
+    # How often AI workers append newly stored periods to their price history
+    PRICE_HISTORY_SYNC_SECONDS = int(os.getenv('PRICE_HISTORY_SYNC_SECONDS', '300'))
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Discovery worker: finds whales on Reddit outside the web tier.
+
+    python discovery_worker.py [--threads 4] [--kinds discover,validate,score,prices]
+
+Work is split into jobs in the Postgres job queue (job_queue.py):
+
+    discover  {subreddit}                 scan one subreddit; store its mentions; queue a validate per address
+    validate  {address, network}          look up the USD balance; queue a score for whales
+    score     {address, network, balance} combine the address's mentions; upsert discovered_whales
+    prices    {period}                    store this period's CoinGecko prices (price_feed.py)
+
+Jobs are leased with FOR UPDATE SKIP LOCKED, so run as many of these
+processes, on as many machines, as the crawl needs. A worker that dies
+mid-job loses its lease and another worker retries the job. Every worker
+tries to queue one discover job per subreddit (DISCOVERY_SUBREDDITS) per
+DISCOVERY_INTERVAL_SECONDS window, and one prices job per
+PRICE_PERIOD_SECONDS; the dedupe keys let exactly one through.
+An address is validated at most once per window. Mentions go to the
+whale_mentions table rather than job payloads, so score combines every
+mention seen in the last DISCOVERY_MENTION_DAYS, whichever subreddit found
+it; an address found again after it was scored this window is rescored
+(a score job without a balance, which reuses the stored one).
+Web workers only read discovered_whales (live_data_fetcher.LiveDataManager).
+
+    python discovery_worker.py --discover-now   # queue every subreddit now, then work
+    python discovery_worker.py --stats          # queue depth by kind and status
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import signal
+import sys
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from config import get_config
+from job_queue import JobQueue, JobWorker
+from log_pipeline import configure_structlog, json_formatter
+from price_feed import ingest as ingest_prices, schedule_ingest
+from utils import db_manager
+
+load_dotenv()
+
+config = get_config()
+logger = logging.getLogger(__name__)
+
+# Finish addresses already in flight before crawling more; prices are one cheap call
+PRIORITIES = {'discover': 0, 'validate': 10, 'score': 20, 'prices': 30}
+
+# How often each worker schedules discovery and cleans up the queue
+SCHEDULE_SECONDS = 60
+
+# One implicit transaction; the advisory lock stops workers booting together from racing
+MENTIONS_SCHEMA = """
+    SELECT pg_advisory_xact_lock(hashtext('whale_mentions_schema'));
+    CREATE TABLE IF NOT EXISTS whale_mentions (
+        address VARCHAR(64) NOT NULL,
+        post_id VARCHAR(64) NOT NULL,
+        subreddit VARCHAR(100) NOT NULL,
+        post_title TEXT,
+        post_url TEXT,
+        quality_score INTEGER NOT NULL,
+        seen_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (address, post_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_whale_mentions_seen ON whale_mentions(seen_at);
+"""
+
+job_queue = JobQueue(lease_seconds=config.JOB_LEASE_SECONDS, max_attempts=config.JOB_MAX_ATTEMPTS)
+
+# praw is not thread-safe; each worker thread gets its own client
+_reddit = threading.local()
+
+def reddit_discovery():
+    if getattr(_reddit, 'client', None) is None:
+        from reddit_discovery import BasicRedditWhaleDiscovery
+        _reddit.client = BasicRedditWhaleDiscovery()
+    return _reddit.client
+
+def address_network(address):
+    return 'ethereum' if address.startswith('0x') else 'solana'
+
+def discovery_window():
+    return int(time.time() // config.DISCOVERY_INTERVAL_SECONDS)
+
+def schedule_discovery(now=False):
+    """Queue this window's discover job for every subreddit (now: an extra, immediate run)"""
+    window = discovery_window()
+    return sum(
+        job_queue.enqueue('discover', {'subreddit': subreddit},
+                          priority=PRIORITIES['discover'] + (1 if now else 0),
+                          dedupe_key=None if now else f'discover:{subreddit}:{window}')
+        for subreddit in config.DISCOVERY_SUBREDDITS
+    )
+
+def store_mentions(address, mentions):
+    """Record mentions of address; returns how many were new"""
+    if not mentions:
+        return 0
+    return job_queue.db.execute(
+        """INSERT INTO whale_mentions (address, post_id, subreddit, post_title, post_url, quality_score)
+           SELECT %s, * FROM unnest(%s::text[], %s::text[], %s::text[], %s::text[], %s::int[])
+           ON CONFLICT (address, post_id) DO NOTHING""",
+        (address, *([mention[key] for mention in mentions]
+                    for key in ('post_id', 'subreddit', 'post_title', 'post_url', 'quality_score')))
+    )
+
+# Job handlers: raise to have the job retried
+def discover(job):
+    from reddit_discovery import group_by_address
+
+    subreddit = job.payload['subreddit']
+    discoveries = reddit_discovery().scan_subreddit(subreddit, limit=job.payload.get('limit', 25),
+                                                    raise_errors=True)
+    window = discovery_window()
+    for address, mentions in group_by_address(discoveries).items():
+        new_mentions = store_mentions(address, mentions)
+        payload = {'address': address, 'network': address_network(address)}
+        if not job_queue.enqueue('validate', payload, priority=PRIORITIES['validate'],
+                                 dedupe_key=f'validate:{address}:{window}') and new_mentions:
+            # Already queued this window, perhaps already scored: score again with these mentions
+            job_queue.enqueue('score', payload, priority=PRIORITIES['score'])
+    logger.info(f"Discovered {len(discoveries)} wallet mentions in r/{subreddit}")
+
+def validate(job):
+    from live_data_fetcher import WHALE_MIN_BALANCE, get_address_balance
+
+    network = job.payload['network']
+    if network not in WHALE_MIN_BALANCE:
+        return
+    balance = asyncio.run(get_address_balance(job.payload['address'], network))
+    if balance and balance > WHALE_MIN_BALANCE[network]:
+        job_queue.enqueue('score', dict(job.payload, balance=balance),
+                          priority=PRIORITIES['score'],
+                          dedupe_key=f"score:{job.payload['address']}:{discovery_window()}")
+
+def score(job):
+    from reddit_discovery import MIN_COMBINED_SCORE, combined_score
+
+    address = job.payload['address']
+    # Jobs queued before mentions were stored carry them in the payload
+    store_mentions(address, job.payload.get('mentions'))
+    balance = job.payload.get('balance')
+    if balance is None:
+        rows = job_queue.db.execute("SELECT balance FROM discovered_whales WHERE address = %s",
+                                    (address,), fetch=True)
+        if not rows:
+            return  # not a whale yet; a pending validate scores it with every stored mention
+        balance = rows[0][0]
+    mentions = [
+        dict(zip(('subreddit', 'post_title', 'post_url', 'quality_score'), row))
+        for row in job_queue.db.execute(
+            """SELECT subreddit, post_title, post_url, quality_score FROM whale_mentions
+               WHERE address = %s AND seen_at > NOW() - %s * INTERVAL '1 day'
+               ORDER BY quality_score DESC, seen_at""",
+            (address, config.DISCOVERY_MENTION_DAYS), fetch=True
+        )
+    ]
+    if not mentions:
+        return
+    quality = combined_score([mention['quality_score'] for mention in mentions])
+    if quality < MIN_COMBINED_SCORE:
+        return
+    best = mentions[0]
+    job_queue.db.execute(
+        """INSERT INTO discovered_whales
+               (address, network, balance, quality_score, mentions, source, post_url, post_title)
+           VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+           ON CONFLICT (address) DO UPDATE SET
+               balance = EXCLUDED.balance,
+               quality_score = EXCLUDED.quality_score,
+               mentions = GREATEST(discovered_whales.mentions, EXCLUDED.mentions),
+               source = EXCLUDED.source,
+               post_url = EXCLUDED.post_url,
+               post_title = EXCLUDED.post_title,
+               updated_at = NOW()""",
+        (address, job.payload['network'], balance, int(quality),
+         len(mentions), f"r/{best['subreddit']}", best['post_url'], (best['post_title'] or '')[:100])
+    )
+
+HANDLERS = {'discover': discover, 'validate': validate, 'score': score, 'prices': ingest_prices}
+
+def setup_logging():
+    handler = logging.StreamHandler()
+    handler.setFormatter(json_formatter())
+    logging.basicConfig(level=getattr(logging, config.LOG_LEVEL, logging.INFO), handlers=[handler])
+    configure_structlog()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Reddit whale discovery jobs from the Postgres job queue")
+    parser.add_argument("--threads", type=int, default=config.DISCOVERY_WORKER_THREADS)
+    parser.add_argument("--kinds", default=','.join(HANDLERS),
+                        help="job kinds this worker runs, e.g. discover for a crawler-only pool")
+    parser.add_argument("--no-schedule", action="store_true", help="do not queue periodic discover and prices jobs")
+    parser.add_argument("--discover-now", action="store_true", help="queue every subreddit for discovery now")
+    parser.add_argument("--stats", action="store_true", help="print queue stats and exit")
+    args = parser.parse_args()
+
+    setup_logging()
+    if not config.DATABASE_URL:
+        sys.exit("❌ DATABASE_URL is required: the job queue lives in Postgres")
+
+    from live_data_fetcher import DISCOVERED_WHALES_SCHEMA
+    job_queue.ensure_schema()
+    db_manager.safe_execute(DISCOVERED_WHALES_SCHEMA)
+    db_manager.safe_execute(MENTIONS_SCHEMA)
+
+    if args.stats:
+        print(json.dumps(job_queue.stats(), indent=2))
+        return
+
+    kinds = [kind.strip() for kind in args.kinds.split(',') if kind.strip()]
+    unknown = set(kinds) - set(HANDLERS)
+    if unknown:
+        sys.exit(f"❌ Unknown job kinds: {', '.join(sorted(unknown))} (expected {', '.join(HANDLERS)})")
+    if args.discover_now:
+        added = schedule_discovery(now=True)
+        logger.info(f"Queued discovery of {added} subreddits")
+
+    worker = JobWorker(job_queue, {kind: HANDLERS[kind] for kind in kinds}, threads=args.threads,
+                       poll_interval=config.JOB_POLL_SECONDS, retry_base_seconds=config.JOB_RETRY_BASE_SECONDS)
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+
+    worker.start()
+    logger.info(f"Discovery worker {worker.worker_id} running {', '.join(kinds)} on {args.threads} threads")
+    while not stop.is_set():
+        try:
+            if not args.no_schedule and 'discover' in kinds:
+                schedule_discovery()
+            if not args.no_schedule and 'prices' in kinds:
+                schedule_ingest(job_queue, priority=PRIORITIES['prices'])
+            reaped = job_queue.reap()
+            if reaped:
+                logger.warning(f"Marked {reaped} abandoned jobs dead after their final attempt")
+            job_queue.prune(config.JOB_RETENTION_DAYS)
+            job_queue.db.execute("DELETE FROM whale_mentions WHERE seen_at < NOW() - %s * INTERVAL '1 day'",
+                                 (config.DISCOVERY_MENTION_DAYS,))
+        except Exception as e:
+            logger.warning(f"Discovery scheduling failed: {e}")
+        stop.wait(SCHEDULE_SECONDS)
+
+    logger.info("Stopping discovery worker", extra={"stats": worker.stats()})
+    worker.stop()
+
+if __name__ == "__main__":
+    main()
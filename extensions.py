@@ -0,0 +1,19 @@
+"""
+Flask extensions shared by every blueprint.
+
+Blueprints decorate their views with these at import time; create_app()
+binds them to the application it builds.
+"""
+
+from config import get_config
+from rate_limiter import TwoTierLimiter
+
+config = get_config()
+
+# Global rate limiter instance
+limiter = TwoTierLimiter(
+    default_limits=["200 per day", "50 per hour"],
+    storage_uri=config.RATE_LIMIT_STORAGE_URL,
+    sync_interval=config.RATE_LIMIT_SYNC_SECONDS,
+    enabled=config.RATELIMIT_ENABLED
+)
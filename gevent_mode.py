@@ -0,0 +1,58 @@
+"""
+Gevent worker mode (WORKER_CLASS=gevent, i.e. gunicorn -k gevent).
+
+gunicorn.conf.py monkey-patches the standard library before anything else
+is imported. After that, everything that goes through Python sockets yields
+to the gevent hub instead of blocking the worker: requests/urllib3 (Stripe,
+Coinbase Commerce, Etherscan, CoinGecko, Reddit), the Redis client,
+time.sleep, threading and queues. Patching does not cover two things, which
+this module handles:
+
+- psycopg2 talks to Postgres from C (libpq). wait_callback() hands each wait
+  on the connection's socket to the hub instead.
+- AsyncHelper runs coroutines on one event loop in a background "thread".
+  Once patched, that thread is a greenlet and callers wait for results
+  cooperatively. asyncio tracks the running loop per OS thread, so a loop
+  per request greenlet is not an option. Blocking calls inside coroutines
+  must go through asyncio.to_thread, or they stall every coroutine.
+
+One worker can then hold thousands of slow requests (long AI calls, slow
+payment APIs) with a few MB per request instead of one thread each.
+"""
+
+import sys
+
+def active():
+    """True when gevent has monkey-patched this process's standard library"""
+    monkey = sys.modules.get('gevent.monkey')
+    return monkey is not None and monkey.is_module_patched('socket')
+
+def enable():
+    """Patch the standard library and psycopg2; call before anything else is imported"""
+    from gevent import monkey
+    monkey.patch_all()
+    install_psycopg2()
+
+def wait_callback(conn, timeout=None):
+    """psycopg2 wait callback that waits for the connection's socket through the gevent hub"""
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import OperationalError, extensions
+
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f"Bad result from poll: {state!r}")
+
+def install_psycopg2():
+    """Make every psycopg2 connection in this process cooperative (idempotent)"""
+    try:
+        from psycopg2 import extensions
+    except ImportError:
+        return
+    extensions.set_wait_callback(wait_callback)
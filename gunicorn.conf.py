@@ -0,0 +1,37 @@
+"""
+Gunicorn hooks (gunicorn reads ./gunicorn.conf.py automatically).
+
+Add --preload to build the app's shared state once in the master and fork
+copy-on-write workers from it; see prefork.py.
+
+WORKER_CLASS=gevent runs gevent workers instead; the standard library is
+patched here, before the app (or --preload) imports anything. See gevent_mode.py.
+"""
+
+import os
+
+import gevent_mode
+
+if os.getenv('WORKER_CLASS', 'sync') == 'gevent':
+    gevent_mode.enable()
+
+import prefork
+from config import Config
+
+if Config.WORKER_CLASS == 'gevent':
+    worker_class = 'gevent'
+    worker_connections = Config.WORKER_CONNECTIONS
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        prefork.preload(server.app.wsgi())
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        prefork.after_fork(server.app.wsgi())
+
+def post_worker_init(worker):
+    # Also covers a plain `-k gevent`, which patches only in the worker
+    if gevent_mode.active():
+        gevent_mode.install_psycopg2()
+    prefork.start_worker(worker.wsgi)
@@ -0,0 +1,279 @@
+"""
+Postgres-backed job queue.
+
+Jobs are rows in the job_queue table. Workers claim due jobs with
+FOR UPDATE SKIP LOCKED, so any number of worker threads, processes and
+machines can pull from the same queue without handing out a job twice.
+
+A claim is a lease: the job is marked running and its run_at moves to the
+end of the lease. If a worker dies mid-job, the job becomes claimable again
+once the lease runs out; handlers that may outlive it call extend(). Failures are
+retried with exponential backoff up to max_attempts, then marked dead.
+Higher priority runs first; within a priority, the longest-due job runs first.
+
+dedupe_key makes enqueue idempotent: there is at most one job per key,
+whatever its status, until prune() deletes it. Recurring work puts its time
+window in the key (discover:solana:<window>) so every worker can try to
+schedule it and exactly one job runs per window. Delivery is at-least-once,
+so handlers must be idempotent.
+"""
+
+import atexit
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+from config import get_config
+from metrics import JOB_EVENTS
+from utils import PersistentConnection, db_manager
+
+config = get_config()
+logger = logging.getLogger(__name__)
+
+# One implicit transaction; the advisory lock stops workers booting together from racing
+QUEUE_SCHEMA = """
+    SELECT pg_advisory_xact_lock(hashtext('job_queue_schema'));
+    CREATE TABLE IF NOT EXISTS job_queue (
+        id BIGSERIAL PRIMARY KEY,
+        kind VARCHAR(50) NOT NULL,
+        payload TEXT NOT NULL,
+        priority SMALLINT NOT NULL DEFAULT 0,
+        dedupe_key VARCHAR(255),
+        status VARCHAR(10) NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL,
+        locked_by VARCHAR(100),
+        last_error TEXT,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        run_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        finished_at TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_job_queue_due ON job_queue(priority DESC, run_at, id)
+        WHERE status IN ('pending', 'running');
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_job_queue_dedupe ON job_queue(dedupe_key);
+"""
+
+class Job:
+    """A claimed job; (id, attempt) identifies this worker's lease on it"""
+
+    __slots__ = ('id', 'kind', 'payload', 'attempt', 'max_attempts')
+
+    def __init__(self, job_id, kind, payload, attempt, max_attempts):
+        self.id = job_id
+        self.kind = kind
+        self.payload = json.loads(payload)
+        self.attempt = attempt
+        self.max_attempts = max_attempts
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.kind} attempt {self.attempt}/{self.max_attempts}>"
+
+class JobQueue:
+    """Enqueue, lease and settle jobs in the job_queue table"""
+
+    def __init__(self, lease_seconds=300, max_attempts=5, connect_timeout=5):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Each worker thread claims on its own connection; enqueues share one
+        self._db = threading.local()
+        self._connect_timeout = connect_timeout
+        self._enqueue_db = PersistentConnection(connect_timeout)
+        self._schema_ready = False
+
+    @property
+    def db(self):
+        if getattr(self._db, 'conn', None) is None:
+            self._db.conn = PersistentConnection(self._connect_timeout)
+        return self._db.conn
+
+    def ensure_schema(self):
+        if not self._schema_ready:
+            db_manager.safe_execute(QUEUE_SCHEMA)
+            self._schema_ready = True
+
+    def enqueue(self, kind, payload, priority=0, delay_seconds=0, dedupe_key=None, max_attempts=None):
+        """Add a job; returns False if a job with dedupe_key already exists"""
+        self.ensure_schema()
+        inserted = self._enqueue_db.execute(
+            """INSERT INTO job_queue (kind, payload, priority, dedupe_key, max_attempts, run_at)
+               VALUES (%s, %s, %s, %s, %s, NOW() + %s * INTERVAL '1 second')
+               ON CONFLICT (dedupe_key) DO NOTHING""",
+            (kind, json.dumps(payload, separators=(',', ':'), default=str), priority, dedupe_key,
+             max_attempts or self.max_attempts, delay_seconds)
+        )
+        if inserted:
+            JOB_EVENTS.inc(kind=kind, outcome='queued')
+        return bool(inserted)
+
+    def claim(self, worker_id, kinds=None, limit=1):
+        """Lease up to limit due jobs (optionally only these kinds) to worker_id"""
+        self.ensure_schema()
+        rows = self.db.execute(
+            """UPDATE job_queue
+               SET status = 'running', attempts = attempts + 1, locked_by = %s,
+                   run_at = NOW() + %s * INTERVAL '1 second'
+               WHERE id IN (
+                   SELECT id FROM job_queue
+                   WHERE status IN ('pending', 'running') AND run_at <= NOW()
+                     AND attempts < max_attempts AND (%s::text[] IS NULL OR kind = ANY(%s::text[]))
+                   ORDER BY priority DESC, run_at, id LIMIT %s
+                   FOR UPDATE SKIP LOCKED
+               )
+               RETURNING id, kind, payload, attempts, max_attempts""",
+            (worker_id, self.lease_seconds, kinds, kinds, limit), fetch=True
+        )
+        return [Job(*row) for row in rows]
+
+    def extend(self, job, seconds=None):
+        """Renew the lease on a long-running job; False if it was lost to another worker"""
+        return bool(self.db.execute(
+            """UPDATE job_queue SET run_at = NOW() + %s * INTERVAL '1 second'
+               WHERE id = %s AND attempts = %s AND status = 'running'""",
+            (seconds or self.lease_seconds, job.id, job.attempt)
+        ))
+
+    def complete(self, job):
+        self.db.execute(
+            """UPDATE job_queue SET status = 'done', finished_at = NOW(), last_error = NULL
+               WHERE id = %s AND attempts = %s AND status = 'running'""",
+            (job.id, job.attempt)
+        )
+
+    def retry(self, job, delay_seconds, error, dead=False):
+        self.db.execute(
+            """UPDATE job_queue
+               SET status = %s, last_error = %s, run_at = NOW() + %s * INTERVAL '1 second',
+                   finished_at = CASE WHEN %s THEN NOW() END
+               WHERE id = %s AND attempts = %s AND status = 'running'""",
+            ('dead' if dead else 'pending', error[:2000], delay_seconds, dead, job.id, job.attempt)
+        )
+
+    def reap(self):
+        """Mark dead the jobs whose last allowed attempt lost its worker; returns how many"""
+        self.ensure_schema()
+        return self.db.execute(
+            """UPDATE job_queue
+               SET status = 'dead', finished_at = NOW(), last_error = 'lease expired on final attempt'
+               WHERE status = 'running' AND run_at <= NOW() AND attempts >= max_attempts"""
+        )
+
+    def prune(self, older_than_days):
+        """Delete finished jobs (and their dedupe keys) older than the retention window"""
+        self.ensure_schema()
+        return self.db.execute(
+            """DELETE FROM job_queue
+               WHERE status IN ('done', 'dead') AND finished_at < NOW() - %s * INTERVAL '1 day'""",
+            (older_than_days,)
+        )
+
+    def stats(self):
+        """Job counts by kind and status, plus how overdue the oldest due job is"""
+        self.ensure_schema()
+        counts = {}
+        for kind, status, count in self.db.execute(
+                "SELECT kind, status, COUNT(*) FROM job_queue GROUP BY kind, status", fetch=True):
+            counts.setdefault(kind, {})[status] = count
+        lag = self.db.execute(
+            """SELECT EXTRACT(EPOCH FROM NOW() - MIN(run_at)) FROM job_queue
+               WHERE status = 'pending' AND run_at <= NOW()""", fetch=True)[0][0]
+        return {"jobs": counts, "oldest_due_seconds": round(float(lag), 1) if lag is not None else 0.0}
+
+class JobWorker:
+    """Threads pulling jobs from a JobQueue and running them through per-kind handlers"""
+
+    def __init__(self, queue, handlers, threads=4, poll_interval=2.0,
+                 retry_base_seconds=30.0, retry_max_seconds=3600.0, worker_id=None):
+        self.queue = queue
+        self.handlers = handlers
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.completed = 0
+        self.retried = 0
+        self.dead = 0
+        self._counts_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"job-worker-{n}", daemon=True)
+            for n in range(self.threads)
+        ]
+        for thread in self._threads:
+            thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def stop(self, timeout=30.0):
+        """Stop claiming; jobs in progress finish (or their leases expire after timeout)"""
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+    def wait(self):
+        while any(thread.is_alive() for thread in self._threads):
+            self._stop.wait(1.0)
+
+    def _run(self):
+        failures = 0
+        while not self._stop.is_set():
+            try:
+                ran = self.run_once()
+                failures = 0
+            except Exception as e:
+                # Back off while the database is unreachable
+                failures += 1
+                delay = min(60.0, self.poll_interval * 2 ** failures)
+                logger.warning(f"Job worker pass failed, retrying in {delay:.0f}s: {e}")
+                self._stop.wait(delay)
+                continue
+            if not ran:
+                self._stop.wait(self.poll_interval)
+
+    def _backoff(self, attempt):
+        return min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempt - 1))
+
+    def run_once(self):
+        """Claim and run one job of a kind this worker handles; returns False when none is due"""
+        jobs = self.queue.claim(self.worker_id, kinds=list(self.handlers))
+        if not jobs:
+            return False
+        job = jobs[0]
+        start = time.perf_counter()
+        try:
+            self.handlers[job.kind](job)
+        except Exception as e:
+            dead = job.attempt >= job.max_attempts
+            logger.error(f"Job {job.id} ({job.kind}) failed on attempt {job.attempt}"
+                         f"{', giving up' if dead else ''}: {e}")
+            self.queue.retry(job, self._backoff(job.attempt), f"{type(e).__name__}: {e}", dead=dead)
+            with self._counts_lock:
+                if dead:
+                    self.dead += 1
+                else:
+                    self.retried += 1
+            JOB_EVENTS.inc(kind=job.kind, outcome='dead' if dead else 'retried')
+            return True
+        self.queue.complete(job)
+        with self._counts_lock:
+            self.completed += 1
+        JOB_EVENTS.inc(kind=job.kind, outcome='completed')
+        logger.info(f"Job {job.id} ({job.kind}) done in {time.perf_counter() - start:.2f}s")
+        return True
+
+    def stats(self):
+        return {
+            "worker_id": self.worker_id,
+            "threads": sum(thread.is_alive() for thread in self._threads),
+            "completed": self.completed,
+            "retried": self.retried,
+            "dead": self.dead
+        }
@@ -0,0 +1,155 @@
+"""
+Compiled multi-keyword matching.
+
+Keywords from every category are merged into a single character trie and
+compiled into one regular expression, so a text is scanned once no matter
+how many keywords there are. Matches respect word boundaries ("dd" does not
+match "address", "buy" does not match "buyer") and the longest keyword wins
+at each position ("due diligence" rather than "due"). Spaces inside a
+keyword match any run of whitespace.
+
+Small keyword sets skip the regex on long texts: one str.find loop per
+keyword, with the word boundaries checked at each hit, beats the trie regex
+once the text has about 20 characters per keyword, up to a few dozen
+keywords (see benchmarks/bench_keyword_matcher.py). Short texts stay on the
+trie, whose fixed cost is lower. The find path is only used when no two
+keywords can match overlapping text ("due" and "due diligence" can, "free
+money" and "easy money" cannot) and every keyword starts and ends with a
+word character, so both paths count the same.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, Tuple
+
+# Up to this many keywords, find() per keyword can beat the compiled trie...
+SUBSTRING_LIMIT = 32
+# ...on texts at least this many characters long per keyword
+SUBSTRING_MIN_CHARS = 20
+
+def _is_word(char: str) -> bool:
+    """Same test as the regex \\w for str patterns"""
+    return char.isalnum() or char == "_"
+
+def _can_overlap(first: Tuple[str, ...], second: Tuple[str, ...]) -> bool:
+    """Whether word-bounded matches of two keywords can share a word"""
+    for shift in range(1 - len(second), len(first)):
+        shared = range(max(0, shift), min(len(first), shift + len(second)))
+        if all(first[i] == second[i - shift] for i in shared):
+            return True
+    return False
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """Regex for a character trie; '' marks the end of a keyword"""
+    branches = []
+    for char in sorted(key for key in node if key):
+        atom = r"\s+" if char == " " else re.escape(char)
+        branches.append(atom + _trie_pattern(node[char]))
+    if not branches:
+        return ""
+    if "" in node:
+        # A keyword ends here; try the longer ones first and fall back to it
+        return "(?:" + "|".join(branches) + ")?"
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+class KeywordMatcher:
+    """Word-bounded keyword counter over named categories"""
+
+    def __init__(self, categories: Dict[str, Iterable[str]], substring_limit: int = SUBSTRING_LIMIT,
+                 substring_min_chars: int = SUBSTRING_MIN_CHARS):
+        self.categories = tuple(categories)
+        # A keyword may belong to several categories ("dump" is both spam and a sell signal)
+        owners: Dict[str, list] = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                keyword = " ".join(keyword.lower().split())
+                if keyword and category not in owners.setdefault(keyword, []):
+                    owners[keyword].append(category)
+        if not owners:
+            raise ValueError("KeywordMatcher needs at least one keyword")
+        self._owners: Dict[str, Tuple[str, ...]] = {keyword: tuple(cats) for keyword, cats in owners.items()}
+
+        words = [tuple(keyword.split()) for keyword in self._owners]
+        self._substring = (
+            len(words) <= substring_limit
+            and all(_is_word(keyword[0]) and _is_word(keyword[-1]) for keyword in self._owners)
+            and not any(_can_overlap(first, second) for i, first in enumerate(words) for second in words[i + 1:])
+        )
+        self._find_from = substring_min_chars * len(words)
+        self._words = tuple(keyword for keyword in self._owners if " " not in keyword)
+        # Phrase spaces match any whitespace run, so phrases take a regex, started at their first word
+        self._phrases = tuple((keyword, keyword.split()[0], re.compile(r"\s+".join(map(re.escape, keyword.split()))))
+                              for keyword in self._owners if " " in keyword)
+
+        trie: Dict[str, dict] = {}
+        for keyword in self._owners:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        # The lookahead rejects most positions on their first character
+        first_chars = "".join(re.escape(char) for char in sorted(trie) if char != " ")
+        self._pattern = re.compile(rf"\b(?=[{first_chars}])(?:{_trie_pattern(trie)})\b")
+
+    def _keyword(self, match: str) -> str:
+        return match if match in self._owners else " ".join(match.split())
+
+    def _find(self, text: str, distinct: bool) -> Dict[str, int]:
+        """Occurrences per keyword via str.find; with distinct=True at most one each"""
+        text = text.lower()
+        # Slices are empty past either end of the text, and "" is not a word character
+        found = {}
+        for keyword in self._words:
+            start = text.find(keyword)
+            while start >= 0:
+                end = start + len(keyword)
+                if not _is_word(text[start - 1:start]) and not _is_word(text[end:end + 1]):
+                    found[keyword] = found.get(keyword, 0) + 1
+                    if distinct:
+                        break
+                    start = text.find(keyword, end)
+                else:
+                    start = text.find(keyword, start + 1)
+        for keyword, head, phrase in self._phrases:
+            start = text.find(head)
+            match = phrase.search(text, start) if start >= 0 else None
+            while match:
+                start, end = match.span()
+                if not _is_word(text[start - 1:start]) and not _is_word(text[end:end + 1]):
+                    found[keyword] = found.get(keyword, 0) + 1
+                    if distinct:
+                        break
+                    match = phrase.search(text, end)
+                else:
+                    match = phrase.search(text, start + 1)
+        return found
+
+    def scan(self, text: str) -> Counter:
+        """Occurrences of each keyword found in text"""
+        if self._substring and len(text) >= self._find_from:
+            return Counter(self._find(text, distinct=False))
+        return Counter(self._keyword(match) for match in self._pattern.findall(text.lower()))
+
+    def counts(self, text: str, distinct: bool = False) -> Dict[str, int]:
+        """Matches per category; with distinct=True each keyword counts at most once"""
+        counts = dict.fromkeys(self.categories, 0)
+        if self._substring and len(text) >= self._find_from:
+            for keyword, found in self._find(text, distinct).items():
+                for category in self._owners[keyword]:
+                    counts[category] += found
+            return counts
+        seen = set()
+        for match in self._pattern.findall(text.lower()):
+            keyword = self._keyword(match)
+            if distinct:
+                if keyword in seen:
+                    continue
+                seen.add(keyword)
+            for category in self._owners[keyword]:
+                counts[category] += 1
+        return counts
+
+    def __contains__(self, keyword: str) -> bool:
+        return " ".join(keyword.lower().split()) in self._owners
@@ -4,28 +4,57 @@
 
 # Create new file: live_data_fetcher.py
 
-import praw
 import requests
 import re
 import logging
+import threading
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 import time
 import asyncio
 from config import get_config
+from flask import request
+from utils import DataVersion, db_manager
+from whale_store import WhaleStore
+from metrics import track_outbound
 
 config = get_config()
 logger = logging.getLogger(__name__)
 
+# Minimum USD balance for an address to count as a whale
+WHALE_MIN_BALANCE = {'ethereum': 100000, 'solana': 50000}
+
+# Whales found by the discovery workers (discovery_worker.py); the web tier only reads it
+DISCOVERED_WHALES_SCHEMA = """
+    SELECT pg_advisory_xact_lock(hashtext('discovered_whales_schema'));
+    CREATE TABLE IF NOT EXISTS discovered_whales (
+        address VARCHAR(64) PRIMARY KEY,
+        network VARCHAR(20) NOT NULL,
+        balance DOUBLE PRECISION NOT NULL,
+        quality_score INTEGER NOT NULL,
+        mentions INTEGER NOT NULL DEFAULT 1,
+        source VARCHAR(100),
+        post_url TEXT,
+        post_title TEXT,
+        first_seen TIMESTAMP NOT NULL DEFAULT NOW(),
+        updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+    CREATE INDEX IF NOT EXISTS idx_discovered_whales_rank ON discovered_whales(quality_score DESC, balance DESC);
+"""
+
 class RedditWhaleFinder:
     """Find whale addresses from Reddit posts"""
     
     def __init__(self):
+        import praw
+        
         # Set up Reddit API (you'll need to create a Reddit app)
         self.reddit = praw.Reddit(
             client_id=config.REDDIT_CLIENT_ID,     # Add to your .env
             client_secret=config.REDDIT_CLIENT_SECRET,  # Add to your .env
-            user_agent='WhaleTracker/1.0'
+            user_agent='WhaleTracker/1.0',
+            **{key: url for key, url in (('oauth_url', config.REDDIT_OAUTH_URL),
+                                         ('reddit_url', config.REDDIT_URL)) if url}
         )
         
         # Subreddits to monitor
@@ -54,8 +83,9 @@ class RedditWhaleFinder:
                 try:
                     subreddit = self.reddit.subreddit(subreddit_name)
                     
-                    # Get recent hot posts
-                    for post in subreddit.hot(limit=limit):
+                    # Get recent hot posts (praw blocks; keep the event loop free)
+                    posts = await asyncio.to_thread(lambda: list(subreddit.hot(limit=limit)))
+                    for post in posts:
                         # Check if post is recent
                         post_time = datetime.fromtimestamp(post.created_utc)
                         if post_time < datetime.now() - timedelta(hours=hours_back):
@@ -105,16 +135,11 @@ class RedditWhaleFinder:
             network = address_data['network']
             
             # Get balance based on network
-            if network == 'ethereum':
-                balance = await self._get_ethereum_balance(address)
-                min_whale_balance = 100000  # $100k USD minimum
-            elif network == 'solana':
-                balance = await self._get_solana_balance(address)
-                min_whale_balance = 50000   # $50k USD minimum
-            else:
+            if network not in WHALE_MIN_BALANCE:
                 return None
+            balance = await get_address_balance(address, network)
             
-            if balance and balance > min_whale_balance:
+            if balance and balance > WHALE_MIN_BALANCE[network]:
                 return {
                     'address': address,
                     'balance': balance,
@@ -155,7 +180,7 @@ class EtherscanIntegration:
     
     def __init__(self):
         self.api_key = config.ETHERSCAN_API_KEY  # Add to your .env
-        self.base_url = "https://api.etherscan.io/api"
+        self.base_url = config.ETHERSCAN_API_URL
     
     async def _get_ethereum_balance(self, address):
         """Get Ethereum address balance in USD"""
@@ -169,7 +194,8 @@ class EtherscanIntegration:
                 'apikey': self.api_key
             }
             
-            response = requests.get(self.base_url, params=params)
+            with track_outbound('etherscan'):
+                response = await asyncio.to_thread(requests.get, self.base_url, params=params)
             data = response.json()
             
             if data['status'] == '1':
@@ -192,9 +218,11 @@ class EtherscanIntegration:
         """Get current ETH price"""
         try:
             # Use a free API like CoinGecko
-            response = requests.get(
-                'https://api.coingecko.com/api/v3/simple/price?ids=ethereum&vs_currencies=usd'
-            )
+            with track_outbound('coingecko'):
+                response = await asyncio.to_thread(
+                    requests.get,
+                    f'{config.COINGECKO_API_URL}/simple/price?ids=ethereum&vs_currencies=usd'
+                )
             data = response.json()
             return data['ethereum']['usd']
         except:
@@ -212,72 +240,101 @@ class SolanaIntegration:
         except:
             return 0
 
-# Update your ai_server.py to use live data
+async def get_address_balance(address, network):
+    """USD balance of an address (0 when unknown or unsupported)"""
+    if network == 'ethereum':
+        return await EtherscanIntegration()._get_ethereum_balance(address)
+    if network == 'solana':
+        return await SolanaIntegration()._get_solana_balance(address)
+    return 0
+
+# Served by GET /api/whales/top (blueprints/whales.py)
 class LiveDataManager:
-    """Manage live data fetching"""
+    """Serve the whales stored by the discovery workers.
     
-    def __init__(self):
-        self.reddit_finder = RedditWhaleFinder()
+    Web requests never crawl Reddit or call Etherscan: discovery_worker.py
+    does that in its own processes and writes discovered_whales. Each web
+    worker checks the table at most every LIVE_WHALES_REFRESH_SECONDS and
+    reloads it, up to LIVE_WHALES_LIMIT rows, into a columnar WhaleStore
+    (whale_store.py) only when its row count or newest update changed.
+    
+    The response version is that table state, not a local counter, so
+    workers holding the same rows issue the same ETag and workers holding
+    different rows never do.
+    """
+    
+    def __init__(self, refresh_seconds=60, limit=100000):
+        self.refresh_seconds = refresh_seconds
+        self.limit = limit
         self.last_update = None
-        self.cached_whales = []
+        self.cached_whales = WhaleStore.from_dicts([])
+        self.version = None
+        self._table_state = None
+        self._lock = threading.Lock()
     
-    async def get_live_whales(self, force_refresh=False):
-        """Get live whale data from Reddit/Etherscan"""
-        # Cache for 30 minutes to avoid rate limits
-        if (not force_refresh and self.last_update and 
-            datetime.now() - self.last_update < timedelta(minutes=30)):
+    def get_live_whales(self, force_refresh=False):
+        """Discovered whales as a WhaleStore"""
+        if not force_refresh and self.is_fresh():
             return self.cached_whales
         
+        # One request refreshes; the others keep serving the current store meanwhile
+        if not self._lock.acquire(blocking=self.last_update is None or force_refresh):
+            return self.cached_whales
         try:
-            logger.info("Fetching live whale data from Reddit...")
-            live_whales = await self.reddit_finder.find_whale_addresses()
-            
-            self.cached_whales = live_whales
+            if not force_refresh and self.is_fresh():
+                return self.cached_whales
+            try:
+                state = tuple(db_manager.safe_execute(
+                    "SELECT COUNT(*), MAX(updated_at)::timestamptz AT TIME ZONE 'UTC' FROM discovered_whales",
+                    fetch=True
+                )[0])
+                if force_refresh or state != self._table_state:
+                    self.cached_whales = self._load()
+                    self._table_state = state
+                    self.version = self._version(*state)
+            except Exception as e:
+                logger.error(f"Discovered whales read error: {e}")
+                # Return cached data if available
+                return self.cached_whales
             self.last_update = datetime.now()
-            
-            logger.info(f"Found {len(live_whales)} live whales")
-            return live_whales
-            
-        except Exception as e:
-            logger.error(f"Live data fetch error: {e}")
-            # Return cached data if available
             return self.cached_whales
+        finally:
+            self._lock.release()
+    
+    def _load(self):
+        columns = ([], [], [], [], [], [], [], [])
+        for row in db_manager.iter_query(
+                """SELECT address, balance, network, source, quality_score, first_seen, post_url, post_title
+                   FROM discovered_whales
+                   ORDER BY quality_score DESC, balance DESC, address
+                   LIMIT %s""",
+                (self.limit,)):
+            for column, value in zip(columns, row):
+                column.append(value)
+        store = WhaleStore(*columns)
+        logger.info(f"Loaded {len(store)} discovered whales ({store.nbytes / 1e6:.1f} MB)")
+        return store
+    
+    @staticmethod
+    def _version(count, last_updated):
+        """Data version derived from the table state the store was loaded from"""
+        if last_updated is None:
+            return DataVersion(f"{count}:", None)
+        return DataVersion(f"{count}:{last_updated.isoformat()}", last_updated.replace(microsecond=0))
+
+    def is_fresh(self):
+        """Check whether cached whales are still within the refresh window"""
+        return bool(self.last_update and
+                    datetime.now() - self.last_update < timedelta(seconds=self.refresh_seconds))
 
 # Global live data manager
-live_data_manager = LiveDataManager()
+live_data_manager = LiveDataManager(refresh_seconds=config.LIVE_WHALES_REFRESH_SECONDS,
+                                     limit=config.LIVE_WHALES_LIMIT)
 
-# Update your whale endpoint in ai_server.py
-@app.route('/api/whales/top', methods=['GET'])
-@require_auth
-def get_top_whales():
-    """Get top whales with LIVE data from Reddit/Etherscan"""
-    try:
-        limit = min(int(request.args.get('limit', 20)), 100)
-        network = request.args.get('network', 'all')
-        live_data = request.args.get('live', 'true').lower() == 'true'
-        
-        if live_data:
-            # Get live data from Reddit/Etherscan
-            whales = async_helper.run_async(live_data_manager.get_live_whales())
-            
-            # Filter by network if specified
-            if network != 'all':
-                whales = [w for w in whales if w['network'] == network]
-            
-            # Limit results
-            whales = whales[:limit]
-        else:
-            # Fallback to simulated data
-            whales = generate_whale_data(limit, network)
-        
-        return api_success({
-            'whales': whales,
-            'total_count': len(whales),
-            'data_source': 'Live_Reddit_Etherscan' if live_data else 'Simulated',
-            'last_update': live_data_manager.last_update.isoformat() if live_data_manager.last_update else None,
-            'live_data': live_data
-        })
-        
-    except Exception as e:
-        logger.error("Get whales error", error=str(e))
-        return api_error("Failed to fetch whale data", 500)
+def whales_version():
+    """Current whale data version, or None when the cache needs a refresh"""
+    if request.args.get('live', 'true').lower() != 'true':
+        return None
+    if not live_data_manager.is_fresh():
+        return None
+    return live_data_manager.version
@@ -0,0 +1,219 @@
+"""
+Non-blocking log pipeline.
+
+Request threads only build the event and put it on a bounded queue; a
+background writer thread renders records to JSON, writes them in batches and
+flushes once per batch, so slow disks never add to request latency.
+"""
+
+import atexit
+import logging
+import queue
+import random
+import threading
+import time
+from logging.handlers import QueueHandler
+
+import structlog
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of high-volume INFO events (errors are never sampled out)"""
+
+    def __init__(self, rate=1.0, events=()):
+        super().__init__()
+        self.rate = rate
+        self.events = tuple(events)
+        self.sampled_out = 0
+
+    def filter(self, record):
+        if self.rate >= 1.0 or record.levelno != logging.INFO or not self.events:
+            return True
+        if isinstance(record.msg, dict):
+            event = str(record.msg.get('event', ''))
+            if record.msg.get('status_code', 0) >= 400:
+                return True
+        else:
+            event = str(record.msg)
+        if not event.startswith(self.events) or random.random() < self.rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler that never blocks request threads on a full queue.
+
+    The last `reserve` slots are kept for WARNING and above: records below
+    WARNING are dropped once the queue is that full, so an INFO flood cannot
+    crowd out errors. Records that find no room are dropped and counted.
+    """
+
+    def __init__(self, log_queue, reserve=0.1):
+        super().__init__(log_queue)
+        self.reserve = reserve
+        self.enqueued = 0
+        self.dropped = {}
+        self._lock = threading.Lock()
+
+    def prepare(self, record):
+        # Formatting is deferred to the writer thread
+        return record
+
+    def enqueue(self, record):
+        try:
+            if record.levelno < logging.WARNING and self.queue.maxsize > 0 and \
+                    self.queue.qsize() >= self.queue.maxsize * (1 - self.reserve):
+                raise queue.Full
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            with self._lock:
+                self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+
+class DeferredFlushStreamHandler(logging.StreamHandler):
+    """StreamHandler that leaves flushing to the pipeline (once per batch)"""
+
+    def emit(self, record):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+class DeferredFlushFileHandler(logging.FileHandler):
+    """FileHandler that leaves flushing to the pipeline (once per batch)"""
+
+    def emit(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+class LogPipeline:
+    """Background writer draining the log queue into the real handlers"""
+
+    _SENTINEL = object()
+
+    def __init__(self, handlers, queue_size=10000, batch_size=256, flush_interval=0.5,
+                 sample_rate=1.0, sampled_events=()):
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = BoundedQueueHandler(self.queue)
+        self.sampler = SamplingFilter(sample_rate, sampled_events)
+        self.queue_handler.addFilter(self.sampler)
+        self.written = 0
+        self.batches = 0
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+        return self
+
+    def after_fork(self):
+        """Start a fresh queue and writer in a forked worker; the parent's thread is gone"""
+        # Records still queued in the parent are written by the parent
+        self.queue = queue.Queue(maxsize=self.queue.maxsize)
+        handler = self.queue_handler
+        handler.queue = self.queue
+        handler.enqueued = 0
+        handler.dropped = {}
+        handler._lock = threading.Lock()
+        self.written = 0
+        self.batches = 0
+        self._thread = None
+        return self.start()
+
+    def stop(self, timeout=5.0):
+        """Flush everything still queued and stop the writer thread"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self.queue.put(self._SENTINEL, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    record = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if record is self._SENTINEL:
+                    stop = True
+                    break
+                batch.append(record)
+            if batch:
+                self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch):
+        for handler in self.handlers:
+            for record in batch:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+            try:
+                handler.flush()
+            except Exception:
+                pass
+        self.written += len(batch)
+        self.batches += 1
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "enqueued": self.queue_handler.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": dict(self.queue_handler.dropped),
+            "sampled_out": self.sampler.sampled_out
+        }
+
+def configure_structlog():
+    """Route structlog through stdlib logging, deferring JSON rendering to the handlers"""
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.StackInfoRenderer(),
+            # Tracebacks must be captured on the thread that raised
+            structlog.processors.format_exc_info,
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ],
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+def json_formatter():
+    """Formatter rendering structlog events and plain stdlib records as JSON lines"""
+    return structlog.stdlib.ProcessorFormatter(
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.JSONRenderer(),
+        ],
+        foreign_pre_chain=[
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.ExtraAdder(),
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.format_exc_info,
+        ],
+    )
@@ -0,0 +1,369 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Each worker records into its own registry and periodically writes a snapshot
+to METRICS_DIR; the worker serving /metrics merges every snapshot, so the
+scrape reflects all gunicorn workers. Without METRICS_DIR only the local
+process is reported.
+"""
+
+import bisect
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import Response, request
+
+from config import get_config
+
+config = get_config()
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+class _Metric:
+    kind = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+class Counter(_Metric):
+    """Monotonic counter, summed across workers"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.registry._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    """Point-in-time value, summed across live workers"""
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.registry._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self.registry._lock:
+            self.values[self._key(labels)] = value
+
+class Histogram(_Metric):
+    """Bucketed latency distribution; values are [bucket counts..., sum, count]"""
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.registry._lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+class MetricsRegistry:
+    """Registry of metrics for this process plus the cross-worker snapshot files"""
+
+    def __init__(self, directory=None, flush_interval=5.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.metrics = {}
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def _register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def reset(self):
+        """Clear local values (e.g. in a freshly forked worker)"""
+        with self._lock:
+            for metric in self.metrics.values():
+                metric.values = {}
+        self._last_flush = 0.0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: [[list(key), list(value) if isinstance(value, list) else value]
+                       for key, value in metric.values.items()]
+                for name, metric in self.metrics.items()
+            }
+
+    # Cross-worker aggregation
+    def _path(self, pid):
+        return os.path.join(self.directory, f"metrics_{pid}.json")
+
+    def flush(self, force=False):
+        """Write this worker's snapshot, at most once per flush_interval unless forced"""
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        path = self._path(os.getpid())
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def _merge(self, merged, snapshot, include_gauges=True):
+        for name, entries in snapshot.items():
+            metric = self.metrics.get(name)
+            if metric is None or (metric.kind == 'gauge' and not include_gauges):
+                continue
+            target = merged.setdefault(name, {})
+            for key, value in entries:
+                key = tuple(key)
+                if isinstance(value, list):
+                    current = target.get(key)
+                    if current is None or len(current) != len(value):
+                        target[key] = list(value)
+                    else:
+                        target[key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target[key] = target.get(key, 0) + value
+
+    @staticmethod
+    def _pid_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _read_snapshots(self):
+        """Return live worker snapshots, folding exited workers into the archive"""
+        archive_path = os.path.join(self.directory, "metrics_archive.json")
+        lock_path = os.path.join(self.directory, "metrics.lock")
+        live = []
+        with open(lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(archive_path) as f:
+                        archive = json.load(f)
+                except (OSError, ValueError):
+                    archive = {}
+                archived = {}
+                self._merge(archived, archive)
+                dead = []
+                for filename in os.listdir(self.directory):
+                    if not (filename.startswith("metrics_") and filename.endswith(".json")):
+                        continue
+                    pid = filename[len("metrics_"):-len(".json")]
+                    if not pid.isdigit():
+                        continue
+                    try:
+                        with open(os.path.join(self.directory, filename)) as f:
+                            snapshot = json.load(f)
+                    except (OSError, ValueError):
+                        continue
+                    if int(pid) == os.getpid() or self._pid_alive(int(pid)):
+                        live.append(snapshot)
+                    else:
+                        # Keep counters/histograms of exited workers, drop their gauges
+                        self._merge(archived, snapshot, include_gauges=False)
+                        dead.append(filename)
+                if dead:
+                    tmp_path = f"{archive_path}.tmp"
+                    with open(tmp_path, 'w') as f:
+                        json.dump({name: [[list(k), v] for k, v in values.items()]
+                                   for name, values in archived.items()}, f)
+                    os.replace(tmp_path, archive_path)
+                    for filename in dead:
+                        try:
+                            os.remove(os.path.join(self.directory, filename))
+                        except OSError:
+                            pass
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return archived, live
+
+    def collect(self):
+        """Merged {metric name: {label values: value}} across all workers"""
+        if not self.directory:
+            merged = {}
+            self._merge(merged, self.snapshot())
+            return merged
+        self.flush(force=True)
+        try:
+            merged, live = self._read_snapshots()
+        except OSError:
+            merged, live = {}, [self.snapshot()]
+        for snapshot in live:
+            self._merge(merged, snapshot)
+        return merged
+
+    # Exposition
+    @staticmethod
+    def _labels(names, values, extra=None):
+        pairs = list(zip(names, values))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ''
+        escaped = (f'{name}="{_escape(value)}"' for name, value in pairs)
+        return '{' + ','.join(escaped) + '}'
+
+    @staticmethod
+    def _number(value):
+        if value == float('inf'):
+            return '+Inf'
+        return repr(float(value)) if isinstance(value, float) else str(value)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        merged = self.collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for key, value in sorted(merged.get(name, {}).items()):
+                if metric.kind != 'histogram':
+                    lines.append(f"{name}{self._labels(metric.labelnames, key)} {self._number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float('inf'),), value[:-2] + [None]):
+                    cumulative = value[-1] if count is None else cumulative + count
+                    le = ('le', self._number(float(bound)))
+                    lines.append(f"{name}_bucket{self._labels(metric.labelnames, key, le)} {cumulative}")
+                lines.append(f"{name}_sum{self._labels(metric.labelnames, key)} {self._number(value[-2])}")
+                lines.append(f"{name}_count{self._labels(metric.labelnames, key)} {value[-1]}")
+        return '\n'.join(lines) + '\n'
+
+# Global metrics registry
+metrics_registry = MetricsRegistry(
+    directory=config.METRICS_DIR or None,
+    flush_interval=config.METRICS_FLUSH_SECONDS
+)
+
+HTTP_REQUESTS = metrics_registry.counter(
+    'http_requests_total', 'HTTP requests handled', ('method', 'route', 'status'))
+HTTP_LATENCY = metrics_registry.histogram(
+    'http_request_duration_seconds', 'HTTP request latency', ('method', 'route'))
+HTTP_IN_FLIGHT = metrics_registry.gauge(
+    'http_requests_in_flight', 'HTTP requests currently being handled')
+TRADING_AI_LATENCY = metrics_registry.histogram(
+    'trading_ai_duration_seconds', 'TradingAI call latency', ('operation', 'outcome'))
+TRADING_AI_STAGE_LATENCY = metrics_registry.histogram(
+    'trading_ai_stage_duration_seconds', 'TradingAI recommendation stage latency', ('stage',))
+DB_LATENCY = metrics_registry.histogram(
+    'db_query_duration_seconds', 'Database query latency', ('operation', 'outcome'))
+WEBHOOK_EVENTS = metrics_registry.counter(
+    'webhook_events_total', 'Webhook events by provider and outcome', ('provider', 'outcome'))
+JOB_EVENTS = metrics_registry.counter(
+    'job_events_total', 'Background jobs by kind and outcome', ('kind', 'outcome'))
+OUTBOUND_LATENCY = metrics_registry.histogram(
+    'outbound_http_duration_seconds', 'Outbound HTTP call latency', ('service', 'outcome'),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+
+@contextmanager
+def timed(histogram, **labels):
+    """Time a block into histogram, labelling it outcome=ok|error"""
+    start = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        histogram.observe(time.perf_counter() - start, outcome=outcome, **labels)
+
+def timed_async(histogram, **labels):
+    """Decorator timing a coroutine function into histogram"""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with timed(histogram, **labels):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def track_outbound(service):
+    """Time a call to an external HTTP service (stripe, coinbase, etherscan, ...)"""
+    return timed(OUTBOUND_LATENCY, service=service)
+
+def _route_label():
+    # Use the URL rule, not the raw path, to keep label cardinality bounded
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+def _start_request_timer():
+    request.metrics_start = time.perf_counter()
+    HTTP_IN_FLIGHT.inc()
+
+def _record_request(response):
+    start = getattr(request, 'metrics_start', None)
+    if start is not None:
+        route = _route_label()
+        HTTP_LATENCY.observe(time.perf_counter() - start, method=request.method, route=route)
+        HTTP_REQUESTS.inc(method=request.method, route=route, status=response.status_code)
+    return response
+
+def _finish_request(exc=None):
+    if getattr(request, 'metrics_start', None) is not None:
+        HTTP_IN_FLIGHT.dec()
+        request.metrics_start = None
+    metrics_registry.flush()
+
+def metrics_endpoint():
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4')
+
+# A scrape every 15s would exhaust the default limits (what limiter.exempt sets)
+metrics_endpoint._rate_limit_exempt = True
+
+def init_metrics(app):
+    """Register request instrumentation and the /metrics endpoint on app"""
+    # Ahead of the rate limiter's check, so throttled requests are counted and timed too
+    app.before_request_funcs.setdefault(None, []).insert(0, _start_request_timer)
+    app.after_request(_record_request)
+    app.teardown_request(_finish_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint, methods=['GET'])
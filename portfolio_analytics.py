@@ -0,0 +1,305 @@
+"""
+Portfolio analytics for TradingAI.
+
+PriceHistoryStore keeps a rolling window of per-period returns for the whole
+asset universe, plus running sums and cross-products, so the covariance
+matrix is updated incrementally as each period's prices arrive and is only
+recomputed from those sums when next read. In the app, new periods come from
+the price feed (price_feed.py). analyze_holdings turns holdings
+into weights, concentration, volatility, covariance risk and
+correlation-based diversification with NumPy.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Annualized portfolio volatility treated as maximum risk (crypto majors run 60-100%)
+RISK_VOLATILITY_CEILING = 1.5
+# Largest single position before concentration is flagged
+MAX_POSITION_WEIGHT = 0.4
+# Weighted average pairwise correlation above which holdings count as one bet
+HIGH_CORRELATION = 0.7
+HEALTH_LEVELS = ((0.75, "excellent"), (0.55, "good"), (0.35, "fair"))
+
+class PriceHistoryStore:
+    """Rolling per-period returns for an asset universe with an incrementally maintained covariance"""
+
+    def __init__(self, window: int = 90, periods_per_year: int = 365):
+        if window < 2:
+            raise ValueError("window must be at least 2 periods")
+        self.window = window
+        self.periods_per_year = periods_per_year
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.last_timestamp = None
+        self._lock = threading.RLock()
+        self._reset(0)
+
+    def _reset(self, size: int):
+        self._returns = np.zeros((self.window, size))  # ring buffer, one row per period
+        self._count = 0
+        self._next = 0
+        self._sum = np.zeros(size)
+        self._cross = np.zeros((size, size))
+        self._last_prices = np.full(size, np.nan)
+        self._covariance = None
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @property
+    def periods(self) -> int:
+        return self._count
+
+    def _add_symbols(self, symbols: Sequence[str]):
+        new = [symbol for symbol in symbols if symbol not in self.index]
+        if not new:
+            return
+        for symbol in new:
+            self.index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        # New assets join with zero returns for the periods before they were listed
+        extra = len(new)
+        self._returns = np.pad(self._returns, ((0, 0), (0, extra)))
+        self._sum = np.pad(self._sum, (0, extra))
+        self._cross = np.pad(self._cross, ((0, extra), (0, extra)))
+        self._last_prices = np.pad(self._last_prices, (0, extra), constant_values=np.nan)
+        self._covariance = None
+
+    def append(self, prices: Dict[str, float], timestamp=None):
+        """Add one period of prices; O(universe^2) to keep the cross-product sums current"""
+        with self._lock:
+            self._add_symbols(list(prices))
+            current = np.full(len(self.symbols), np.nan)
+            for symbol, price in prices.items():
+                if price is not None and price > 0:
+                    current[self.index[symbol]] = price
+            previous = self._last_prices
+            seen = np.isfinite(previous) & np.isfinite(current)
+            self._last_prices = np.where(np.isfinite(current), current, previous)
+            self.last_timestamp = timestamp
+            if not np.isfinite(previous).any():
+                return  # the first prices only set the baseline
+            # Assets without a price on both sides count as flat this period
+            returns = np.zeros(len(self.symbols))
+            np.divide(current, previous, out=returns, where=seen)
+            returns[seen] -= 1.0
+            self._push(returns)
+
+    def _push(self, returns):
+        if self._count == self.window:
+            oldest = self._returns[self._next]
+            self._sum -= oldest
+            self._cross -= np.outer(oldest, oldest)
+        else:
+            self._count += 1
+        self._returns[self._next] = returns
+        self._sum += returns
+        self._cross += np.outer(returns, returns)
+        self._next = (self._next + 1) % self.window
+        self._covariance = None
+
+    def load(self, symbols: Sequence[str], prices, timestamps=None):
+        """Replace the store with a price matrix (periods x symbols, NaN where unlisted)"""
+        prices = np.asarray(prices, dtype=np.float64)
+        if prices.ndim != 2 or prices.shape[1] != len(symbols):
+            raise ValueError("prices must be a periods x symbols matrix")
+        with self._lock:
+            self.symbols = list(symbols)
+            self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+            self._reset(len(self.symbols))
+            valid = np.isfinite(prices) & (prices > 0)
+            returns = np.zeros((max(len(prices) - 1, 0), len(self.symbols)))
+            both = valid[1:] & valid[:-1]
+            np.divide(prices[1:], prices[:-1], out=returns, where=both)
+            returns[both] -= 1.0
+            recent = returns[-self.window:]
+            self._count = len(recent)
+            self._returns[:self._count] = recent
+            self._next = self._count % self.window
+            self._sum = recent.sum(axis=0)
+            self._cross = recent.T @ recent
+            # Latest listed price per symbol, as the baseline for the next append
+            if len(prices):
+                last_row = len(prices) - 1 - np.argmax(valid[::-1], axis=0)
+                latest = prices[last_row, np.arange(len(self.symbols))]
+                self._last_prices = np.where(valid.any(axis=0), latest, np.nan)
+            self.last_timestamp = timestamps[-1] if timestamps is not None and len(timestamps) else None
+
+    @classmethod
+    def from_file(cls, path: str, window: int = 90, periods_per_year: int = 365) -> "PriceHistoryStore":
+        """Load an .npz holding symbols, prices (periods x symbols) and optional timestamps"""
+        store = cls(window, periods_per_year)
+        with np.load(path, allow_pickle=False) as data:
+            store.load([str(symbol) for symbol in data["symbols"]], data["prices"],
+                       data["timestamps"] if "timestamps" in data else None)
+        return store
+
+    def covariance(self):
+        """Per-period sample covariance of the universe, rebuilt from the running sums only when stale"""
+        with self._lock:
+            if self._covariance is None:
+                n = self._count
+                if n < 2:
+                    self._covariance = np.zeros_like(self._cross)
+                else:
+                    mean = self._sum / n
+                    self._covariance = (self._cross - n * np.outer(mean, mean)) / (n - 1)
+            return self._covariance
+
+    def window_returns(self):
+        """Returns currently in the window (row order is not chronological)"""
+        with self._lock:
+            return self._returns[:self._count]
+
+    def risk(self, indices, weights) -> Dict[str, Any]:
+        """Per-asset and portfolio per-period statistics for weights on the given universe columns"""
+        with self._lock:
+            n = self._count
+            mean = self._sum[indices] / n
+            # Small portfolios read the cached covariance; large ones go through the
+            # returns window, which costs O(window x positions) instead of O(positions^2)
+            if len(indices) <= self.window:
+                covariance = self.covariance()[np.ix_(indices, indices)]
+                variances = np.diag(covariance).copy()
+                marginal = covariance @ weights
+            else:
+                centered = self._returns[:n, indices] - mean
+                variances = np.einsum("ij,ij->j", centered, centered) / (n - 1)
+                marginal = centered.T @ (centered @ weights) / (n - 1)
+        return {
+            "mean": mean,
+            "volatility": np.sqrt(np.maximum(variances, 0.0)),
+            "marginal": marginal,
+            "variance": float(weights @ marginal),
+            "window_return": self.window_return(indices)
+        }
+
+    def window_return(self, indices):
+        """Compounded return of each column over the window"""
+        with self._lock:
+            return np.prod(1.0 + self._returns[:self._count, indices], axis=0) - 1.0
+
+def _aggregate_holdings(holdings: List[Dict[str, Any]]) -> Dict[str, float]:
+    values: Dict[str, float] = {}
+    for holding in holdings:
+        symbol = str(holding.get("symbol") or holding.get("token") or "UNKNOWN").upper()
+        values[symbol] = values.get(symbol, 0.0) + float(holding.get("value", 0) or 0)
+    return values
+
+def _health(score: float) -> str:
+    for threshold, label in HEALTH_LEVELS:
+        if score > threshold:
+            return label
+    return "poor"
+
+def analyze_holdings(holdings: List[Dict[str, Any]], store: Optional[PriceHistoryStore] = None,
+                     benchmark: Optional[str] = "BTC", top: int = 10) -> Dict[str, Any]:
+    """Weights, concentration (HHI), volatility, covariance risk and diversification for holdings"""
+    values = _aggregate_holdings(holdings)
+    symbols = [symbol for symbol, value in values.items() if value > 0]
+    amounts = np.array([values[symbol] for symbol in symbols], dtype=np.float64)
+    total_value = sum(values.values())
+    invested = float(amounts.sum())
+    if invested <= 0:
+        return {
+            "overall_health": "poor", "diversification_score": 0.0, "risk_score": None,
+            "expected_return": None, "recommendations": ["Add positions to analyze"],
+            "total_value": total_value, "positions": 0, "performance_vs_market": None
+        }
+
+    weights = amounts / invested
+    hhi = float(weights @ weights)
+    order = np.argsort(-weights)
+    recommendations = []
+    largest = int(order[0])
+    if weights[largest] > MAX_POSITION_WEIGHT and len(symbols) > 1:
+        recommendations.append(f"Reduce concentration in {symbols[largest]} "
+                               f"({weights[largest]:.0%} of the portfolio)")
+    elif len(symbols) == 1:
+        recommendations.append("Single-asset portfolio: diversify across uncorrelated assets")
+
+    have_history = store is not None and store.periods >= 2
+    covered = [i for i, symbol in enumerate(symbols) if have_history and symbol in store.index]
+    covered_set = set(covered)
+    missing = [symbol for i, symbol in enumerate(symbols) if i not in covered_set]
+
+    analysis: Dict[str, Any] = {
+        "total_value": total_value,
+        "positions": len(symbols),
+        "hhi": round(hhi, 4),
+        "effective_positions": round(1 / hhi, 2),
+        "volatility": None,
+        "risk_score": None,
+        "expected_return": None,
+        "average_correlation": None,
+        "diversification_ratio": None,
+        "performance_vs_market": None,
+        "history_coverage": round(float(weights[covered].sum()), 4) if covered else 0.0
+    }
+
+    correlation_penalty = 0.0
+    risk_score = None
+    top_rows = {}
+    if covered:
+        covered_weights = weights[covered] / weights[covered].sum()
+        indices = np.array([store.index[symbols[i]] for i in covered])
+        stats = store.risk(indices, covered_weights)
+        annualize = store.periods_per_year
+        volatility = stats["volatility"]
+        portfolio_volatility = float(np.sqrt(max(stats["variance"], 0.0)))
+        weighted_volatility = float(covered_weights @ volatility)
+        own_variance = float((covered_weights * volatility) @ (covered_weights * volatility))
+        cross = weighted_volatility ** 2 - own_variance
+        average_correlation = (stats["variance"] - own_variance) / cross if cross > 1e-18 else None
+
+        annual_volatility = portfolio_volatility * np.sqrt(annualize)
+        risk_score = min(1.0, annual_volatility / RISK_VOLATILITY_CEILING)
+        analysis.update({
+            "volatility": round(annual_volatility, 4),
+            "risk_score": round(risk_score, 4),
+            "expected_return": round(float(covered_weights @ stats["mean"]) * annualize, 4),
+            "average_correlation": None if average_correlation is None else round(average_correlation, 4),
+            "diversification_ratio": (round(weighted_volatility / portfolio_volatility, 4)
+                                      if portfolio_volatility > 0 else None)
+        })
+        if average_correlation is not None:
+            correlation_penalty = min(max(average_correlation, 0.0), 1.0)
+            if average_correlation > HIGH_CORRELATION:
+                recommendations.append(f"Holdings are highly correlated ({average_correlation:.2f}): "
+                                       f"they will tend to fall together")
+        if benchmark and benchmark in store.index:
+            benchmark_return = float(store.window_return(np.array([store.index[benchmark]]))[0])
+            analysis["performance_vs_market"] = round(float(covered_weights @ stats["window_return"])
+                                                      - benchmark_return, 4)
+        # Share of portfolio variance each position contributes
+        contributions = (covered_weights * stats["marginal"] / stats["variance"]
+                         if stats["variance"] > 0 else np.zeros(len(covered)))
+        volatile = [symbols[covered[i]] for i in np.argsort(-contributions)[:3]
+                    if contributions[i] > 0.25 and len(covered) > 1]
+        if risk_score > 0.6 and volatile:
+            recommendations.append(f"Reduce exposure to the main risk drivers: {', '.join(volatile)}")
+        position_of = {position: i for i, position in enumerate(covered)}
+        for position in order[:top]:
+            i = position_of.get(int(position))
+            if i is not None:
+                top_rows[int(position)] = {"volatility": round(float(volatility[i]) * np.sqrt(annualize), 4),
+                                           "risk_contribution": round(float(contributions[i]), 4)}
+
+    if missing:
+        shown = ", ".join(missing[:5]) + (f" and {len(missing) - 5} more" if len(missing) > 5 else "")
+        recommendations.append(f"No price history for {shown}; risk figures exclude them")
+
+    diversification_score = (1 - hhi) * (1 - correlation_penalty)
+    health_inputs = [diversification_score] + ([1 - risk_score] if risk_score is not None else [])
+    analysis["diversification_score"] = round(diversification_score, 4)
+    analysis["overall_health"] = _health(sum(health_inputs) / len(health_inputs))
+    analysis["top_holdings"] = [
+        {"symbol": symbols[i], "value": float(amounts[i]), "weight": round(float(weights[i]), 4),
+         **top_rows.get(int(i), {"volatility": None, "risk_contribution": None})}
+        for i in order[:top]
+    ]
+    analysis["recommendations"] = recommendations or ["Portfolio is well balanced; rebalance periodically"]
+    return analysis
@@ -0,0 +1,78 @@
+"""
+Copy-on-write friendly worker model for pre-fork servers (gunicorn --preload).
+
+With --preload, gunicorn imports the app once in the master and forks the
+workers from it. preload() runs in the master just before the first fork. It
+builds what every worker would otherwise build for itself: compiled
+templates, the payment SDK modules, the whitelist index and the TradingAI
+model. Then it collects garbage and freezes the heap (gc.freeze), so the
+workers' collectors never write to those objects and the pages stay shared.
+
+after_fork() runs first thing in each worker. It replaces what must not
+cross a fork: the log writer thread and its queue, the async bridge's event
+loop and executor, and metric values recorded by the master. Connections
+(database, rate-limit store, webhook inbox) are opened per process already.
+
+Everything here is imported lazily so gunicorn.conf.py stays cheap to load.
+"""
+
+import asyncio
+import gc
+import time
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_preloaded = False
+
+def preload(app):
+    """Build the shared state in the master and freeze it; call once, right before forking"""
+    global _preloaded
+    from app_factory import warm_up
+    from startup import resolve, startup_report
+
+    start = time.perf_counter()
+    roles = app.config['APP_ROLES']
+
+    env = app.jinja_env
+    for name in env.list_templates():
+        env.get_template(name)
+
+    if 'payments' in roles:
+        from blueprints import payments
+        for module in (payments.stripe, payments.coinbase_commerce):
+            try:
+                resolve(module)
+            except ImportError as e:
+                logger.warning("Payment SDK not preloaded", error=str(e))
+
+    # Whitelist index and TradingAI model; workers skip the stages finished here
+    asyncio.run(warm_up(roles))
+
+    gc.collect()
+    gc.freeze()
+    _preloaded = True
+    seconds = time.perf_counter() - start
+    startup_report.mark('preload', 'done', seconds, frozen_objects=gc.get_freeze_count())
+    logger.info("Preloaded app state for workers", seconds=round(seconds, 3),
+                frozen_objects=gc.get_freeze_count())
+
+def after_fork(app):
+    """Recreate per-process resources in a worker forked from a preloaded master"""
+    if not _preloaded:
+        # Without --preload each worker imports the app itself after the fork
+        return
+    from metrics import metrics_registry
+    from utils import async_helper
+
+    app.extensions['log_pipeline'].after_fork()
+    async_helper.after_fork()
+    metrics_registry.reset()
+
+def start_worker(app):
+    """Start the worker's background warm-up at boot rather than on its first request"""
+    if 'APP_ROLES' not in getattr(app, 'config', {}):
+        return
+    from app_factory import start_warm_up
+    start_warm_up(app)
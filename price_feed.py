@@ -0,0 +1,129 @@
+"""
+Daily price feed behind portfolio risk analytics.
+
+Discovery workers (discovery_worker.py) run one `prices` job per
+PRICE_PERIOD_SECONDS window: it fetches the USD price of every
+PRICE_FEED_ASSETS coin from CoinGecko and stores it in price_history,
+keyed by the start of the period. The dedupe key prices:<period> lets
+exactly one worker fetch each period.
+
+Processes serving the ai role call sync() every PRICE_HISTORY_SYNC_SECONDS.
+It appends the periods stored since the last sync to TradingAI's
+PriceHistoryStore, so the covariance is updated incrementally from the
+running sums. A process without PRICE_HISTORY_FILE starts from the last
+PRICE_HISTORY_WINDOW periods in the table.
+"""
+
+import logging
+import time
+
+import requests
+
+from config import get_config
+from metrics import track_outbound
+from utils import db_manager
+
+config = get_config()
+logger = logging.getLogger(__name__)
+
+# One implicit transaction; the advisory lock stops workers booting together from racing
+PRICE_HISTORY_SCHEMA = """
+    SELECT pg_advisory_xact_lock(hashtext('price_history_schema'));
+    CREATE TABLE IF NOT EXISTS price_history (
+        period BIGINT NOT NULL,
+        symbol VARCHAR(20) NOT NULL,
+        price DOUBLE PRECISION NOT NULL,
+        PRIMARY KEY (period, symbol)
+    );
+"""
+
+_schema_ready = False
+
+def ensure_schema():
+    global _schema_ready
+    if not _schema_ready:
+        db_manager.safe_execute(PRICE_HISTORY_SCHEMA)
+        _schema_ready = True
+
+def price_period(now=None):
+    """Epoch seconds at the start of the period containing now"""
+    now = time.time() if now is None else now
+    return int(now // config.PRICE_PERIOD_SECONDS) * config.PRICE_PERIOD_SECONDS
+
+def fetch_prices(assets):
+    """USD price per symbol for {symbol: coingecko_id}; coins CoinGecko does not price are left out"""
+    with track_outbound('coingecko'):
+        response = requests.get(
+            f'{config.COINGECKO_API_URL}/simple/price',
+            params={'ids': ','.join(assets.values()), 'vs_currencies': 'usd'},
+            timeout=10
+        )
+    response.raise_for_status()
+    data = response.json()
+    return {symbol: data[coin]['usd'] for symbol, coin in assets.items()
+            if coin in data and data[coin].get('usd')}
+
+def store_prices(period, prices):
+    ensure_schema()
+    for symbol, price in prices.items():
+        db_manager.safe_execute(
+            """INSERT INTO price_history (period, symbol, price) VALUES (%s, %s, %s)
+               ON CONFLICT (period, symbol) DO UPDATE SET price = EXCLUDED.price""",
+            (period, symbol, float(price))
+        )
+
+def ingest(job):
+    """Job handler: store this period's prices (raises to have the job retried)"""
+    prices = fetch_prices(config.PRICE_FEED_ASSETS)
+    if not prices:
+        raise RuntimeError("CoinGecko returned no prices")
+    store_prices(job.payload['period'], prices)
+    logger.info(f"Stored {len(prices)} prices for period {job.payload['period']}")
+
+def schedule_ingest(queue, priority=0):
+    """Queue this period's price fetch; the dedupe key lets one worker through"""
+    period = price_period()
+    return queue.enqueue('prices', {'period': period}, priority=priority, dedupe_key=f'prices:{period}')
+
+def _epoch(timestamp):
+    """Epoch seconds of a store timestamp (epoch number, ISO string, datetime, datetime64), or None"""
+    if timestamp is None:
+        return None
+    import numpy as np
+    try:
+        return int(np.datetime64(timestamp, 's').astype(np.int64))
+    except (TypeError, ValueError):
+        return None
+
+def sync(store=None, window=90):
+    """Append stored periods newer than the store's last one; returns the store (created if None)"""
+    from portfolio_analytics import PriceHistoryStore
+
+    ensure_schema()
+    if store is None:
+        store = PriceHistoryStore(window=window)
+    after = _epoch(store.last_timestamp)
+    if after is None and store.periods:
+        # History from a file without usable timestamps: continue from now on
+        after = price_period() - 1
+    if after is None:
+        rows = db_manager.safe_execute(
+            """SELECT period, symbol, price FROM price_history
+               WHERE period >= (SELECT COALESCE(MIN(period), 0) FROM (
+                   SELECT DISTINCT period FROM price_history ORDER BY period DESC LIMIT %s) recent)
+               ORDER BY period""",
+            (store.window + 1,), fetch=True
+        )
+    else:
+        rows = db_manager.safe_execute(
+            "SELECT period, symbol, price FROM price_history WHERE period > %s ORDER BY period",
+            (after,), fetch=True
+        )
+    periods = {}
+    for period, symbol, price in rows:
+        periods.setdefault(period, {})[symbol] = price
+    for period, prices in periods.items():
+        store.append(prices, timestamp=period)
+    if periods:
+        logger.info(f"Appended {len(periods)} price periods; {store.periods} in the window")
+    return store
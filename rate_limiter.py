@@ -0,0 +1,453 @@
+"""
+Two-tier rate limiting shared across gunicorn workers.
+
+Each worker admits requests by spending tokens it has leased from a shared
+store, so the usual check is a dictionary lookup under a lock and never waits
+on storage. Leases are a fraction of the limit divided by the number of live
+workers. A background thread tops up busy leases and hands back idle ones in
+one batched round trip per sync interval, and an exiting worker returns what
+it still holds; a worker only calls the store inline for a client's first
+request in a window or when its lease runs dry.
+The store never grants past the limit, so all workers together admit at most
+the configured number of requests. If the store is unreachable each worker
+falls back to enforcing its own share of the limit.
+
+Limits use Flask-Limiter's syntax ("50 per hour") and semantics: fixed
+windows, one counter per route, and route limits replace the defaults.
+Clients are keyed on the verified JWT user_id (which is also the user's API
+key), falling back to the remote address for anonymous requests.
+
+Shared stores:
+    redis://...          Redis (needs the redis package), for several hosts
+    sqlite:///path.db    a SQLite file, for the workers of one host
+    memory://            this process only
+"""
+
+import atexit
+import logging
+import math
+import os
+import re
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+from flask import current_app, request
+from werkzeug.exceptions import TooManyRequests
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+from utils import verify_jwt_token
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400, 'month': 2592000, 'year': 31536000}
+_LIMIT_RE = re.compile(r'^\s*(\d+)\s*(?:per|/)\s*(\d+)?\s*(second|minute|hour|day|month|year)s?\s*$', re.I)
+
+def parse_limits(spec):
+    """'200 per day; 50 per hour' -> ((200, 86400, '200 per day'), (50, 3600, '50 per hour'))"""
+    limits = []
+    for part in filter(None, (p.strip() for p in re.split(r'[;,]', spec))):
+        match = _LIMIT_RE.match(part)
+        if not match:
+            raise ValueError(f"Invalid rate limit: {part!r}")
+        amount, multiple, unit = match.groups()
+        limits.append((int(amount), int(multiple or 1) * _PERIODS[unit.lower()], part))
+    return tuple(limits)
+
+def rate_limit_key():
+    """Verified JWT user_id when present, otherwise the client address"""
+    token = request.headers.get('Authorization')
+    if token:
+        payload = verify_jwt_token(token)  # served from the token cache after the first request
+        if payload and payload.get('user_id'):
+            return f"user:{payload['user_id']}"
+    return f"ip:{request.remote_addr}"
+
+# Shared stores: acquire(worker_id, requests, now) -> ({counter key: tokens granted}, active workers)
+# where requests maps counter key -> (tokens wanted, limit, window end). A negative
+# request hands unused tokens back. Grants never take a counter past its limit.
+class MemoryStore:
+    """Process-local store (single worker, tests)"""
+
+    def __init__(self):
+        self._counts = {}
+
+    def acquire(self, worker_id, requests, now):
+        grants = {}
+        for key, (want, amount, expires_at) in requests.items():
+            count = self._counts.get(key, (0, expires_at))[0]
+            grant = want if want < 0 else max(0, min(want, amount - count))
+            self._counts[key] = (count + grant, expires_at)
+            grants[key] = grant
+        self._counts = {k: v for k, v in self._counts.items() if v[1] > now}
+        return grants, 1
+
+class SQLiteStore:
+    """Counters in a SQLite file shared by every worker on this host"""
+
+    def __init__(self, path, worker_ttl):
+        self.path = path
+        self.worker_ttl = worker_ttl
+        self._local = threading.local()
+        self._next_prune = 0.0
+
+    def _connection(self):
+        # One handle per thread; a forked child opens its own
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=OFF")  # counters are expendable, unlike the app's data
+            db.execute("CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL)")
+            db.execute("CREATE TABLE IF NOT EXISTS workers (id TEXT PRIMARY KEY, seen_at REAL NOT NULL)")
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+    def acquire(self, worker_id, requests, now):
+        db = self._connection()
+        grants = {}
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for key, (want, amount, expires_at) in requests.items():
+                row = db.execute("SELECT count FROM counters WHERE key = ?", (key,)).fetchone()
+                count = row[0] if row else 0
+                grant = want if want < 0 else max(0, min(want, amount - count))
+                if grant:
+                    db.execute(
+                        """INSERT INTO counters (key, count, expires_at) VALUES (?, ?, ?)
+                           ON CONFLICT (key) DO UPDATE SET count = count + excluded.count""",
+                        (key, grant, expires_at)
+                    )
+                grants[key] = grant
+            db.execute("INSERT OR REPLACE INTO workers (id, seen_at) VALUES (?, ?)", (worker_id, now))
+            if now >= self._next_prune:
+                db.execute("DELETE FROM counters WHERE expires_at <= ?", (now,))
+                db.execute("DELETE FROM workers WHERE seen_at <= ?", (now - self.worker_ttl,))
+                self._next_prune = now + 60
+            workers = db.execute("SELECT COUNT(*) FROM workers WHERE seen_at > ?",
+                                 (now - self.worker_ttl,)).fetchone()[0]
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return grants, workers
+
+# KEYS: counters; ARGV: want, limit, window end (epoch seconds) per key
+_REDIS_ACQUIRE = """
+local grants = {}
+for i, key in ipairs(KEYS) do
+    local want = tonumber(ARGV[i * 3 - 2])
+    local grant = want
+    if want >= 0 then
+        local count = tonumber(redis.call('GET', key) or '0')
+        grant = math.max(0, math.min(want, tonumber(ARGV[i * 3 - 1]) - count))
+    end
+    if grant ~= 0 then
+        redis.call('INCRBY', key, grant)
+        redis.call('EXPIREAT', key, ARGV[i * 3])
+    end
+    grants[i] = grant
+end
+return grants
+"""
+
+class RedisStore:
+    """Counters in Redis, shared by every worker on every host"""
+
+    def __init__(self, url, worker_ttl, prefix='ratelimit:'):
+        self.client = redis.Redis.from_url(url, socket_timeout=2)
+        self.worker_ttl = worker_ttl
+        self.prefix = prefix
+        self._acquire = self.client.register_script(_REDIS_ACQUIRE)
+
+    def acquire(self, worker_id, requests, now):
+        keys = list(requests)
+        args = []
+        for key in keys:
+            want, amount, expires_at = requests[key]
+            args.extend((want, amount, int(expires_at) + 1))
+        workers_key = self.prefix + 'workers'
+        pipe = self.client.pipeline(transaction=False)
+        if keys:
+            self._acquire(keys=[self.prefix + key for key in keys], args=args, client=pipe)
+        pipe.zadd(workers_key, {worker_id: now})
+        pipe.zremrangebyscore(workers_key, '-inf', now - self.worker_ttl)
+        pipe.zcard(workers_key)
+        results = pipe.execute()
+        grants = dict(zip(keys, map(int, results[0]))) if keys else {}
+        return grants, int(results[-1])
+
+def create_store(url, worker_ttl):
+    scheme = urlparse(url).scheme
+    if scheme in ('redis', 'rediss'):
+        if redis is not None:
+            return RedisStore(url, worker_ttl)
+        logger.warning("redis package not installed; rate limits are shared through SQLite on this host only")
+        url = 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'whale-tracker-ratelimit.db')
+        scheme = 'sqlite'
+    if scheme == 'sqlite':
+        return SQLiteStore(url[len('sqlite:///'):] or ':memory:', worker_ttl)
+    if scheme == 'memory':
+        return MemoryStore()
+    raise ValueError(f"Unsupported rate limit storage: {url}")
+
+class _Window:
+    """Local tokens for one counter (route, limit, client) in the current fixed window"""
+
+    __slots__ = ('key', 'window', 'expires_at', 'amount', 'tokens', 'exhausted', 'local', 'last_hit')
+
+    def __init__(self, key, window, expires_at, amount):
+        self.key = key              # shared store key, unique per window
+        self.window = window
+        self.expires_at = expires_at
+        self.amount = amount
+        self.tokens = 0             # leased from the store, not yet spent
+        self.exhausted = False      # the store has nothing left for this window
+        self.local = False          # tokens are this worker's fallback share, not leased
+        self.last_hit = 0.0
+
+class TwoTierLimiter:
+    """Drop-in for the Flask-Limiter features this app uses: default_limits, limit() and exempt"""
+
+    def __init__(self, app=None, key_func=rate_limit_key, default_limits=(), storage_uri='memory://',
+                 sync_interval=1.0, enabled=True):
+        self.key_func = key_func
+        self.default_limits = parse_limits('; '.join(default_limits))
+        self.sync_interval = sync_interval
+        self.idle_release = sync_interval * 10
+        self.enabled = enabled
+        self.store = create_store(storage_uri, worker_ttl=max(5.0, sync_interval * 5))
+        self.workers = 1
+        self.worker_id = None
+        self.allowed = 0
+        self.limited = 0
+        self.refills = 0
+        self.sync_failures = 0
+        self._store_healthy = True
+        self._windows = {}
+        self._endpoint_limits = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Shared by every app in the process; limits are looked up on the current app
+        app.before_request(self.check)
+
+    # Decorators (limits are stored on the view and resolved once per endpoint)
+    def limit(self, spec):
+        limits = parse_limits(spec)
+
+        def decorator(f):
+            f._rate_limits = getattr(f, '_rate_limits', ()) + limits
+            return f
+        return decorator
+
+    def exempt(self, f):
+        f._rate_limit_exempt = True
+        return f
+
+    def _limits_for(self, endpoint):
+        try:
+            return self._endpoint_limits[endpoint]
+        except KeyError:
+            view = current_app.view_functions.get(endpoint)
+            if view is None or getattr(view, '_rate_limit_exempt', False):
+                limits = ()
+            else:
+                limits = getattr(view, '_rate_limits', None) or self.default_limits
+            self._endpoint_limits[endpoint] = limits
+            return limits
+
+    # Hot path
+    def check(self):
+        """before_request hook: spend a local token or raise 429"""
+        if not self.enabled:
+            return None
+        endpoint = request.endpoint
+        limits = self._limits_for(endpoint)
+        if not limits:
+            return None
+        if self._pid != os.getpid():
+            self._start()
+        retry_after = self.hit(endpoint, limits, self.key_func(), time.time())
+        if retry_after is not None:
+            raise TooManyRequests("Rate limit exceeded", retry_after=retry_after)
+        return None
+
+    def hit(self, scope, limits, key, now):
+        """Admit one request against every limit; returns None or seconds to wait"""
+        for _ in range(2):
+            with self._lock:
+                states = []
+                empty = []
+                for amount, period, text in limits:
+                    window = int(now // period)
+                    counter_key = f"{scope}|{text}|{key}"
+                    state = self._windows.get(counter_key)
+                    if state is None or state.window != window:
+                        state = _Window(f"{counter_key}|{window}", window, (window + 1) * period, amount)
+                        self._windows[counter_key] = state
+                    if state.tokens <= 0:
+                        if state.exhausted:
+                            self.limited += 1
+                            return max(1, math.ceil(state.expires_at - now))
+                        empty.append(state)
+                    states.append(state)
+                if not empty:
+                    for state in states:
+                        state.tokens -= 1
+                        state.last_hit = now
+                    self.allowed += 1
+                    return None
+            # Slow path: first request for this client in this worker, or the lease ran out
+            self._refill(empty, now)
+        self.limited += 1
+        return max(1, math.ceil(self.sync_interval))
+
+    def _lease_size(self, amount):
+        # Small enough that tokens idling in other workers rarely starve this one
+        return max(1, math.ceil(amount / (self.workers * 4)))
+
+    def _refill(self, states, now):
+        requests = {state.key: (self._lease_size(state.amount), state.amount, state.expires_at) for state in states}
+        try:
+            if not self._store_healthy:
+                # Leave reconnecting to the sync thread rather than stalling requests on timeouts
+                raise ConnectionError("store marked unavailable")
+            grants, workers = self.store.acquire(self.worker_id or 'local', requests, now)
+        except Exception as e:
+            self._store_failed(e)
+            # Store unreachable: enforce this worker's share of each limit on its own
+            with self._lock:
+                for state in states:
+                    if state.tokens <= 0 and not state.exhausted:
+                        state.tokens = math.ceil(state.amount / self.workers)
+                        state.exhausted = True
+                        state.local = True
+            return
+        self._store_recovered()
+        with self._lock:
+            self.refills += 1
+            self.workers = max(1, workers)
+            self._apply(states, requests, grants)
+
+    def _apply(self, states, requests, grants):
+        for state in states:
+            grant = grants.get(state.key, 0)
+            want = requests[state.key][0]
+            state.tokens += grant
+            if want > 0 and grant < want:
+                state.exhausted = True
+
+    def _store_failed(self, error):
+        self.sync_failures += 1
+        if self._store_healthy:
+            self._store_healthy = False
+            logger.warning(f"Rate limit store unavailable, enforcing per-worker limits: {error}")
+
+    def _store_recovered(self):
+        if not self._store_healthy:
+            self._store_healthy = True
+            logger.info("Rate limit store recovered")
+
+    # Background sync
+    def _start(self):
+        # Threads do not survive a fork: each worker process runs its own sync
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._windows = {}
+            self.worker_id = f"{socket.gethostname()}:{self._pid}"
+            self._thread = threading.Thread(target=self._run, name="rate-limit-sync", daemon=True)
+            self._thread.start()
+            # Recycled (max_requests), redeployed or stopped workers hand their leases back
+            atexit.register(self.release)
+
+    def _run(self):
+        # Sync straight away so a new worker is counted before it sizes any lease
+        while True:
+            try:
+                self.sync()
+            except Exception as e:
+                self._store_failed(e)
+            time.sleep(self.sync_interval)
+
+    def sync(self, now=None):
+        """One batched round trip: top up busy leases, hand back idle ones, heartbeat"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._windows = {k: s for k, s in self._windows.items() if s.expires_at > now}
+            requests = {}
+            states = []
+            for state in self._windows.values():
+                if state.exhausted:
+                    continue
+                lease = self._lease_size(state.amount)
+                if now - state.last_hit > self.idle_release:
+                    if state.tokens > 0:
+                        requests[state.key] = (-state.tokens, state.amount, state.expires_at)
+                        state.tokens = 0
+                        states.append(state)
+                elif state.tokens <= lease // 2 and now - state.last_hit <= self.sync_interval:
+                    requests[state.key] = (lease, state.amount, state.expires_at)
+                    states.append(state)
+        try:
+            grants, workers = self.store.acquire(self.worker_id or 'local', requests, now)
+        except Exception:
+            with self._lock:
+                for state in states:
+                    want = requests[state.key][0]
+                    if want < 0:
+                        state.tokens -= want
+            raise
+        self._store_recovered()
+        with self._lock:
+            self.workers = max(1, workers)
+            # Returned tokens are gone from this worker either way
+            self._apply(states, requests, {k: g for k, g in grants.items() if g >= 0})
+        return len(requests)
+
+    def release(self, now=None):
+        """Hand every unspent leased token back to the store; returns how many were returned"""
+        now = time.time() if now is None else now
+        with self._lock:
+            if self._pid != os.getpid():
+                return 0  # leases belong to the worker that took them, not a forked parent
+            requests = {state.key: (-state.tokens, state.amount, state.expires_at)
+                        for state in self._windows.values()
+                        if state.tokens > 0 and not state.local and state.expires_at > now}
+            for state in self._windows.values():
+                if state.key in requests:
+                    state.tokens = 0
+        if not requests:
+            return 0
+        try:
+            self.store.acquire(self.worker_id or 'local', requests, now)
+        except Exception as e:
+            logger.warning(f"Could not return leased rate limit tokens: {e}")
+            return 0
+        return -sum(want for want, _, _ in requests.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "store": type(self.store).__name__,
+                "store_healthy": self._store_healthy,
+                "workers": self.workers,
+                "counters": len(self._windows),
+                "allowed": self.allowed,
+                "limited": self.limited,
+                "refills": self.refills,
+                "sync_failures": self.sync_failures
+            }
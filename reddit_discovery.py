@@ -3,9 +3,11 @@
 Basic Reddit Whale Discovery
 Finds wallet addresses mentioned in crypto subreddits
 No AI required - uses pattern matching and basic scoring
+
+Run once by hand with `python reddit_discovery.py`; in production the
+discovery workers (discovery_worker.py) run the same scan on a schedule.
 """
 
-import praw
 import re
 import psycopg2
 from psycopg2.extras import RealDictCursor
@@ -14,18 +16,52 @@ from datetime import datetime, timedelta
 import time
 from dotenv import load_dotenv
 
+from keyword_matcher import KeywordMatcher
+
 # Load environment variables
 load_dotenv()
 
+# Quality indicators
+QUALITY_KEYWORDS = [
+    'analysis', 'research', 'dd', 'due diligence', 'wallet',
+    'address', 'successful', 'profitable', 'alpha', 'tracking'
+]
+
+SPAM_KEYWORDS = [
+    'moon', 'pump', 'dump', 'scam', 'free money', 'guaranteed',
+    'easy money', 'get rich', 'lambo', 'diamond hands'
+]
+
+POST_KEYWORDS = KeywordMatcher({'quality': QUALITY_KEYWORDS, 'spam': SPAM_KEYWORDS})
+
+# Addresses mentioned in enough good posts to keep
+MIN_COMBINED_SCORE = 40
+
+def group_by_address(discoveries):
+    """Discoveries grouped into {address: [mentions]}"""
+    groups = {}
+    for discovery in discoveries:
+        groups.setdefault(discovery['address'], []).append(discovery)
+    return groups
+
+def combined_score(quality_scores):
+    """Average post quality plus 5 points per mention, capped at 100"""
+    return min(100, sum(quality_scores) / len(quality_scores) + len(quality_scores) * 5)
+
 class BasicRedditWhaleDiscovery:
     def __init__(self):
+        import praw
+        
         # Initialize Reddit connection
         self.reddit = praw.Reddit(
             client_id=os.getenv('REDDIT_CLIENT_ID'),
             client_secret=os.getenv('REDDIT_CLIENT_SECRET'),
             username=os.getenv('REDDIT_USERNAME'),
             password=os.getenv('REDDIT_PASSWORD'),
-            user_agent='whale-tracker-discovery/1.0'
+            user_agent='whale-tracker-discovery/1.0',
+            # Optional endpoint overrides (local fakes for load tests)
+            **{key: url for key, url in (('oauth_url', os.getenv('REDDIT_OAUTH_URL')),
+                                         ('reddit_url', os.getenv('REDDIT_URL'))) if url}
         )
         
         # Wallet address patterns
@@ -33,15 +69,9 @@ class BasicRedditWhaleDiscovery:
         self.ethereum_pattern = re.compile(r'\b0x[a-fA-F0-9]{40}\b')
         
         # Quality indicators
-        self.quality_keywords = [
-            'analysis', 'research', 'dd', 'due diligence', 'wallet',
-            'address', 'successful', 'profitable', 'alpha', 'tracking'
-        ]
-        
-        self.spam_keywords = [
-            'moon', 'pump', 'dump', 'scam', 'free money', 'guaranteed',
-            'easy money', 'get rich', 'lambo', 'diamond hands'
-        ]
+        self.quality_keywords = QUALITY_KEYWORDS
+        self.spam_keywords = SPAM_KEYWORDS
+        self.post_keywords = POST_KEYWORDS
         
     def extract_wallet_addresses(self, text):
         """Extract potential wallet addresses from text"""
@@ -109,15 +139,10 @@ class BasicRedditWhaleDiscovery:
         # Text quality analysis
         full_text = f"{post.title} {post.selftext}".lower()
         
-        # Bonus for quality keywords
-        for keyword in self.quality_keywords:
-            if keyword in full_text:
-                score += 5
-        
-        # Penalty for spam keywords
-        for keyword in self.spam_keywords:
-            if keyword in full_text:
-                score -= 10
+        # Bonus for quality keywords, penalty for spam keywords (each keyword counts once)
+        keyword_counts = self.post_keywords.counts(full_text, distinct=True)
+        score += keyword_counts['quality'] * 5
+        score -= keyword_counts['spam'] * 10
         
         # Minimum text length
         if len(full_text) > 100:
@@ -125,8 +150,8 @@ class BasicRedditWhaleDiscovery:
         
         return max(0, min(100, score))  # Clamp between 0-100
     
-    def scan_subreddit(self, subreddit_name, limit=50):
-        """Scan a subreddit for whale mentions"""
+    def scan_subreddit(self, subreddit_name, limit=50, raise_errors=False):
+        """Scan a subreddit for whale mentions (raise_errors: let Reddit failures propagate)"""
         print(f"🔍 Scanning r/{subreddit_name}...")
         
         try:
@@ -185,6 +210,8 @@ class BasicRedditWhaleDiscovery:
             return discoveries
         
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"  ❌ Error scanning r/{subreddit_name}: {e}")
             return []
     
@@ -245,34 +272,18 @@ class BasicRedditWhaleDiscovery:
             cursor = conn.cursor()
             
             # Group discoveries by address (combine multiple mentions)
-            address_groups = {}
-            for discovery in discoveries:
-                addr = discovery['address']
-                if addr not in address_groups:
-                    address_groups[addr] = {
-                        'mentions': [],
-                        'total_score': 0,
-                        'best_quality': 0
-                    }
-                
-                address_groups[addr]['mentions'].append(discovery)
-                address_groups[addr]['total_score'] += discovery['quality_score']
-                address_groups[addr]['best_quality'] = max(
-                    address_groups[addr]['best_quality'], 
-                    discovery['quality_score']
-                )
+            address_groups = group_by_address(discoveries)
             
             # Insert new whales
             saved_count = 0
-            for address, data in address_groups.items():
+            for address, mentions in address_groups.items():
                 # Calculate combined score
-                mention_count = len(data['mentions'])
-                avg_quality = data['total_score'] / mention_count
-                combined_score = min(100, avg_quality + (mention_count * 5))
+                mention_count = len(mentions)
+                score = combined_score([m['quality_score'] for m in mentions])
                 
                 # Only save high-quality discoveries
-                if combined_score >= 40:
-                    nickname = self.generate_nickname(data['mentions'])
+                if score >= MIN_COMBINED_SCORE:
+                    nickname = self.generate_nickname(mentions)
                     
                     # Insert whale
                     cursor.execute("""
@@ -284,13 +295,13 @@ class BasicRedditWhaleDiscovery:
                             success_score = GREATEST(whales.success_score, %s),
                             updated_at = NOW()
                     """, (
-                        address, nickname, int(combined_score), 'Medium',
+                        address, nickname, int(score), 'Medium',
                         mention_count, True, datetime.now(),
-                        int(combined_score)
+                        int(score)
                     ))
                     
                     saved_count += 1
-                    print(f"  💾 Saved: {nickname} ({address[:8]}...) Score: {int(combined_score)}")
+                    print(f"  💾 Saved: {nickname} ({address[:8]}...) Score: {int(score)}")
             
             conn.commit()
             conn.close()
@@ -353,4 +364,4 @@ if __name__ == "__main__":
     print("\n🎯 Next Steps:")
     print("1. Check database: psql -U sean -d whale_tracker -c \"SELECT nickname, address, success_score FROM whales ORDER BY success_score DESC;\"")
     print("2. Add OpenAI API key for advanced analysis")
-    print("3. Set up automated discovery (cron job)")
+    print("3. Run scheduled discovery: python discovery_worker.py")
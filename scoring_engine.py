@@ -0,0 +1,166 @@
+"""
+Vectorized TradingAI scoring.
+
+Scores N requests (or N whales) in one NumPy pass with the same weights and
+thresholds as the scalar TradingAI path. Every formula is evaluated in the
+same floating-point order as trading_ai.py, so given the same inputs and the
+same confidence jitter the results are bit-for-bit identical.
+"""
+
+import random
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from trading_ai import (
+    ACTIONS, CONFIDENCE_JITTER, CONFIDENCE_WEIGHTS, DEFAULT_ACTION, DEFAULT_MARKET_OUTLOOK,
+    DEFAULT_RISK_LEVEL, MARKET_OUTLOOKS, RECOMMENDATION_WEIGHTS, RISK_LEVELS, TREND_SCORES
+)
+
+class _Buckets:
+    """Vectorized form of a descending "if score > threshold" cascade"""
+
+    def __init__(self, thresholds: Sequence[float], labels: Sequence[str], default: str):
+        # searchsorted(side='left') counts thresholds strictly below each value,
+        # which is exactly how many branches of the cascade a value clears
+        self.thresholds = np.array(list(reversed(thresholds)), dtype=np.float64)
+        self.labels = np.array([default] + list(reversed(labels)), dtype=object)
+
+    def codes(self, values):
+        """Index of each value's label in self.labels (lowest bucket first)"""
+        return np.searchsorted(self.thresholds, values, side="left")
+
+    def __call__(self, values):
+        return self.labels[self.codes(values)]
+
+def draw_confidence_jitter(count: int, rng: Optional[random.Random] = None):
+    """Draw count confidence jitters, consuming rng exactly as count scalar calls would"""
+    rng = rng or random
+    low, high = CONFIDENCE_JITTER
+    draws = np.fromiter((rng.random() for _ in range(count)), dtype=np.float64, count=count)
+    # random.uniform(a, b) is a + (b - a) * random()
+    return low + (high - low) * draws
+
+class BatchScoringEngine:
+    """Computes market scores, actions, risk levels and confidences for N inputs at once"""
+
+    def __init__(self):
+        if np is None:
+            raise RuntimeError("Batch scoring requires numpy (pip install numpy)")
+        self._outlooks = _Buckets([t for t, _ in MARKET_OUTLOOKS],
+                                  [label for _, label in MARKET_OUTLOOKS], DEFAULT_MARKET_OUTLOOK)
+        self._actions = _Buckets([t for t, _, _ in ACTIONS],
+                                 [name for _, name, _ in ACTIONS], DEFAULT_ACTION[0])
+        self._action_displays = _Buckets([t for t, _, _ in ACTIONS],
+                                         [display for _, _, display in ACTIONS], DEFAULT_ACTION[1])
+        self._risk_levels = _Buckets([t for t, _ in RISK_LEVELS],
+                                     [level for _, level in RISK_LEVELS], DEFAULT_RISK_LEVEL)
+
+    @staticmethod
+    def _array(values, name: str):
+        array = np.asarray(values, dtype=np.float64)
+        if array.ndim != 1:
+            raise ValueError(f"{name} must be one-dimensional")
+        if not np.isfinite(array).all():
+            raise ValueError(f"{name} contains non-finite values")
+        return array
+
+    @staticmethod
+    def trend_scores(trends):
+        """Map trend labels to their scores; unknown trends raise KeyError like the scalar path"""
+        labels, inverse = np.unique(np.asarray(trends, dtype=object).astype(str), return_inverse=True)
+        table = np.array([TREND_SCORES[str(label)] for label in labels], dtype=np.float64)
+        return table[inverse.reshape(-1)]
+
+    def market_scores(self, trends, volatility, volume, momentum):
+        """Vectorized TradingAI._calculate_market_score"""
+        trend_score = self.trend_scores(trends)
+        volatility_penalty = self._array(volatility, "volatility") * 0.2
+        volume_boost = self._array(volume, "volume") * 0.3
+        momentum_factor = self._array(momentum, "momentum") + 0.5
+        score = (trend_score + volume_boost + momentum_factor) / 3 - volatility_penalty
+        return np.maximum(0.1, np.minimum(0.9, score))
+
+    def outlooks(self, market_scores):
+        return self._outlooks(self._array(market_scores, "market_scores"))
+
+    def risk_levels(self, risk_scores):
+        """Vectorized TradingAI._categorize_risk_level"""
+        return self._risk_levels(self._array(risk_scores, "risk_scores"))
+
+    def recommendation_scores(self, market_scores, sentiment_scores, risk_scores):
+        market_weight, sentiment_weight, risk_weight = RECOMMENDATION_WEIGHTS
+        return (self._array(market_scores, "market_scores") * market_weight
+                + self._array(sentiment_scores, "sentiment_scores") * sentiment_weight
+                + (1 - self._array(risk_scores, "risk_scores")) * risk_weight)
+
+    @property
+    def action_names(self):
+        """Action names indexed by action_codes, lowest (sell) to highest (strong_buy)"""
+        return tuple(self._actions.labels)
+
+    def action_codes(self, recommendation_scores):
+        """Integer action per score, indexing action_names (cheaper than label arrays)"""
+        return self._actions.codes(self._array(recommendation_scores, "recommendation_scores"))
+
+    def actions(self, recommendation_scores):
+        """(action, action_display) arrays for the recommendation scores"""
+        scores = self._array(recommendation_scores, "recommendation_scores")
+        return self._actions(scores), self._action_displays(scores)
+
+    def confidences(self, market_scores, sentiment_confidences, risk_scores, jitter):
+        """Vectorized TradingAI._calculate_confidence with the jitter supplied up front"""
+        market_weight, sentiment_weight, risk_weight = CONFIDENCE_WEIGHTS
+        confidence = (self._array(market_scores, "market_scores") * market_weight
+                      + self._array(sentiment_confidences, "sentiment_confidences") * sentiment_weight
+                      + (1 - self._array(risk_scores, "risk_scores")) * risk_weight)
+        confidence = confidence + self._array(jitter, "jitter")
+        return np.maximum(0.1, np.minimum(0.95, confidence))
+
+    def score(self, market_scores, sentiment_scores, sentiment_confidences, risk_scores,
+              jitter=None, rng: Optional[random.Random] = None) -> Dict[str, Any]:
+        """Score N analyses; jitter defaults to fresh draws from rng (the global random by default)"""
+        market_scores = self._array(market_scores, "market_scores")
+        count = len(market_scores)
+        for name, values in (("sentiment_scores", sentiment_scores),
+                             ("sentiment_confidences", sentiment_confidences),
+                             ("risk_scores", risk_scores)):
+            if len(values) != count:
+                raise ValueError(f"{name} has {len(values)} entries, expected {count}")
+        if jitter is None:
+            jitter = draw_confidence_jitter(count, rng)
+
+        recommendation_scores = self.recommendation_scores(market_scores, sentiment_scores, risk_scores)
+        actions, action_displays = self.actions(recommendation_scores)
+        return {
+            "market_score": market_scores,
+            "outlook": self.outlooks(market_scores),
+            "recommendation_score": recommendation_scores,
+            "action": actions,
+            "action_display": action_displays,
+            "risk_level": self.risk_levels(risk_scores),
+            "confidence": self.confidences(market_scores, sentiment_confidences, risk_scores, jitter)
+        }
+
+    def score_indicators(self, trends, volatility, volume, momentum, sentiment_scores,
+                         sentiment_confidences, risk_scores, jitter=None,
+                         rng: Optional[random.Random] = None) -> Dict[str, Any]:
+        """Score N raw indicator sets, computing market scores first"""
+        market_scores = self.market_scores(trends, volatility, volume, momentum)
+        return self.score(market_scores, sentiment_scores, sentiment_confidences, risk_scores,
+                          jitter=jitter, rng=rng)
+
+    def score_analyses(self, market_analyses: List[Dict], sentiment_analyses: List[Dict],
+                       risk_assessments: List[Dict], jitter=None,
+                       rng: Optional[random.Random] = None) -> Dict[str, Any]:
+        """Score the stage outputs of N TradingAI requests"""
+        return self.score(
+            [analysis["score"] for analysis in market_analyses],
+            [analysis["score"] for analysis in sentiment_analyses],
+            [analysis["confidence"] for analysis in sentiment_analyses],
+            [assessment["score"] for assessment in risk_assessments],
+            jitter=jitter, rng=rng
+        )
@@ -0,0 +1,180 @@
+"""
+Startup timing, lazy integrations and readiness.
+
+The entry module imports this first and turns on import tracing, which
+records how long every cold import made by one of the app's own modules took
+(inclusive of what it pulls in). Initialization stages are timed as they run
+in the background, and the process reports ready once every required stage
+has finished. Liveness (/health) does not wait for any of this.
+
+Rarely used integrations are wrapped with lazy_import() and only loaded,
+and configured, on first attribute access; that cost is recorded too.
+"""
+
+import builtins
+import importlib
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+_APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def _is_app_module(globals):
+    path = (globals or {}).get('__file__') or ''
+    return path.startswith(_APP_ROOT) and 'site-packages' not in path
+
+class StartupReport:
+    """Import and initialization timings for this process, plus readiness"""
+
+    def __init__(self, required=()):
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.required = set(required)
+        self.imports = []        # (importer, module, seconds) for cold imports made by app modules
+        self.lazy_imports = {}   # module -> {"seconds", "after_boot_seconds"}
+        self.stages = {}         # name -> {"status", "seconds", "error", ...}
+        self.ready_after = None
+        self._lock = threading.Lock()
+        self._original_import = None
+
+    # Import tracing
+    def trace_imports(self):
+        """Time cold imports issued from the app's own modules until stop_tracing()"""
+        if self._original_import is not None:
+            return
+        original = self._original_import = builtins.__import__
+        report = self
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules or not _is_app_module(globals):
+                return original(name, globals, locals, fromlist, level)
+            importer = globals.get('__name__')
+            start = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                with report._lock:
+                    report.imports.append((importer, name, time.perf_counter() - start))
+
+        builtins.__import__ = timed_import
+
+    def stop_tracing(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+        self.mark('app_module', 'done', time.perf_counter() - self._t0)
+
+    def record_lazy_import(self, module, seconds):
+        with self._lock:
+            self.lazy_imports[module] = {
+                "seconds": round(seconds, 4),
+                "after_boot_seconds": round(time.perf_counter() - self._t0, 3)
+            }
+
+    # Initialization stages
+    def mark(self, name, status, seconds=None, error=None, **details):
+        with self._lock:
+            stage = self.stages.setdefault(name, {})
+            stage.update(status=status, **details)
+            if seconds is not None:
+                stage["seconds"] = round(seconds, 4)
+            if error is not None:
+                stage["error"] = error
+            if self.ready_after is None and self._all_finished():
+                self.ready_after = time.perf_counter() - self._t0
+
+    @contextmanager
+    def stage(self, name):
+        """Time a synchronous initialization stage"""
+        self.mark(name, 'running')
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.mark(name, 'failed', time.perf_counter() - start, error=str(e))
+            raise
+        self.mark(name, 'done', time.perf_counter() - start)
+
+    async def run_stage(self, name, awaitable):
+        """Time an awaitable stage; failures are recorded, not raised"""
+        self.mark(name, 'running')
+        start = time.perf_counter()
+        try:
+            result = await awaitable
+        except Exception as e:
+            self.mark(name, 'failed', time.perf_counter() - start, error=str(e))
+            return None
+        # A stage that gave up (returned False) still counts as finished, but degraded
+        self.mark(name, 'done' if result is not False else 'degraded', time.perf_counter() - start)
+        return result
+
+    def _all_finished(self):
+        return all(self.stages.get(name, {}).get('status') in ('done', 'degraded', 'failed')
+                   for name in self.required)
+
+    def status(self, name):
+        with self._lock:
+            return self.stages.get(name, {}).get('status')
+
+    @property
+    def ready(self):
+        with self._lock:
+            return self._all_finished()
+
+    def as_dict(self, top_imports=20):
+        with self._lock:
+            slowest = sorted(self.imports, key=lambda entry: entry[2], reverse=True)[:top_imports]
+            return {
+                "ready": self._all_finished(),
+                "ready_after_seconds": round(self.ready_after, 3) if self.ready_after is not None else None,
+                "uptime_seconds": round(time.perf_counter() - self._t0, 3),
+                "started_at": self.started_at,
+                "stages": {name: dict(stage) for name, stage in self.stages.items()},
+                "imports": [{"module": module, "imported_by": importer, "seconds": round(seconds, 4)}
+                            for importer, module, seconds in slowest],
+                "lazy_imports": dict(self.lazy_imports)
+            }
+
+class _LazyModule:
+    """Module proxy that imports (and configures) the real module on first use"""
+
+    def __init__(self, name, setup, report):
+        self.__dict__.update(_name=name, _setup=setup, _report=report, _module=None, _lock=threading.Lock())
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            with self._lock:
+                module = self._module
+                if module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    if self._setup is not None:
+                        self._setup(module)
+                    if self._report is not None:
+                        self._report.record_lazy_import(self._name, time.perf_counter() - start)
+                    self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module {self._name!r} ({state})>"
+
+def lazy_import(name, setup=None, report=None):
+    """Stand-in for `import name` that defers the import to first attribute access"""
+    return _LazyModule(name, setup, report)
+
+def resolve(module):
+    """Import a lazy_import() module now (e.g. before forking workers); real modules pass through"""
+    return module._load() if isinstance(module, _LazyModule) else module
+
+# Global startup report instance (create_app() sets the stages its roles require)
+startup_report = StartupReport()
@@ -1,17 +1,196 @@
 import asyncio
-import logging
+import hashlib
+import json
+import os
 import random
-from datetime import datetime, timedelta
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
 from typing import Dict, Any, Optional, List
 import structlog
 
+from keyword_matcher import KeywordMatcher
+from metrics import TRADING_AI_LATENCY, TRADING_AI_STAGE_LATENCY, timed_async
+from portfolio_analytics import PriceHistoryStore, analyze_holdings
+
 logger = structlog.get_logger(__name__)
 
+# Scoring weights and thresholds, shared with the vectorized path in scoring_engine.py
+TREND_SCORES = {"bullish": 0.8, "sideways": 0.5, "bearish": 0.2}
+RECOMMENDATION_WEIGHTS = (0.4, 0.3, 0.3)  # market, sentiment, 1 - risk
+CONFIDENCE_WEIGHTS = (0.4, 0.3, 0.3)  # market, sentiment confidence, 1 - risk
+CONFIDENCE_JITTER = (-0.05, 0.05)
+# (exclusive lower bound, label) from highest to lowest; below the last bound the default applies
+MARKET_OUTLOOKS = ((0.7, "Very Positive"), (0.5, "Positive"), (0.3, "Neutral"))
+DEFAULT_MARKET_OUTLOOK = "Cautious"
+ACTIONS = ((0.7, "strong_buy", "Strong Buy"), (0.6, "buy", "Buy"),
+           (0.4, "hold", "Hold"), (0.3, "monitor", "Monitor"))
+DEFAULT_ACTION = ("sell", "Consider Selling")
+RISK_LEVELS = ((0.7, "High"), (0.5, "Medium-High"), (0.3, "Medium"))
+DEFAULT_RISK_LEVEL = "Low"
+SENTIMENT_KEYWORDS = KeywordMatcher({
+    "positive": ["buy", "bullish", "moon", "pump", "growth", "invest"],
+    "negative": ["sell", "bearish", "dump", "crash", "loss", "risk"],
+})
+
+class StageLatencyTracker:
+    """Rolling per-stage latency window with p50/p95/p99"""
+    
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, stage: str, elapsed_ms: float):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(elapsed_ms)
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+        TRADING_AI_STAGE_LATENCY.observe(elapsed_ms / 1000, stage=stage)
+    
+    @staticmethod
+    def _percentile(ordered: List[float], pct: float) -> float:
+        index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+        return round(ordered[index], 3)
+    
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {stage: sorted(samples) for stage, samples in self._samples.items()}
+            counts = dict(self._counts)
+        return {
+            stage: {
+                "count": counts[stage],
+                "p50": self._percentile(ordered, 50),
+                "p95": self._percentile(ordered, 95),
+                "p99": self._percentile(ordered, 99),
+                "max": round(ordered[-1], 3)
+            }
+            for stage, ordered in snapshot.items() if ordered
+        }
+
+# Deterministic randomness and record/replay
+
+class ReplayError(RuntimeError):
+    """A recording could not be replayed against the current code"""
+
+class RecordingRandom(random.Random):
+    """Seeded RNG that logs every primitive draw so the run can be replayed exactly"""
+    
+    def __init__(self, seed=None):
+        self.draws: List[Any] = []
+        super().__init__(seed)
+    
+    # choice/randint/shuffle go through getrandbits, uniform/gauss through random
+    def random(self) -> float:
+        value = super().random()
+        self.draws.append(value)
+        return value
+    
+    def getrandbits(self, k: int) -> int:
+        value = super().getrandbits(k)
+        self.draws.append(value)
+        return value
+
+class ReplayRandom(random.Random):
+    """RNG that hands back previously recorded draws in order"""
+    
+    def __init__(self, draws: List[Any]):
+        self._draws = list(draws)
+        self._position = 0
+        super().__init__(0)
+    
+    @property
+    def exhausted(self) -> bool:
+        return self._position == len(self._draws)
+    
+    def _next(self, kind):
+        if self._position >= len(self._draws):
+            raise ReplayError("Recording ran out of random draws")
+        value = self._draws[self._position]
+        if type(value) is not kind:
+            raise ReplayError(f"Expected a {kind.__name__} draw at position {self._position}, "
+                              f"recording has {value!r}")
+        self._position += 1
+        return value
+    
+    def random(self) -> float:
+        return self._next(float)
+    
+    def getrandbits(self, k: int) -> int:
+        value = self._next(int)
+        if value >> k:
+            raise ReplayError(f"Recorded draw {value} does not fit in {k} bits")
+        return value
+
+def result_digest(result: Dict[str, Any]) -> str:
+    """Hash of a TradingAI result without its wall-clock fields"""
+    def stable(value):
+        if isinstance(value, dict):
+            return {k: stable(v) for k, v in value.items()
+                    if k not in ("analysis_timestamp", "processing_time_ms", "stage_timings_ms",
+                                 "last_updated")}
+        if isinstance(value, list):
+            return [stable(v) for v in value]
+        return value
+    encoded = json.dumps(stable(result), sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+class DecisionRecorder:
+    """Appends each call's inputs, random draws and result digest to a JSON-lines file"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+    
+    def record(self, operation: str, inputs: Dict[str, Any], draws: List[Any], result: Dict[str, Any]):
+        line = json.dumps({
+            "op": operation,
+            "inputs": inputs,
+            "draws": draws,
+            "digest": result_digest(result)
+        }, separators=(",", ":"), default=str)
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+
+class StageTimer:
+    """Times the stages of one request with a monotonic clock"""
+    
+    def __init__(self, tracker: Optional[StageLatencyTracker] = None):
+        self.tracker = tracker
+        self.timings: Dict[str, float] = {}
+        self._start = time.perf_counter()
+    
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+    
+    def add(self, name: str, elapsed_ms: float):
+        self.timings[name] = round(self.timings.get(name, 0.0) + elapsed_ms, 3)
+        if self.tracker is not None:
+            self.tracker.record(name, elapsed_ms)
+    
+    def total_ms(self) -> float:
+        return round((time.perf_counter() - self._start) * 1000, 3)
+
 class TradingAI:
     """Enhanced Trading AI with realistic market analysis capabilities"""
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None, record_path: Optional[str] = None):
         self.initialized = False
+        self.seed = seed
+        self.recorder = DecisionRecorder(record_path) if record_path else None
+        self.price_history: Optional[PriceHistoryStore] = None
+        self.benchmark_symbol = "BTC"
         self.model_version = "2.1.0"
         self.capabilities = [
             "market_sentiment_analysis",
@@ -21,38 +200,67 @@ class TradingAI:
             "portfolio_optimization"
         ]
         self.performance_metrics = {
-            "accuracy_rate": 0.72,
+            "accuracy_rate": None,  # measured by backtest.py, see load_backtest_report
+            "accuracy_source": None,
             "prediction_confidence": 0.78,
             "total_predictions": 0,
             "successful_predictions": 0
         }
-        
+        self.stage_latency = StageLatencyTracker()
+        self.init_timings: Dict[str, float] = {}
+        
+    def request_rng(self, *key: Any, seed: Optional[int] = None):
+        """RNG for one call: the explicit seed, else one derived from self.seed and key, else the global random"""
+        if seed is None and self.seed is not None:
+            # String seeds hash with SHA-512, so this is stable across processes
+            seed = ":".join(str(part) for part in (self.seed,) + key)
+        if self.recorder is not None:
+            return RecordingRandom(seed)
+        if seed is None:
+            return random
+        return random.Random(seed)
+    
+    def _record(self, operation: str, inputs: Dict[str, Any], rng, result: Dict[str, Any]):
+        if self.recorder is not None and isinstance(rng, RecordingRandom):
+            try:
+                self.recorder.record(operation, inputs, rng.draws, result)
+            except OSError as e:
+                logger.warning("Failed to record TradingAI call", operation=operation, error=str(e))
+    
     async def initialize(self):
         """Initialize Trading AI with comprehensive setup"""
         logger.info("🤖 Initializing Enhanced Trading AI System...")
         
         try:
-            # Simulate model loading and calibration
-            await asyncio.sleep(0.1)  # Simulate initialization time
-            
-            # Initialize market data connections (simulated)
-            await self._initialize_market_data()
-            
-            # Load AI models (simulated)
-            await self._load_prediction_models()
-            
-            # Calibrate risk assessment (simulated)
-            await self._calibrate_risk_models()
+            # The stages are independent, so they run concurrently
+            await asyncio.gather(
+                self._timed_stage("model_loading", self._load_base_model()),
+                self._timed_stage("market_data", self._initialize_market_data()),
+                self._timed_stage("prediction_models", self._load_prediction_models()),
+                self._timed_stage("risk_models", self._calibrate_risk_models())
+            )
             
             self.initialized = True
             logger.info("✅ Enhanced Trading AI System ready!",
                        version=self.model_version,
-                       capabilities=len(self.capabilities))
+                       capabilities=len(self.capabilities),
+                       stage_seconds=self.init_timings)
             
         except Exception as e:
             logger.error("❌ Trading AI initialization failed", error=str(e))
             raise
     
+    async def _timed_stage(self, name: str, coro):
+        start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self.init_timings[name] = round(time.perf_counter() - start, 4)
+    
+    async def _load_base_model(self):
+        """Load and calibrate the base model"""
+        await asyncio.sleep(0.1)  # Simulate initialization time
+    
     async def _initialize_market_data(self):
         """Initialize market data connections"""
         logger.debug("Initializing market data connections...")
@@ -71,37 +279,50 @@ class TradingAI:
         await asyncio.sleep(0.05)
         logger.debug("Risk models calibrated")
         
-    async def get_user_recommendation(self, user_id: str, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    @timed_async(TRADING_AI_LATENCY, operation="recommendation")
+    async def get_user_recommendation(self, user_id: str, query: str, context: Dict[str, Any],
+                                      seed: Optional[int] = None, rng: Optional[random.Random] = None) -> Dict[str, Any]:
         """Get comprehensive trading recommendation for user"""
         if not self.initialized:
             raise RuntimeError("Trading AI not initialized")
         
+        if rng is None:
+            rng = self.request_rng(user_id, query, seed=seed)
+        
         logger.info("Generating trading recommendation",
                    user_id=user_id,
                    query=query[:50] + "..." if len(query) > 50 else query)
         
+        timer = StageTimer(self.stage_latency)
         try:
             # Analyze market conditions
-            market_analysis = await self._analyze_market_conditions(context)
+            with timer.stage("market"):
+                market_analysis = await self._analyze_market_conditions(context, rng)
             
             # Perform sentiment analysis
-            sentiment_analysis = await self._analyze_sentiment(query, context)
+            with timer.stage("sentiment"):
+                sentiment_analysis = await self._analyze_sentiment(query, context, rng)
             
             # Assess risk factors
-            risk_assessment = await self._assess_risk_factors(context)
+            with timer.stage("risk"):
+                risk_assessment = await self._assess_risk_factors(context, rng)
             
             # Generate recommendation
-            recommendation = await self._generate_recommendation(
-                query, market_analysis, sentiment_analysis, risk_assessment, user_id
-            )
+            with timer.stage("generation"):
+                recommendation = await self._generate_recommendation(
+                    query, market_analysis, sentiment_analysis, risk_assessment, user_id
+                )
+                
+                # Calculate overall confidence
+                confidence = self._calculate_confidence(
+                    market_analysis, sentiment_analysis, risk_assessment, rng
+                )
             
             # Update performance metrics
             self.performance_metrics["total_predictions"] += 1
             
-            # Calculate overall confidence
-            confidence = self._calculate_confidence(
-                market_analysis, sentiment_analysis, risk_assessment
-            )
+            processing_time_ms = timer.total_ms()
+            self.stage_latency.record("total", processing_time_ms)
             
             result = {
                 "success": True,
@@ -113,7 +334,7 @@ class TradingAI:
                     "market_outlook": market_analysis["outlook"]
                 },
                 "ai_module": "enhanced_trading_ai",
-                "user_level": self._determine_user_level(user_id),
+                "user_level": self._determine_user_level(user_id, rng),
                 "confidence": confidence,
                 "analysis_details": {
                     "market_score": market_analysis["score"],
@@ -123,7 +344,8 @@ class TradingAI:
                 "metadata": {
                     "model_version": self.model_version,
                     "analysis_timestamp": datetime.now().isoformat(),
-                    "processing_time_ms": random.randint(80, 200)
+                    "processing_time_ms": processing_time_ms,
+                    "stage_timings_ms": dict(timer.timings)
                 }
             }
             
@@ -132,6 +354,8 @@ class TradingAI:
                        confidence=confidence,
                        recommendation_type=recommendation["action"])
             
+            self._record("recommendation", {"user_id": user_id, "query": query, "context": context},
+                         rng, result)
             return result
             
         except Exception as e:
@@ -140,30 +364,27 @@ class TradingAI:
                         error=str(e))
             raise
     
-    async def _analyze_market_conditions(self, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _analyze_market_conditions(self, context: Dict[str, Any], rng=random) -> Dict[str, Any]:
         """Analyze current market conditions"""
         await asyncio.sleep(0.02)  # Simulate analysis time
         
         # Simulate market analysis
         market_indicators = {
-            "trend": random.choice(["bullish", "bearish", "sideways"]),
-            "volatility": random.uniform(0.1, 0.8),
-            "volume": random.uniform(0.3, 1.0),
-            "momentum": random.uniform(-0.5, 0.5)
+            "trend": rng.choice(["bullish", "bearish", "sideways"]),
+            "volatility": rng.uniform(0.1, 0.8),
+            "volume": rng.uniform(0.3, 1.0),
+            "momentum": rng.uniform(-0.5, 0.5)
         }
         
         # Calculate market score
         score = self._calculate_market_score(market_indicators)
         
         # Determine outlook
-        if score > 0.7:
-            outlook = "Very Positive"
-        elif score > 0.5:
-            outlook = "Positive"
-        elif score > 0.3:
-            outlook = "Neutral"
-        else:
-            outlook = "Cautious"
+        outlook = DEFAULT_MARKET_OUTLOOK
+        for threshold, label in MARKET_OUTLOOKS:
+            if score > threshold:
+                outlook = label
+                break
         
         return {
             "score": score,
@@ -172,17 +393,14 @@ class TradingAI:
             "key_factors": self._identify_key_market_factors(market_indicators)
         }
     
-    async def _analyze_sentiment(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _analyze_sentiment(self, query: str, context: Dict[str, Any], rng=random) -> Dict[str, Any]:
         """Analyze sentiment from query and context"""
         await asyncio.sleep(0.02)  # Simulate analysis time
         
-        # Simple sentiment analysis based on keywords
-        positive_keywords = ["buy", "bullish", "moon", "pump", "growth", "invest"]
-        negative_keywords = ["sell", "bearish", "dump", "crash", "loss", "risk"]
-        
-        query_lower = query.lower()
-        positive_count = sum(1 for word in positive_keywords if word in query_lower)
-        negative_count = sum(1 for word in negative_keywords if word in query_lower)
+        # Simple sentiment analysis based on keywords (each keyword counts once)
+        signals = SENTIMENT_KEYWORDS.counts(query, distinct=True)
+        positive_count = signals["positive"]
+        negative_count = signals["negative"]
         
         # Calculate sentiment score
         if positive_count > negative_count:
@@ -197,26 +415,26 @@ class TradingAI:
         return {
             "score": sentiment_score,
             "sentiment": "positive" if sentiment_score > 0.6 else "negative" if sentiment_score < 0.4 else "neutral",
-            "confidence": random.uniform(0.7, 0.9),
+            "confidence": rng.uniform(0.7, 0.9),
             "key_indicators": {
                 "positive_signals": positive_count,
                 "negative_signals": negative_count
             }
         }
     
-    async def _assess_risk_factors(self, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _assess_risk_factors(self, context: Dict[str, Any], rng=random) -> Dict[str, Any]:
         """Assess risk factors for the recommendation"""
         await asyncio.sleep(0.02)  # Simulate analysis time
         
         # Simulate risk assessment
         risk_factors = []
-        risk_score = random.uniform(0.2, 0.8)
+        risk_score = rng.uniform(0.2, 0.8)
         
         if risk_score > 0.6:
             risk_factors.extend(["High market volatility", "Uncertain economic conditions"])
         if risk_score > 0.4:
             risk_factors.append("Moderate liquidity concerns")
-        if random.choice([True, False]):
+        if rng.choice([True, False]):
             risk_factors.append("Regulatory uncertainty")
         
         return {
@@ -238,24 +456,16 @@ class TradingAI:
         risk_score = risk_assessment["score"]
         
         # Calculate weighted recommendation score
-        recommendation_score = (market_score * 0.4 + sentiment_score * 0.3 + (1 - risk_score) * 0.3)
+        market_weight, sentiment_weight, risk_weight = RECOMMENDATION_WEIGHTS
+        recommendation_score = (market_score * market_weight + sentiment_score * sentiment_weight
+                                + (1 - risk_score) * risk_weight)
         
         # Determine action
-        if recommendation_score > 0.7:
-            action = "strong_buy"
-            action_text = "Strong Buy"
-        elif recommendation_score > 0.6:
-            action = "buy"
-            action_text = "Buy"
-        elif recommendation_score > 0.4:
-            action = "hold"
-            action_text = "Hold"
-        elif recommendation_score > 0.3:
-            action = "monitor"
-            action_text = "Monitor"
-        else:
-            action = "sell"
-            action_text = "Consider Selling"
+        action, action_text = DEFAULT_ACTION
+        for threshold, name, display in ACTIONS:
+            if recommendation_score > threshold:
+                action, action_text = name, display
+                break
         
         # Generate detailed recommendation text
         recommendation_text = self._generate_recommendation_text(
@@ -342,7 +552,7 @@ class TradingAI:
         return ". ".join(reasoning_parts) + "."
     
     def _calculate_confidence(self, market_analysis: Dict, sentiment_analysis: Dict, 
-                            risk_assessment: Dict) -> float:
+                            risk_assessment: Dict, rng=random) -> float:
         """Calculate overall confidence in the recommendation"""
         # Weight different factors
         market_confidence = market_analysis["score"]
@@ -350,16 +560,18 @@ class TradingAI:
         risk_confidence = 1 - risk_assessment["score"]  # Lower risk = higher confidence
         
         # Calculate weighted confidence
-        confidence = (market_confidence * 0.4 + sentiment_confidence * 0.3 + risk_confidence * 0.3)
+        market_weight, sentiment_weight, risk_weight = CONFIDENCE_WEIGHTS
+        confidence = (market_confidence * market_weight + sentiment_confidence * sentiment_weight
+                      + risk_confidence * risk_weight)
         
         # Add some randomness for realism
-        confidence += random.uniform(-0.05, 0.05)
+        confidence += rng.uniform(*CONFIDENCE_JITTER)
         
         return max(0.1, min(0.95, confidence))
     
     def _calculate_market_score(self, indicators: Dict[str, Any]) -> float:
         """Calculate market score from indicators"""
-        trend_score = {"bullish": 0.8, "sideways": 0.5, "bearish": 0.2}[indicators["trend"]]
+        trend_score = TREND_SCORES[indicators["trend"]]
         volatility_penalty = indicators["volatility"] * 0.2  # High volatility reduces score
         volume_boost = indicators["volume"] * 0.3  # High volume increases score
         momentum_factor = (indicators["momentum"] + 0.5)  # Normalize momentum to 0-1
@@ -384,14 +596,10 @@ class TradingAI:
     
     def _categorize_risk_level(self, risk_score: float) -> str:
         """Categorize risk level from score"""
-        if risk_score > 0.7:
-            return "High"
-        elif risk_score > 0.5:
-            return "Medium-High"
-        elif risk_score > 0.3:
-            return "Medium"
-        else:
-            return "Low"
+        for threshold, level in RISK_LEVELS:
+            if risk_score > threshold:
+                return level
+        return DEFAULT_RISK_LEVEL
     
     def _suggest_risk_mitigation(self, risk_score: float) -> List[str]:
         """Suggest risk mitigation strategies"""
@@ -413,32 +621,37 @@ class TradingAI:
         
         return strategies
     
-    def _determine_user_level(self, user_id: str) -> str:
+    def _determine_user_level(self, user_id: str, rng=random) -> str:
         """Determine user level for personalized recommendations"""
         # In production, this would check user's subscription tier and history
         # For now, return a reasonable default
         user_levels = ["beginner", "intermediate", "advanced", "expert"]
-        return random.choice(user_levels[1:3])  # Intermediate or advanced
+        return rng.choice(user_levels[1:3])  # Intermediate or advanced
     
-    async def get_market_overview(self) -> Dict[str, Any]:
+    @timed_async(TRADING_AI_LATENCY, operation="market_overview")
+    async def get_market_overview(self, seed: Optional[int] = None,
+                                  rng: Optional[random.Random] = None) -> Dict[str, Any]:
         """Get general market overview"""
         if not self.initialized:
             raise RuntimeError("Trading AI not initialized")
         
+        if rng is None:
+            rng = self.request_rng("market_overview", seed=seed)
+        
         logger.info("Generating market overview")
         
         # Simulate comprehensive market analysis
         overview = {
-            "overall_sentiment": random.choice(["bullish", "bearish", "neutral"]),
-            "volatility_index": round(random.uniform(20, 80), 2),
-            "trend_strength": round(random.uniform(0.3, 0.9), 2),
+            "overall_sentiment": rng.choice(["bullish", "bearish", "neutral"]),
+            "volatility_index": round(rng.uniform(20, 80), 2),
+            "trend_strength": round(rng.uniform(0.3, 0.9), 2),
             "support_levels": [
-                round(random.uniform(30000, 35000), 2),
-                round(random.uniform(28000, 32000), 2)
+                round(rng.uniform(30000, 35000), 2),
+                round(rng.uniform(28000, 32000), 2)
             ],
             "resistance_levels": [
-                round(random.uniform(45000, 50000), 2),
-                round(random.uniform(52000, 58000), 2)
+                round(rng.uniform(45000, 50000), 2),
+                round(rng.uniform(52000, 58000), 2)
             ],
             "key_events": [
                 "Federal Reserve meeting next week",
@@ -446,14 +659,27 @@ class TradingAI:
                 "Cryptocurrency regulation updates"
             ],
             "whale_activity": {
-                "activity_level": random.choice(["low", "medium", "high"]),
-                "net_flow": random.choice(["inflow", "outflow", "neutral"]),
-                "confidence": round(random.uniform(0.6, 0.9), 2)
+                "activity_level": rng.choice(["low", "medium", "high"]),
+                "net_flow": rng.choice(["inflow", "outflow", "neutral"]),
+                "confidence": round(rng.uniform(0.6, 0.9), 2)
             }
         }
         
+        self._record("market_overview", {}, rng, overview)
         return overview
     
+    def load_price_history(self, path: str, window: int = 90) -> bool:
+        """Load the price history used for portfolio risk from an .npz (see PriceHistoryStore.from_file)"""
+        try:
+            self.price_history = PriceHistoryStore.from_file(path, window=window)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Could not load price history", path=path, error=str(e))
+            return False
+        logger.info("Loaded price history", path=path, assets=len(self.price_history),
+                    periods=self.price_history.periods)
+        return True
+    
+    @timed_async(TRADING_AI_LATENCY, operation="portfolio")
     async def analyze_portfolio(self, holdings: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Analyze user's portfolio and provide recommendations"""
         if not self.initialized:
@@ -461,24 +687,56 @@ class TradingAI:
         
         logger.info("Analyzing portfolio", holdings_count=len(holdings))
         
-        # Simulate portfolio analysis
-        total_value = sum(holding.get("value", 0) for holding in holdings)
-        
-        analysis = {
-            "overall_health": random.choice(["excellent", "good", "fair", "poor"]),
-            "diversification_score": round(random.uniform(0.4, 0.9), 2),
-            "risk_score": round(random.uniform(0.2, 0.8), 2),
-            "expected_return": round(random.uniform(0.05, 0.25), 3),
-            "recommendations": [
-                "Consider rebalancing crypto allocation",
-                "Reduce exposure to high-risk assets",
-                "Take profits on outperforming positions"
-            ],
-            "total_value": total_value,
-            "performance_vs_market": round(random.uniform(-0.1, 0.15), 3)
+        # Weights, concentration and covariance risk against the price history store
+        return analyze_holdings(holdings, self.price_history, benchmark=self.benchmark_symbol)
+    
+    async def replay(self, path: str) -> List[Dict[str, Any]]:
+        """Re-run every call in a recording with its recorded draws and compare result digests"""
+        operations = {
+            "recommendation": self.get_user_recommendation,
+            "market_overview": self.get_market_overview
         }
-        
-        return analysis
+        outcomes = []
+        with open(path) as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                rng = ReplayRandom(entry["draws"])
+                outcome = {"line": line_number, "op": entry["op"], "digest": entry["digest"]}
+                if entry["op"] not in operations:
+                    outcome.update(match=False, error=f"Unsupported operation {entry['op']}")
+                    outcomes.append(outcome)
+                    continue
+                try:
+                    result = await operations[entry["op"]](**entry["inputs"], rng=rng)
+                    outcome["replayed_digest"] = result_digest(result)
+                    outcome["match"] = outcome["replayed_digest"] == entry["digest"] and rng.exhausted
+                except ReplayError as e:
+                    outcome.update(match=False, error=str(e))
+                outcomes.append(outcome)
+        return outcomes
+    
+    def load_backtest_report(self, path: str) -> bool:
+        """Take accuracy_rate from a backtest.py report instead of assuming one"""
+        try:
+            with open(path) as f:
+                report = json.load(f)
+            accuracy_rate = report["overall"]["hit_rate"]
+            source = {
+                "report": os.path.basename(path),
+                "token": report.get("meta", {}).get("token"),
+                "signals": report["overall"]["signals"],
+                "period": report.get("period"),
+                "horizon_bars": report.get("meta", {}).get("settings", {}).get("horizon")
+            }
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Could not load backtest report", path=path, error=str(e))
+            return False
+        self.performance_metrics["accuracy_rate"] = accuracy_rate
+        self.performance_metrics["accuracy_source"] = source
+        logger.info("Loaded backtest accuracy", path=path, accuracy_rate=accuracy_rate)
+        return True
     
     def get_performance_metrics(self) -> Dict[str, Any]:
         """Get AI performance metrics"""
@@ -486,7 +744,9 @@ class TradingAI:
             "model_version": self.model_version,
             "total_predictions": self.performance_metrics["total_predictions"],
             "accuracy_rate": self.performance_metrics["accuracy_rate"],
+            "accuracy_source": self.performance_metrics["accuracy_source"],
             "avg_confidence": self.performance_metrics["prediction_confidence"],
+            "stage_latency_ms": self.stage_latency.summary(),
             "uptime": "99.2%",
             "last_updated": datetime.now().isoformat()
         }
@@ -1,17 +1,35 @@
 import asyncio
 import threading
 import time
+import gzip
 import hashlib
+import json
 import logging
+import os
 import psycopg2
-from datetime import datetime
+from collections import OrderedDict, namedtuple
+from datetime import datetime, date
+from decimal import Decimal
 from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
-from flask import jsonify, request
+from flask import request, make_response, current_app, g, render_template
+from jinja2 import FileSystemBytecodeCache
 from pydantic import BaseModel, validator
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any
 import jwt
+import gevent_mode
 from config import get_config
+from metrics import DB_LATENCY, timed
+
+# Optional fast-path dependencies
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 config = get_config()
 logger = logging.getLogger(__name__)
@@ -21,6 +39,7 @@ class TradingAdviceRequest(BaseModel):
     user_id: str
     query: str = "general trading analysis"
     context: Dict[str, Any] = {}
+    seed: Optional[int] = None  # reproducible recommendation for this request
     
     @validator('user_id')
     def user_id_must_not_be_empty(cls, v):
@@ -58,19 +77,77 @@ class CheckoutRequest(BaseModel):
             raise ValueError(f'Invalid plan. Must be one of: {valid_plans}')
         return v
 
+# JSON Serialization
+def _json_default(obj):
+    """Serialize types the JSON encoders don't handle natively"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumps_stdlib(obj):
+    return json.dumps(obj, default=_json_default, separators=(',', ':')).encode('utf-8')
+
+def _dumps_orjson(obj):
+    return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+
+JSON_SERIALIZERS = {'json': _dumps_stdlib}
+if orjson is not None:
+    JSON_SERIALIZERS['orjson'] = _dumps_orjson
+
+_json_dumps = None
+
+def set_json_serializer(serializer):
+    """Select the serializer used by api_success/api_error (name or callable returning bytes)"""
+    global _json_dumps
+    if callable(serializer):
+        _json_dumps = serializer
+    elif serializer == 'auto':
+        _json_dumps = JSON_SERIALIZERS.get('orjson', _dumps_stdlib)
+    elif serializer in JSON_SERIALIZERS:
+        _json_dumps = JSON_SERIALIZERS[serializer]
+    else:
+        raise ValueError(f"Unknown JSON serializer '{serializer}'. Available: {sorted(JSON_SERIALIZERS)}")
+    return _json_dumps
+
+def json_dumps(obj):
+    """Serialize obj to JSON bytes with the configured serializer"""
+    return _json_dumps(obj)
+
+set_json_serializer(config.JSON_SERIALIZER)
+
+_timestamp_cache = (0, '')
+
+def response_timestamp():
+    """ISO timestamp for response envelopes, formatted at most once per second"""
+    global _timestamp_cache
+    second = int(time.time())
+    cached_second, cached_value = _timestamp_cache
+    if cached_second != second:
+        cached_value = datetime.fromtimestamp(second).isoformat()
+        _timestamp_cache = (second, cached_value)
+    return cached_value
+
+def json_response(payload, status=200):
+    """Build a Flask JSON response using the configured serializer"""
+    return current_app.response_class(json_dumps(payload), status=status, mimetype='application/json')
+
 # Standardized API Response Functions
 def api_success(data=None, message="Success", metadata=None):
     """Standardized success response"""
     response = {
         "success": True,
         "message": message,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": g.get('response_timestamp') or response_timestamp()
     }
     if data is not None:
         response["data"] = data
     if metadata:
         response["metadata"] = metadata
-    return jsonify(response)
+    return json_response(response)
 
 def api_error(message, code=400, details=None, error_type="ValidationError"):
     """Standardized error response"""
@@ -81,15 +158,194 @@ def api_error(message, code=400, details=None, error_type="ValidationError"):
             "message": message,
             "code": code
         },
-        "timestamp": datetime.now().isoformat()
+        "timestamp": response_timestamp()
     }
     if details:
         response["error"]["details"] = details
     
     logger.warning(f"API Error {code}: {message}", extra={"details": details})
-    return jsonify(response), code
+    return json_response(response), code
+
+# Response Compression
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript'
+}
+
+def _choose_encoding():
+    """Pick the best content-coding the client accepts"""
+    accept = request.accept_encodings
+    if brotli is not None and accept['br']:
+        return 'br'
+    if accept['gzip']:
+        return 'gzip'
+    return None
+
+def _compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=config.BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=config.GZIP_LEVEL)
+
+def compress_response(response):
+    """after_request hook: gzip/brotli-encode compressible responses above the size threshold"""
+    if (response.status_code != 200 or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    encoding = _choose_encoding()
+    if encoding is None or response.content_length is None \
+            or response.content_length < config.COMPRESSION_MIN_SIZE:
+        return response
+    
+    # Versioned responses are compressed once per ETag and encoding
+    etag, weak = response.get_etag()
+    cache_key = f"{etag}-{encoding}" if etag else None
+    cached = response_cache.get(cache_key) if cache_key else None
+    if cached is not None:
+        compressed = cached[0]
+    else:
+        compressed = _compress(response.get_data(), encoding)
+        if cache_key:
+            response_cache.put(cache_key, compressed, response.mimetype)
+    
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    if etag:
+        response.set_etag(cache_key, weak)
+    return response
+
+# Response Versioning (Conditional GET)
+DataVersion = namedtuple('DataVersion', ['version', 'last_modified'])
+
+def static_version(*objects):
+    """Content-derived version for data that only changes on deploy"""
+    encoded = json.dumps(objects, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+class ResponseCache:
+    """Bounded LRU of serialized response bodies keyed by ETag"""
+    
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, etag):
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+            return entry
+    
+    def put(self, etag, body, mimetype):
+        with self._lock:
+            self._entries[etag] = (body, mimetype)
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return self._entries[etag]
+
+# Global response cache instance
+response_cache = ResponseCache()
+
+def conditional_get(version_func, max_age=0, private=False, per_user=False):
+    """Decorator adding ETag, Last-Modified and Cache-Control to GET routes.
+    
+    version_func returns the current data version (a DataVersion or any
+    str()-able token), or None to skip caching for this request. The ETag is
+    derived from the route, query string and data version, so a matching
+    If-None-Match is answered with 304 without calling the view, and the
+    serialized body is reused until the version changes.
+    """
+    cache_control = f"{'private' if private else 'public'}, max-age={max_age}"
+    if max_age == 0:
+        cache_control += ", must-revalidate"
+    
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            version = version_func()
+            if version is None:
+                response = make_response(f(*args, **kwargs))
+                response.headers['Cache-Control'] = 'no-cache'
+                return response
+            
+            last_modified = getattr(version, 'last_modified', None)
+            key = [request.endpoint, request.query_string.decode('latin-1'), str(version)]
+            if per_user:
+                user = getattr(request, 'current_user', {}) or {}
+                key.extend([str(user.get('user_id')), str(user.get('tier'))])
+            etag = hashlib.sha256('|'.join(key).encode()).hexdigest()[:32]
+            
+            not_modified = False
+            if request.if_none_match:
+                # Compressed variants carry an encoding suffix (see compress_response)
+                for candidate in (etag, f"{etag}-br", f"{etag}-gzip"):
+                    if request.if_none_match.contains_weak(candidate):
+                        not_modified, etag = True, candidate
+                        break
+            elif last_modified and request.if_modified_since:
+                not_modified = last_modified <= request.if_modified_since.replace(tzinfo=None)
+            
+            if not_modified:
+                response = current_app.response_class(status=304)
+            else:
+                cached = response_cache.get(etag)
+                if cached is None:
+                    if last_modified:
+                        g.response_timestamp = last_modified.isoformat()
+                    response = make_response(f(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    cached = response_cache.put(etag, response.get_data(), response.mimetype)
+                body, mimetype = cached
+                response = current_app.response_class(body, mimetype=mimetype)
+            
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = cache_control
+            if per_user:
+                response.vary.add('Authorization')
+            return response
+        return decorated_function
+    return decorator
+
+# Template Rendering
+def configure_template_cache(app):
+    """Cache compiled Jinja templates on disk and skip per-request reload checks"""
+    cache_dir = config.TEMPLATE_CACHE_DIR
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    except OSError as e:
+        logger.warning(f"Template bytecode cache disabled: {e}")
+    app.jinja_env.auto_reload = bool(app.debug)
+
+def prerender_page(app, template_name, max_age=3600, **context):
+    """Render a fully static template once and return a view serving the cached bytes"""
+    with app.app_context():
+        body = render_template(template_name, **context).encode('utf-8')
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    cache_control = f"public, max-age={max_age}"
+    
+    def serve_page():
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(body, mimetype='text/html')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = cache_control
+        return response
+    return serve_page
 
 # Database Connection Management
+def query_operation(query):
+    """Leading SQL keyword of a query, used as a low-cardinality metric label"""
+    words = query.lstrip().split(None, 1)
+    return words[0].upper() if words else 'UNKNOWN'
+
 class DatabaseManager:
     """Thread-safe database connection manager"""
     
@@ -115,13 +371,14 @@ class DatabaseManager:
         conn = None
         cursor = None
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(query, params or ())
-            
-            if fetch:
-                return cursor.fetchall()
-            return cursor.rowcount
+            with timed(DB_LATENCY, operation=query_operation(query)):
+                conn = self.get_connection()
+                cursor = conn.cursor()
+                cursor.execute(query, params or ())
+                
+                if fetch:
+                    return cursor.fetchall()
+                return cursor.rowcount
             
         except Exception as e:
             logger.error(f"Database query failed: {e}", extra={
@@ -136,18 +393,133 @@ class DatabaseManager:
                 cursor.close()
             if conn:
                 conn.close()
+    
+    def iter_query(self, query, params=None, batch_size=10000):
+        """Stream rows from a large result set with a server-side cursor"""
+        conn = self.get_connection()
+        try:
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_READ_COMMITTED)
+            with conn.cursor(name=f"iter_{threading.get_ident()}") as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(query, params or ())
+                for row in cursor:
+                    yield row
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Database streaming query failed: {e}", extra={"query": query})
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
 
 # Global database manager instance
 db_manager = DatabaseManager()
 
+class PersistentConnection:
+    """One autocommit connection reused across calls, reopened after a fork or a drop"""
+
+    def __init__(self, connect_timeout):
+        self.connect_timeout = connect_timeout
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        # Connections must not cross a fork; a child opens its own
+        if self._conn is None or self._pid != os.getpid() or self._conn.closed:
+            self._conn = psycopg2.connect(config.DATABASE_URL, connect_timeout=self.connect_timeout)
+            self._conn.autocommit = True
+            self._pid = os.getpid()
+        return self._conn
+
+    def execute(self, query, params=None, fetch=False):
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    with timed(DB_LATENCY, operation=query_operation(query)):
+                        with self._connection().cursor() as cursor:
+                            cursor.execute(query, params or ())
+                            return cursor.fetchall() if fetch else cursor.rowcount
+                except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                    # Stale connection (server restart, idle timeout): reconnect once
+                    self._conn = None
+                    if attempt:
+                        raise
+
+class PeriodicRefresher:
+    """Daemon thread calling fn every interval seconds, started once per process"""
+
+    def __init__(self, name, interval, fn, immediate=False):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self.immediate = immediate
+        self._pid = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the thread in this process (idempotent; a forked child starts its own)"""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    self._stop = threading.Event()
+                    threading.Thread(target=self._run, args=(self._stop,), name=self.name, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._pid = None
+
+    def _run(self, stop):
+        wait = 0 if self.immediate else self.interval
+        failing = False
+        while not stop.wait(wait):
+            wait = self.interval
+            try:
+                self.fn()
+                failing = False
+            except Exception as e:
+                # Log once per outage, not once per interval
+                if not failing:
+                    logger.warning(f"{self.name} failed, retrying every {self.interval}s: {e}")
+                failing = True
+
 # Whitelist Management
+# One implicit transaction; the advisory lock stops workers booting together from racing
+WHITELIST_SCHEMA = """
+    SELECT pg_advisory_xact_lock(hashtext('whitelist_schema'));
+    CREATE SEQUENCE IF NOT EXISTS whitelist_version_seq;
+    CREATE TABLE IF NOT EXISTS whitelist (
+        email VARCHAR(255) PRIMARY KEY,
+        tier VARCHAR(20) NOT NULL,
+        added_at TIMESTAMP DEFAULT NOW(),
+        version BIGINT NOT NULL DEFAULT nextval('whitelist_version_seq')
+    );
+    ALTER TABLE whitelist ADD COLUMN IF NOT EXISTS
+        version BIGINT NOT NULL DEFAULT nextval('whitelist_version_seq');
+    -- Removals keep the row as a tombstone with a new version, so delta syncs see them
+    ALTER TABLE whitelist ADD COLUMN IF NOT EXISTS deleted BOOLEAN NOT NULL DEFAULT FALSE;
+    CREATE INDEX IF NOT EXISTS idx_whitelist_version ON whitelist(version);
+"""
+
 class WhitelistManager:
-    """Manage beta access whitelist"""
+    """Manage beta access whitelist.
+    
+    The whitelist lives in Postgres. Each worker keeps a compact index of
+    64-bit email hashes in two sets (beta, vip), so lookups are O(1) and
+    cost ~50 bytes per entry. Writes bump a per-row version from
+    whitelist_version_seq, including removals, which leave a tombstone row
+    (deleted = TRUE); a background thread in each worker polls the max
+    version every WHITELIST_REFRESH_SECONDS and loads only newer rows, with a
+    periodic full reload to pick up anything a concurrent writer committed
+    out of order or a row deleted by hand. Lookups never touch the database.
+    """
     
     def __init__(self):
-        # For launch, you can add emails manually here
-        # Later, move to database
-        self.whitelist_emails = {
+        # Seed entries for launch, always granted even without a database
+        self.seed_whitelist = {
             # Add your beta testers here - REPLACE THESE WITH REAL EMAILS
             "your-email@gmail.com",        # Replace with your actual email
             "beta@whaletracker.com",       # Replace with real beta tester
@@ -157,22 +529,119 @@ class WhitelistManager:
         }
         
         # VIP list gets instant access + perks  
-        self.vip_emails = {
+        self.seed_vip = {
             "your-admin-email@gmail.com",  # Replace with your real admin email
             # Add investors, key supporters with their real emails
         }
+        
+        self.refresh_interval = config.WHITELIST_REFRESH_SECONDS
+        self.full_reload_interval = config.WHITELIST_FULL_RELOAD_SECONDS
+        self._lock = threading.Lock()
+        self._version = 0
+        self._next_refresh = 0.0
+        self._next_full_reload = 0.0
+        self._beta_keys, self._vip_keys = self._seed_index()
+        self.refresher = PeriodicRefresher('whitelist-refresh', self.refresh_interval, self.refresh)
+        self._schema_ready = False
+    
+    def ensure_schema(self):
+        """Create or upgrade the whitelist table (idempotent, once per process)"""
+        if not self._schema_ready:
+            db_manager.safe_execute(WHITELIST_SCHEMA)
+            self._schema_ready = True
+    
+    @staticmethod
+    def _key(email):
+        """64-bit hash of a normalized email used as the index key"""
+        digest = hashlib.blake2b(email.lower().strip().encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big')
+    
+    def _seed_index(self):
+        vip_keys = {self._key(email) for email in self.seed_vip}
+        beta_keys = {self._key(email) for email in self.seed_whitelist} - vip_keys
+        return beta_keys, vip_keys
+    
+    def _seed_tier(self, email):
+        email = email.lower().strip()
+        if email in self.seed_vip:
+            return "vip"
+        return "beta" if email in self.seed_whitelist else None
+    
+    def _apply(self, email, tier, deleted=False):
+        """Apply one whitelist row to the in-memory index"""
+        if deleted:
+            # Seed entries are always granted, as on a full reload
+            tier = self._seed_tier(email)
+        key = self._key(email)
+        self._beta_keys.discard(key)
+        self._vip_keys.discard(key)
+        if tier == "vip":
+            self._vip_keys.add(key)
+        elif tier == "beta":
+            self._beta_keys.add(key)
+    
+    def refresh(self, full=False):
+        """Sync the index with the database (delta by version, or full reload)"""
+        with self._lock:
+            now = time.monotonic()
+            if not full and now < self._next_refresh:
+                # Another caller refreshed while this one waited for the lock
+                return False
+            self._next_refresh = now + self.refresh_interval
+            full = full or now >= self._next_full_reload
+            try:
+                self.ensure_schema()
+                if full:
+                    beta_keys, vip_keys = self._seed_index()
+                    version = 0
+                    for email, tier, row_version, deleted in db_manager.iter_query(
+                        "SELECT email, tier, version, deleted FROM whitelist"
+                    ):
+                        version = max(version, row_version)
+                        if deleted:
+                            continue
+                        key = self._key(email)
+                        if tier == "vip":
+                            vip_keys.add(key)
+                            beta_keys.discard(key)
+                        elif tier == "beta" and key not in vip_keys:
+                            beta_keys.add(key)
+                    self._beta_keys, self._vip_keys = beta_keys, vip_keys
+                    self._version = version
+                    self._next_full_reload = now + self.full_reload_interval
+                    logger.info(f"Whitelist loaded: {len(beta_keys) + len(vip_keys)} entries, version {version}")
+                    return True
+                
+                result = db_manager.safe_execute(
+                    "SELECT COALESCE(MAX(version), 0) FROM whitelist", fetch=True
+                )
+                latest = result[0][0] if result else 0
+                if latest <= self._version:
+                    return False
+                
+                rows = db_manager.safe_execute(
+                    "SELECT email, tier, version, deleted FROM whitelist WHERE version > %s ORDER BY version",
+                    (self._version,), fetch=True
+                )
+                for email, tier, row_version, deleted in rows:
+                    self._apply(email, tier, deleted)
+                    self._version = max(self._version, row_version)
+                return True
+            except Exception as e:
+                logger.warning(f"Whitelist refresh failed, serving cached index: {e}")
+                return False
     
     def is_whitelisted(self, email):
         """Check if email is whitelisted"""
-        email = email.lower().strip()
-        return email in self.whitelist_emails or email in self.vip_emails
+        key = self._key(email)
+        return key in self._vip_keys or key in self._beta_keys
     
     def get_user_tier(self, email):
         """Get user tier based on whitelist status"""
-        email = email.lower().strip()
-        if email in self.vip_emails:
+        key = self._key(email)
+        if key in self._vip_keys:
             return "vip"
-        elif email in self.whitelist_emails:
+        elif key in self._beta_keys:
             return "beta"
         else:
             return "waitlist"
@@ -180,47 +649,315 @@ class WhitelistManager:
     def add_to_whitelist(self, email, tier="beta"):
         """Add email to whitelist (for admin use)"""
         email = email.lower().strip()
-        if tier == "vip":
-            self.vip_emails.add(email)
-        else:
-            self.whitelist_emails.add(email)
+        tier = "vip" if tier == "vip" else "beta"
+        with self._lock:
+            self._apply(email, tier)
         
-        # In production, save to database
+        # Other workers pick this up on their next version poll
         self._save_to_database(email, tier)
+        
+        # Tokens carry the tier claim, so make the user pick up the new tier
+        revoke_user_tokens(generate_api_key(email))
+    
+    def remove_from_whitelist(self, email):
+        """Remove email from the whitelist in every worker (admin use); returns False if absent"""
+        email = email.lower().strip()
+        self.ensure_schema()
+        removed = db_manager.safe_execute(
+            """UPDATE whitelist SET deleted = TRUE, version = nextval('whitelist_version_seq')
+               WHERE email = %s AND NOT deleted
+               RETURNING email""",
+            (email,), fetch=True
+        )
+        with self._lock:
+            self._apply(email, None, deleted=True)
+        
+        # Drop tokens that still carry the old tier claim
+        revoke_user_tokens(generate_api_key(email))
+        return bool(removed)
+    
+    def apply_promotions(self, emails, tier="beta"):
+        """Add promoted waitlist users to the local index without changing existing tiers"""
+        with self._lock:
+            for email in emails:
+                key = self._key(email)
+                if key not in self._vip_keys and key not in self._beta_keys:
+                    self._apply(email, tier)
     
     def _save_to_database(self, email, tier):
         """Save whitelist status to database"""
         try:
+            self.ensure_schema()
             db_manager.safe_execute(
-                """INSERT INTO whitelist (email, tier, added_at) 
-                   VALUES (%s, %s, NOW()) 
-                   ON CONFLICT (email) DO UPDATE SET tier = EXCLUDED.tier""",
+                """INSERT INTO whitelist (email, tier, added_at, version) 
+                   VALUES (%s, %s, NOW(), nextval('whitelist_version_seq')) 
+                   ON CONFLICT (email) DO UPDATE SET
+                   tier = EXCLUDED.tier,
+                   version = EXCLUDED.version,
+                   deleted = FALSE""",
                 (email, tier)
             )
         except Exception as e:
             logger.error("Failed to save whitelist", extra={"email": email, "error": str(e)})
+    
+    def list_entries(self, tier=None, limit=100, offset=0):
+        """Page through whitelisted emails from the database (admin use)"""
+        self.ensure_schema()
+        query = "SELECT email, tier FROM whitelist WHERE NOT deleted"
+        params = []
+        if tier:
+            query += " AND tier = %s"
+            params.append(tier)
+        query += " ORDER BY added_at DESC LIMIT %s OFFSET %s"
+        params.extend([limit, offset])
+        return db_manager.safe_execute(query, tuple(params), fetch=True)
+    
+    def stats(self):
+        return {
+            "beta": len(self._beta_keys),
+            "vip": len(self._vip_keys),
+            "total": len(self._beta_keys) + len(self._vip_keys),
+            "version": self._version
+        }
 
 # Global whitelist manager
 whitelist_manager = WhitelistManager()
 
+# Waitlist Management
+# Tables from before queue numbers get them in signup order, once
+WAITLIST_SCHEMA = """
+    SELECT pg_advisory_xact_lock(hashtext('waitlist_schema'));
+    CREATE SEQUENCE IF NOT EXISTS waitlist_queue_seq;
+    CREATE TABLE IF NOT EXISTS waitlist (
+        email VARCHAR(255) PRIMARY KEY,
+        signup_date TIMESTAMP DEFAULT NOW(),
+        queue_number BIGINT NOT NULL DEFAULT nextval('waitlist_queue_seq'),
+        promoted_at TIMESTAMP
+    );
+    ALTER TABLE waitlist ADD COLUMN IF NOT EXISTS promoted_at TIMESTAMP;
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                       WHERE table_schema = current_schema() AND table_name = 'waitlist'
+                         AND column_name = 'queue_number') THEN
+            ALTER TABLE waitlist ADD COLUMN queue_number BIGINT;
+            UPDATE waitlist SET queue_number = ranked.n
+            FROM (SELECT email, ROW_NUMBER() OVER (ORDER BY signup_date, email) AS n FROM waitlist) ranked
+            WHERE waitlist.email = ranked.email;
+            PERFORM setval('waitlist_queue_seq', COALESCE(MAX(queue_number), 0) + 1, false) FROM waitlist;
+            ALTER TABLE waitlist
+                ALTER COLUMN queue_number SET DEFAULT nextval('waitlist_queue_seq'),
+                ALTER COLUMN queue_number SET NOT NULL;
+        END IF;
+    END $$;
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_waitlist_queue_number ON waitlist(queue_number);
+    CREATE INDEX IF NOT EXISTS idx_waitlist_pending ON waitlist(queue_number) WHERE promoted_at IS NULL;
+    -- Fenwick tree of waiting users over queue numbers 1..2^40: node i holds the
+    -- waiting users numbered (i - lowbit(i), i]
+    CREATE TABLE IF NOT EXISTS waitlist_rank (node BIGINT PRIMARY KEY, waiting BIGINT NOT NULL);
+    CREATE OR REPLACE FUNCTION waitlist_rank_nodes(queue_number BIGINT) RETURNS SETOF BIGINT
+    LANGUAGE sql IMMUTABLE AS $fn$
+        WITH RECURSIVE up(i) AS (
+            SELECT queue_number
+            UNION ALL
+            SELECT i + (i & -i) FROM up WHERE i + (i & -i) <= 1099511627776
+        )
+        SELECT i FROM up
+    $fn$;
+    CREATE OR REPLACE FUNCTION waitlist_waiting_before(queue_number BIGINT) RETURNS BIGINT
+    LANGUAGE sql STABLE AS $fn$
+        WITH RECURSIVE down(i) AS (
+            SELECT queue_number - 1 WHERE queue_number > 1
+            UNION ALL
+            SELECT i - (i & -i) FROM down WHERE i - (i & -i) > 0
+        )
+        SELECT COALESCE(SUM(waiting), 0)::BIGINT FROM waitlist_rank WHERE node IN (SELECT i FROM down)
+    $fn$;
+    -- Statement triggers keep the tree in step with every write, one upsert per touched node;
+    -- nodes are updated in ascending order so concurrent statements cannot deadlock
+    CREATE OR REPLACE FUNCTION waitlist_rank_sync() RETURNS trigger LANGUAGE plpgsql AS $fn$
+    DECLARE
+        added BIGINT[] := '{}';
+        removed BIGINT[] := '{}';
+    BEGIN
+        -- Each transition table only exists for the events that define it
+        IF TG_OP <> 'DELETE' THEN
+            SELECT COALESCE(array_agg(queue_number), '{}') INTO added FROM changed_new WHERE promoted_at IS NULL;
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            SELECT COALESCE(array_agg(queue_number), '{}') INTO removed FROM changed_old WHERE promoted_at IS NULL;
+        END IF;
+        INSERT INTO waitlist_rank (node, waiting)
+        SELECT node, SUM(delta) FROM (
+            SELECT unnest(added), 1
+            UNION ALL
+            SELECT unnest(removed), -1
+        ) changes(queue_number, delta), waitlist_rank_nodes(changes.queue_number) node
+        GROUP BY node HAVING SUM(delta) <> 0
+        ORDER BY node
+        ON CONFLICT (node) DO UPDATE SET waiting = waitlist_rank.waiting + EXCLUDED.waiting;
+        RETURN NULL;
+    END
+    $fn$;
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'waitlist_rank_insert'
+                       AND tgrelid = 'waitlist'::regclass) THEN
+            -- Hold off writers until the tree is built and the triggers are in place
+            LOCK TABLE waitlist IN SHARE ROW EXCLUSIVE MODE;
+            DELETE FROM waitlist_rank;
+            INSERT INTO waitlist_rank (node, waiting)
+            SELECT node, COUNT(*) FROM waitlist, waitlist_rank_nodes(waitlist.queue_number) node
+            WHERE promoted_at IS NULL
+            GROUP BY node;
+            CREATE TRIGGER waitlist_rank_insert AFTER INSERT ON waitlist
+                REFERENCING NEW TABLE AS changed_new
+                FOR EACH STATEMENT EXECUTE FUNCTION waitlist_rank_sync();
+            CREATE TRIGGER waitlist_rank_update AFTER UPDATE ON waitlist
+                REFERENCING OLD TABLE AS changed_old NEW TABLE AS changed_new
+                FOR EACH STATEMENT EXECUTE FUNCTION waitlist_rank_sync();
+            CREATE TRIGGER waitlist_rank_delete AFTER DELETE ON waitlist
+                REFERENCING OLD TABLE AS changed_old
+                FOR EACH STATEMENT EXECUTE FUNCTION waitlist_rank_sync();
+        END IF;
+    END $$;
+"""
+
+class WaitlistTracker:
+    """Track waitlist positions by insert-time queue number.
+    
+    Every signup gets a queue_number from waitlist_queue_seq when its row is
+    inserted. People ahead of a user is the number of users still waiting
+    with a lower queue number. Triggers keep those counts in a Fenwick tree
+    (waitlist_rank), so reading a position sums at most 40 rows and a signup
+    or promotion updates at most 40 per queue number, however long the
+    queue. It stays exact however admins promote users and whatever gaps
+    the sequence has.
+    """
+    
+    def __init__(self):
+        self._schema_ready = False
+    
+    def ensure_schema(self):
+        """Create or upgrade the waitlist table (idempotent, once per process)"""
+        if not self._schema_ready:
+            db_manager.safe_execute(WAITLIST_SCHEMA)
+            self._schema_ready = True
+    
+    @staticmethod
+    def _position(queue_number, promoted_at, people_ahead):
+        if promoted_at is not None:
+            return {'queue_number': queue_number, 'promoted': True, 'position': 0, 'people_ahead': 0}
+        return {
+            'queue_number': queue_number,
+            'promoted': False,
+            'position': people_ahead + 1,
+            'people_ahead': people_ahead
+        }
+    
+    def signup(self, email):
+        """Add email to the waitlist (idempotent) and return its position in one round trip"""
+        self.ensure_schema()
+        # Only a row that is actually inserted draws a queue number
+        result = db_manager.safe_execute(
+            """WITH existing AS (
+                   SELECT queue_number, promoted_at FROM waitlist WHERE email = %s
+               ), inserted AS (
+                   INSERT INTO waitlist (email, signup_date)
+                   SELECT %s, NOW() WHERE NOT EXISTS (SELECT 1 FROM existing)
+                   ON CONFLICT (email) DO NOTHING
+                   RETURNING queue_number, promoted_at
+               ), entry AS (
+                   SELECT queue_number, promoted_at FROM inserted
+                   UNION ALL
+                   SELECT queue_number, promoted_at FROM existing
+                   LIMIT 1
+               )
+               SELECT queue_number, promoted_at, waitlist_waiting_before(queue_number)
+               FROM entry""",
+            (email, email), fetch=True
+        )
+        if not result:
+            # A concurrent signup for the same email won the insert
+            return self.position(email)
+        return self._position(*result[0])
+    
+    def position(self, email):
+        """Current position for an email, or None if it never signed up"""
+        self.ensure_schema()
+        result = db_manager.safe_execute(
+            """SELECT queue_number, promoted_at, waitlist_waiting_before(queue_number)
+               FROM waitlist WHERE email = %s""",
+            (email,), fetch=True
+        )
+        if not result:
+            return None
+        return self._position(*result[0])
+    
+    def _promote(self, selection, params, tier):
+        tier = "vip" if tier == "vip" else "beta"
+        self.ensure_schema()
+        whitelist_manager.ensure_schema()
+        rows = db_manager.safe_execute(
+            f"""WITH promoted AS (
+                    UPDATE waitlist SET promoted_at = NOW()
+                    WHERE email IN ({selection})
+                    RETURNING email
+                ), whitelisted AS (
+                    INSERT INTO whitelist (email, tier, added_at, version)
+                    SELECT email, %s, NOW(), nextval('whitelist_version_seq') FROM promoted
+                    ON CONFLICT (email) DO UPDATE SET
+                        tier = EXCLUDED.tier, version = EXCLUDED.version, deleted = FALSE
+                    WHERE whitelist.deleted
+                    RETURNING email
+                )
+                SELECT email FROM promoted""",
+            params + (tier,), fetch=True
+        )
+        emails = [row[0] for row in rows]
+        
+        # Apply locally right away; other workers pick it up on their next poll
+        whitelist_manager.apply_promotions(emails, tier)
+        
+        logger.info(f"Promoted {len(emails)} users from waitlist", extra={"tier": tier})
+        return emails
+    
+    def promote_next(self, count, tier="beta"):
+        """Promote the next `count` waiting users, in queue order, in one statement"""
+        return self._promote(
+            """SELECT email FROM waitlist
+               WHERE promoted_at IS NULL
+               ORDER BY queue_number
+               LIMIT %s
+               FOR UPDATE SKIP LOCKED""",
+            (count,), tier
+        )
+    
+    def promote_emails(self, emails, tier="beta"):
+        """Promote specific waiting users in one statement"""
+        return self._promote(
+            """SELECT email FROM waitlist
+               WHERE email = ANY(%s) AND promoted_at IS NULL
+               FOR UPDATE SKIP LOCKED""",
+            ([email.lower().strip() for email in emails],), tier
+        )
+
+# Global waitlist tracker
+waitlist_tracker = WaitlistTracker()
+
 # Helper functions for whitelist (to be used in app.py)
 def handle_waitlist_signup(email):
     """Handle users not on whitelist"""
     try:
-        # Add to waitlist database
-        db_manager.safe_execute(
-            """INSERT INTO waitlist (email, signup_date) 
-               VALUES (%s, NOW()) 
-               ON CONFLICT (email) DO NOTHING""",
-            (email,)
-        )
+        position = waitlist_tracker.signup(email)
         
         logger.info("User added to waitlist", extra={"email": email})
         
         return api_success({
             'waitlisted': True,
             'message': 'Thanks for your interest! You\'ve been added to our beta waitlist. We\'ll notify you when access becomes available.',
-            'position': get_waitlist_position(email)
+            'position': position['position'],
+            'people_ahead': position['people_ahead']
         })
         
     except Exception as e:
@@ -230,37 +967,65 @@ def handle_waitlist_signup(email):
 def get_waitlist_position(email):
     """Get user's position in waitlist"""
     try:
-        result = db_manager.safe_execute(
-            """SELECT COUNT(*) FROM waitlist 
-               WHERE signup_date <= (SELECT signup_date FROM waitlist WHERE email = %s)""",
-            (email,), fetch=True
-        )
-        return result[0][0] if result else 1
-    except:
+        position = waitlist_tracker.position(email)
+        return position['position'] if position else 1
+    except Exception:
         return 1
 
 # Async Helper for Trading AI
 class AsyncHelper:
-    """Helper to run async functions in Flask synchronous context"""
+    """Helper to run async functions in Flask synchronous context
+
+    Under gevent (gevent_mode.py) the loop "thread" is a greenlet and callers
+    wait for results cooperatively, so one worker can have thousands of
+    coroutines in flight; blocking calls inside them belong in
+    asyncio.to_thread, which then runs on a pool of WORKER_CONNECTIONS greenlets.
+    """
     
     def __init__(self):
         self.executor = ThreadPoolExecutor(max_workers=4)
         self.loop = None
-        self._start_loop()
+        self._cooperative = False
+        self._lock = threading.Lock()
     
     def _start_loop(self):
-        """Start background event loop"""
+        """Start background event loop (on first use, not at import)"""
+        ready = threading.Event()
+        cooperative = self._cooperative = gevent_mode.active()
+        
         def run_loop():
-            self.loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self.loop)
-            self.loop.run_forever()
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            if cooperative:
+                loop.set_default_executor(ThreadPoolExecutor(max_workers=config.WORKER_CONNECTIONS))
+            self.loop = loop
+            ready.set()
+            loop.run_forever()
         
         thread = threading.Thread(target=run_loop, daemon=True)
         thread.start()
-        
-        # Wait for loop to be ready
-        while self.loop is None:
-            time.sleep(0.01)
+        ready.wait()
+    
+    def after_fork(self):
+        """Forget the parent's loop thread and executor (call in a freshly forked worker)"""
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.loop = None
+        self._lock = threading.Lock()
+    
+    def _ensure_loop(self):
+        if self.loop is None or self._cooperative != gevent_mode.active():
+            with self._lock:
+                if self.loop is not None and self._cooperative != gevent_mode.active():
+                    # Started in a real OS thread before gevent patched the process
+                    self.loop.call_soon_threadsafe(self.loop.stop)
+                    self.loop = None
+                if self.loop is None:
+                    self._start_loop()
+        return self.loop
+    
+    def submit(self, coro):
+        """Schedule a coroutine on the background loop without waiting for it"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
     
     def run_async(self, coro, timeout=None):
         """Run async coroutine and return result"""
@@ -268,7 +1033,7 @@ class AsyncHelper:
             timeout = config.TRADING_AI_TIMEOUT
             
         try:
-            future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+            future = self.submit(coro)
             return future.result(timeout=timeout)
         except asyncio.TimeoutError:
             logger.error(f"Async operation timed out after {timeout}s")
@@ -288,21 +1053,263 @@ def create_jwt_token(user_data):
         'email': user_data.get('email'),
         'tier': user_data.get('subscription_tier', 'basic'),
         'exp': datetime.utcnow() + config.JWT_ACCESS_TOKEN_EXPIRES,
-        'iat': datetime.utcnow()
+        'iat': datetime.utcnow(),
+        # iat is whole seconds; user revocations compare against this instead
+        'iat_ms': int(time.time() * 1000)
     }
     return jwt.encode(payload, config.JWT_SECRET_KEY, algorithm='HS256')
 
+class TokenCache:
+    """Bounded LRU of verified JWT payloads keyed by token digest.
+    
+    Entries expire at the token's `exp`. Revoked tokens and users are
+    remembered until their tokens would have expired anyway. This is the
+    process-local view; TokenRevocations shares revocations between workers.
+    """
+    
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._entries = OrderedDict()      # digest -> (payload, exp)
+        self._user_digests = {}            # user_id -> set of digests
+        self._revoked_digests = {}         # digest -> exp
+        self._revoked_users = {}           # user_id -> revocation time
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.decodes = 0
+        self.decode_time = 0.0
+        self.revocations = 0
+    
+    @staticmethod
+    def digest(token):
+        return hashlib.sha256(token.encode()).digest()
+    
+    def get(self, digest):
+        """Get cached payload for a token digest, evicting it once expired"""
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                payload, exp = entry
+                if exp > time.time():
+                    self._entries.move_to_end(digest)
+                    self.hits += 1
+                    return payload
+                self._evict(digest)
+            self.misses += 1
+            return None
+    
+    def put(self, digest, payload):
+        with self._lock:
+            self._entries[digest] = (payload, payload.get('exp', 0))
+            self._entries.move_to_end(digest)
+            user_id = payload.get('user_id')
+            if user_id:
+                self._user_digests.setdefault(user_id, set()).add(digest)
+            while len(self._entries) > self.max_size:
+                self._evict(next(iter(self._entries)))
+    
+    def _evict(self, digest):
+        payload, _ = self._entries.pop(digest)
+        digests = self._user_digests.get(payload.get('user_id'))
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._user_digests[payload.get('user_id')]
+    
+    def record_decode(self, seconds):
+        with self._lock:
+            self.decodes += 1
+            self.decode_time += seconds
+    
+    def is_revoked(self, digest, payload):
+        """Check a freshly decoded token against the revocation lists"""
+        with self._lock:
+            if digest in self._revoked_digests:
+                return True
+            revoked_at = self._revoked_users.get(payload.get('user_id'))
+            if revoked_at is None:
+                return False
+            # Tokens issued in the same instant as the revocation are revoked too
+            issued_at = payload['iat_ms'] / 1000 if 'iat_ms' in payload else payload.get('iat', 0)
+            return issued_at <= revoked_at
+    
+    def revoke_token(self, digest, exp):
+        """Revoke a single token (logout); re-applying a known revocation is a no-op"""
+        with self._lock:
+            self._prune_revocations()
+            if digest in self._revoked_digests:
+                return
+            self._revoked_digests[digest] = exp
+            if digest in self._entries:
+                self._evict(digest)
+            self.revocations += 1
+    
+    def revoke_user(self, user_id, revoked_at=None):
+        """Revoke every token issued to a user up to revoked_at (default now)"""
+        revoked_at = time.time() if revoked_at is None else float(revoked_at)
+        with self._lock:
+            self._prune_revocations()
+            if self._revoked_users.get(user_id, -1) >= revoked_at:
+                return
+            self._revoked_users[user_id] = revoked_at
+            for digest in list(self._user_digests.get(user_id, ())):
+                self._evict(digest)
+            self.revocations += 1
+    
+    def _prune_revocations(self):
+        now = time.time()
+        for digest in [d for d, exp in self._revoked_digests.items() if exp <= now]:
+            del self._revoked_digests[digest]
+        max_age = config.JWT_ACCESS_TOKEN_EXPIRES.total_seconds()
+        for user_id in [u for u, at in self._revoked_users.items() if at + max_age <= now]:
+            del self._revoked_users[user_id]
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "decodes": self.decodes,
+                "avg_decode_ms": round(self.decode_time / self.decodes * 1000, 4) if self.decodes else 0.0,
+                "revocations": self.revocations
+            }
+
+# Global verified-token cache
+token_cache = TokenCache(max_size=config.TOKEN_CACHE_SIZE)
+
+# One implicit transaction; the advisory lock stops workers booting together from racing
+TOKEN_REVOCATIONS_SCHEMA = """
+    SELECT pg_advisory_xact_lock(hashtext('token_revocations_schema'));
+    CREATE TABLE IF NOT EXISTS token_revocations (
+        id BIGSERIAL PRIMARY KEY,
+        token_digest BYTEA,
+        user_id VARCHAR(255),
+        revoked_at DOUBLE PRECISION NOT NULL,
+        expires_at BIGINT NOT NULL,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+    CREATE INDEX IF NOT EXISTS idx_token_revocations_created ON token_revocations(created_at);
+    CREATE INDEX IF NOT EXISTS idx_token_revocations_expires ON token_revocations(expires_at);
+"""
+
+# Each sync re-reads this much history, so rows committed late are not missed
+REVOCATION_SYNC_OVERLAP_SECONDS = 30
+
+class TokenRevocations:
+    """Token revocations shared by every worker through Postgres.
+    
+    A revocation is applied to this process's TokenCache at once and stored
+    in token_revocations. A background thread in each worker reads the rows
+    created since its last sync every TOKEN_REVOCATION_SYNC_SECONDS and
+    applies them, so a logout or tier change reaches the other workers
+    within that interval. A new worker loads every unexpired revocation on
+    its first sync. Rows are deleted once the tokens they cover have expired.
+    """
+    
+    def __init__(self, cache, sync_interval):
+        self.cache = cache
+        self._synced_until = None
+        self._schema_ready = False
+        self.refresher = PeriodicRefresher('token-revocation-sync', sync_interval, self.sync, immediate=True)
+    
+    def ensure_schema(self):
+        if not self._schema_ready:
+            db_manager.safe_execute(TOKEN_REVOCATIONS_SCHEMA)
+            self._schema_ready = True
+    
+    def _store(self, token_digest, user_id, revoked_at, expires_at):
+        self.ensure_schema()
+        db_manager.safe_execute(
+            """INSERT INTO token_revocations (token_digest, user_id, revoked_at, expires_at)
+               VALUES (%s, %s, %s, %s)""",
+            (psycopg2.Binary(token_digest) if token_digest else None, user_id, revoked_at, int(expires_at))
+        )
+    
+    def revoke_token(self, digest, exp):
+        """Revoke one token in every worker; raises if it could not be stored"""
+        self.cache.revoke_token(digest, exp)
+        self._store(digest, None, time.time(), exp)
+    
+    def revoke_user(self, user_id):
+        """Revoke every token issued to a user up to now, in every worker"""
+        now = time.time()
+        self.cache.revoke_user(user_id, now)
+        self._store(None, user_id, now, now + config.JWT_ACCESS_TOKEN_EXPIRES.total_seconds())
+    
+    def sync(self):
+        """Apply revocations stored by other workers since the last sync"""
+        self.ensure_schema()
+        since = self._synced_until or datetime(1970, 1, 1)
+        rows = db_manager.safe_execute(
+            """SELECT token_digest, user_id, revoked_at, expires_at, created_at FROM token_revocations
+               WHERE created_at > %s - %s * INTERVAL '1 second'
+                 AND expires_at > EXTRACT(EPOCH FROM NOW())
+               ORDER BY created_at""",
+            (since, REVOCATION_SYNC_OVERLAP_SECONDS), fetch=True
+        )
+        for token_digest, user_id, revoked_at, expires_at, created_at in rows:
+            if token_digest is not None:
+                self.cache.revoke_token(bytes(token_digest), expires_at)
+            elif user_id is not None:
+                self.cache.revoke_user(user_id, revoked_at)
+            since = max(since, created_at)
+        if self._synced_until is None:
+            # First sync of this process: also clear out rows nobody needs any more
+            db_manager.safe_execute(
+                "DELETE FROM token_revocations WHERE expires_at <= EXTRACT(EPOCH FROM NOW())"
+            )
+        self._synced_until = since
+        return len(rows)
+
+# Global revocation store
+token_revocations = TokenRevocations(token_cache, config.TOKEN_REVOCATION_SYNC_SECONDS)
+
+def _strip_bearer(token):
+    return token[7:] if token.startswith('Bearer ') else token
+
 def verify_jwt_token(token):
     """Verify and decode JWT token"""
+    token = _strip_bearer(token)
+    digest = TokenCache.digest(token)
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return dict(payload)
+    
+    start = time.perf_counter()
     try:
-        if token.startswith('Bearer '):
-            token = token[7:]
         payload = jwt.decode(token, config.JWT_SECRET_KEY, algorithms=['HS256'])
-        return payload
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
         return None
+    finally:
+        token_cache.record_decode(time.perf_counter() - start)
+    
+    if token_cache.is_revoked(digest, payload):
+        return None
+    token_cache.put(digest, payload)
+    return dict(payload)
+
+def revoke_jwt_token(token):
+    """Revoke a token in every worker on logout; returns False if it was not a valid token"""
+    token = _strip_bearer(token)
+    payload = verify_jwt_token(token)
+    if not payload:
+        return False
+    token_revocations.revoke_token(TokenCache.digest(token), payload.get('exp', 0))
+    return True
+
+def revoke_user_tokens(user_id):
+    """Invalidate all tokens issued to a user so the next request re-authenticates"""
+    try:
+        token_revocations.revoke_user(user_id)
+    except Exception as e:
+        # Still revoked in this worker; the others keep the old tokens until they expire
+        logger.error("Failed to store user token revocation", extra={"user_id": user_id, "error": str(e)})
 
 # Authentication Decorators
 def require_auth(f):
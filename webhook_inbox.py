@@ -0,0 +1,435 @@
+"""
+Durable webhook inbox.
+
+The /webhook route only verifies the provider signature and appends the raw
+event to the webhook_inbox table, then answers 200. A background worker in
+each process claims pending rows in batches (FOR UPDATE SKIP LOCKED, so any
+number of gunicorn workers can drain the same inbox), runs the payment
+handlers and retries failures with exponential backoff.
+
+If Postgres is unreachable the event is appended to a local spill log
+(one fsync'd JSON line per event) and the worker moves it into the table
+once the database is back, so an acknowledged event is never dropped.
+Delivery to the handlers is at-least-once.
+"""
+
+import atexit
+import fcntl
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+import psycopg2
+
+from config import get_config
+from metrics import WEBHOOK_EVENTS
+from utils import PersistentConnection, db_manager, log_user_action
+
+config = get_config()
+logger = logging.getLogger(__name__)
+
+# One implicit transaction; the advisory lock stops workers booting together from racing
+INBOX_SCHEMA = """
+    SELECT pg_advisory_xact_lock(hashtext('webhook_inbox_schema'));
+    CREATE TABLE IF NOT EXISTS webhook_inbox (
+        id BIGSERIAL PRIMARY KEY,
+        provider VARCHAR(20) NOT NULL,
+        event_id VARCHAR(255),
+        event_type VARCHAR(100),
+        payload TEXT NOT NULL,
+        status VARCHAR(10) NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        received_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        processed_at TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_webhook_inbox_pending ON webhook_inbox(next_attempt_at) WHERE status = 'pending';
+    -- Provider event ids are the idempotency key; inboxes created before it get deduplicated once
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_webhook_inbox_event') THEN
+            DELETE FROM webhook_inbox a USING webhook_inbox b
+            WHERE a.provider = b.provider AND a.event_id = b.event_id AND a.id > b.id;
+            CREATE UNIQUE INDEX idx_webhook_inbox_event ON webhook_inbox(provider, event_id);
+        END IF;
+    END $$;
+"""
+
+class RecentEventIds:
+    """Bounded LRU of (provider, event id) pairs this process has already stored.
+
+    Redeliveries of recent events are answered from memory; anything older
+    or first seen by another worker is caught by the unique index instead.
+    """
+
+    def __init__(self, max_size=50000):
+        self.max_size = max_size
+        self._ids = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def seen(self, provider, event_id):
+        key = (provider, event_id)
+        with self._lock:
+            if key in self._ids:
+                self._ids.move_to_end(key)
+                self.hits += 1
+                return True
+            return False
+
+    def add(self, provider, event_id):
+        with self._lock:
+            self._ids[(provider, event_id)] = None
+            self._ids.move_to_end((provider, event_id))
+            while len(self._ids) > self.max_size:
+                self._ids.popitem(last=False)
+
+    def stats(self):
+        return {"size": len(self._ids), "capacity": self.max_size, "hits": self.hits}
+
+class WebhookInbox:
+    """Append-only store of verified webhook events awaiting processing"""
+
+    def __init__(self, spill_path, lease_seconds=300, connect_timeout=5, retry_db_after=10.0,
+                 recent_ids=50000, append_connections=4):
+        self.spill_path = spill_path
+        self.lease_seconds = lease_seconds
+        self.retry_db_after = retry_db_after
+        # Request threads (or greenlets) borrow one of a few append connections, opened on
+        # first use; the worker thread and its handlers share another
+        self._append_pool = queue.LifoQueue()
+        for _ in range(append_connections):
+            self._append_pool.put(PersistentConnection(connect_timeout))
+        self._connect_timeout = connect_timeout
+        self.worker_db = PersistentConnection(connect_timeout)
+        self.recent = RecentEventIds(recent_ids)
+        self.duplicates = 0
+        self._schema_ready = False
+        self._db_down_until = 0.0
+
+    def ensure_schema(self):
+        if not self._schema_ready:
+            db_manager.safe_execute(INBOX_SCHEMA)
+            self._schema_ready = True
+
+    # Fast path
+    def append(self, provider, event_id, event_type, payload):
+        """Persist one verified event; returns 'inbox', 'spill' or 'duplicate'.
+
+        Raises only if neither the table nor the spill log accepted the
+        event, in which case the caller must not acknowledge it.
+        """
+        if event_id is not None and self.recent.seen(provider, event_id):
+            return self._duplicate(provider)
+        # While the database is known to be down, skip straight to the spill log
+        if time.monotonic() >= self._db_down_until:
+            try:
+                self.ensure_schema()
+                inserted = self._insert(provider, event_id, event_type, payload)
+            except queue.Empty:
+                # Every append connection stayed busy; the database itself is fine
+                logger.warning(f"No free webhook inbox connection, spilling {provider} event {event_id}")
+            except Exception as e:
+                self._db_down_until = time.monotonic() + self.retry_db_after
+                logger.warning(f"Webhook inbox insert failed, spilling {provider} event {event_id}: {e}")
+            else:
+                if event_id is not None:
+                    self.recent.add(provider, event_id)
+                if not inserted:
+                    return self._duplicate(provider)
+                WEBHOOK_EVENTS.inc(provider=provider, outcome='queued')
+                return 'inbox'
+        self._spill({"provider": provider, "event_id": event_id,
+                     "event_type": event_type, "payload": payload})
+        # The import deduplicates spilled events against the table
+        if event_id is not None:
+            self.recent.add(provider, event_id)
+        WEBHOOK_EVENTS.inc(provider=provider, outcome='spilled')
+        return 'spill'
+
+    def _insert(self, provider, event_id, event_type, payload):
+        db = self._append_pool.get(timeout=self._connect_timeout)
+        try:
+            return db.execute(
+                """INSERT INTO webhook_inbox (provider, event_id, event_type, payload)
+                   VALUES (%s, %s, %s, %s)
+                   ON CONFLICT (provider, event_id) DO NOTHING""",
+                (provider, event_id, event_type, payload)
+            )
+        finally:
+            self._append_pool.put(db)
+
+    def _duplicate(self, provider):
+        self.duplicates += 1
+        WEBHOOK_EVENTS.inc(provider=provider, outcome='duplicate')
+        return 'duplicate'
+
+    # Local spill log
+    def _spill(self, record):
+        line = (json.dumps(record, separators=(',', ':')) + '\n').encode()
+        while True:
+            fd = os.open(self.spill_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                # The importer may have renamed the file while we waited for the lock
+                try:
+                    current = os.stat(self.spill_path).st_ino
+                except FileNotFoundError:
+                    current = None
+                if current != os.fstat(fd).st_ino:
+                    continue
+                os.write(fd, line)
+                os.fsync(fd)
+                return
+            finally:
+                os.close(fd)
+
+    def import_spill(self):
+        """Move spilled events into the inbox table; returns how many were moved"""
+        importing = self.spill_path + '.importing'
+        if not os.path.exists(importing):
+            try:
+                fd = os.open(self.spill_path, os.O_RDONLY)
+            except FileNotFoundError:
+                return 0
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                if not os.path.exists(importing):
+                    os.rename(self.spill_path, importing)
+            finally:
+                os.close(fd)
+
+        try:
+            f = open(importing, 'rb')
+        except FileNotFoundError:
+            return 0
+        with f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                if os.stat(importing).st_ino != os.fstat(f.fileno()).st_ino:
+                    return 0  # Another process imported this file while we waited
+            except FileNotFoundError:
+                return 0
+            records = []
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logger.error(f"Skipping corrupt webhook spill line: {line[:200]!r}")
+            self.ensure_schema()
+            conn = db_manager.get_connection()
+            try:
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_READ_COMMITTED)
+                with conn.cursor() as cursor:
+                    cursor.executemany(
+                        """INSERT INTO webhook_inbox (provider, event_id, event_type, payload)
+                           VALUES (%s, %s, %s, %s)
+                           ON CONFLICT (provider, event_id) DO NOTHING""",
+                        [(r['provider'], r['event_id'], r['event_type'], r['payload']) for r in records]
+                    )
+                conn.commit()
+            finally:
+                conn.close()
+            # A crash between the commit and this unlink re-imports the batch; the unique index drops it
+            os.unlink(importing)
+        if records:
+            logger.info(f"Imported {len(records)} spilled webhook events into the inbox")
+        return len(records)
+
+    def spill_backlog(self):
+        return sum(os.path.getsize(path) for path in (self.spill_path, self.spill_path + '.importing')
+                   if os.path.exists(path))
+
+    # Worker side
+    def claim(self, limit):
+        """Lease up to limit due events to this worker"""
+        self.ensure_schema()
+        return self.worker_db.execute(
+            """UPDATE webhook_inbox
+               SET attempts = attempts + 1, next_attempt_at = NOW() + %s * INTERVAL '1 second'
+               WHERE id IN (
+                   SELECT id FROM webhook_inbox
+                   WHERE status = 'pending' AND next_attempt_at <= NOW()
+                   ORDER BY id LIMIT %s
+                   FOR UPDATE SKIP LOCKED
+               )
+               RETURNING id, provider, event_id, event_type, payload, attempts""",
+            (self.lease_seconds, limit), fetch=True
+        )
+
+    def complete(self, ids):
+        if ids:
+            self.worker_db.execute(
+                "UPDATE webhook_inbox SET status = 'done', processed_at = NOW(), last_error = NULL WHERE id = ANY(%s)",
+                (list(ids),)
+            )
+
+    def reschedule(self, event_id, delay_seconds, error, dead=False):
+        self.worker_db.execute(
+            """UPDATE webhook_inbox
+               SET status = %s, last_error = %s, next_attempt_at = NOW() + %s * INTERVAL '1 second'
+               WHERE id = %s""",
+            ('dead' if dead else 'pending', error[:2000], delay_seconds, event_id)
+        )
+
+class WebhookWorker:
+    """Background thread draining the inbox through per-provider handlers"""
+
+    def __init__(self, inbox, handlers, batch_size=50, poll_interval=1.0,
+                 max_attempts=8, retry_base_seconds=5.0, retry_max_seconds=3600.0):
+        self.inbox = inbox
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.processed = 0
+        self.retried = 0
+        self.dead = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        # Threads do not survive a fork, so each worker process starts its own
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._stop.clear()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="webhook-worker", daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+        return self
+
+    def ensure_started(self):
+        """Cheap per-request check that this process has a live worker"""
+        if self._pid != os.getpid() or not self._thread.is_alive():
+            self.start()
+
+    def wake(self):
+        """Have the worker look at the inbox now instead of at its next poll"""
+        self.ensure_started()
+        self._wake.set()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._thread.join(timeout)
+
+    def _run(self):
+        failures = 0
+        while not self._stop.is_set():
+            try:
+                self.inbox.import_spill()
+                claimed = self.drain_once()
+                failures = 0
+            except Exception as e:
+                # Back off while the database is unreachable; new events only wake a healthy worker
+                failures += 1
+                delay = min(60.0, self.poll_interval * 2 ** failures)
+                logger.warning(f"Webhook worker pass failed, retrying in {delay:.0f}s: {e}")
+                self._stop.wait(delay)
+                continue
+            if claimed < self.batch_size:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def _backoff(self, attempts):
+        return min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempts - 1))
+
+    def drain_once(self):
+        """Process one batch of due events; returns how many were claimed"""
+        rows = self.inbox.claim(self.batch_size)
+        done = []
+        for row_id, provider, event_id, event_type, payload, attempts in rows:
+            handler = self.handlers.get(provider)
+            try:
+                if handler is None:
+                    raise LookupError(f"No webhook handler for provider {provider!r}")
+                handler(json.loads(payload), self.inbox.worker_db)
+                done.append(row_id)
+            except Exception as e:
+                dead = attempts >= self.max_attempts
+                logger.error(f"Webhook {provider} event {event_id} ({event_type}) failed "
+                             f"on attempt {attempts}{', giving up' if dead else ''}: {e}")
+                self.inbox.reschedule(row_id, self._backoff(attempts), str(e), dead=dead)
+                if dead:
+                    self.dead += 1
+                    WEBHOOK_EVENTS.inc(provider=provider, outcome='dead')
+                else:
+                    self.retried += 1
+                    WEBHOOK_EVENTS.inc(provider=provider, outcome='retried')
+                continue
+            WEBHOOK_EVENTS.inc(provider=provider, outcome='processed')
+        self.inbox.complete(done)
+        self.processed += len(done)
+        return len(rows)
+
+    def stats(self):
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "processed": self.processed,
+            "retried": self.retried,
+            "dead": self.dead,
+            "duplicates": self.inbox.duplicates,
+            "recent_ids": self.inbox.recent.stats(),
+            "spill_backlog_bytes": self.inbox.spill_backlog()
+        }
+
+# Payment event handlers: db.execute matches db_manager.safe_execute; raise to have the event retried
+def handle_stripe_event(event, db):
+    if event['type'] == 'checkout.session.completed':
+        session = event['data']['object']
+        plan = (session.get('metadata') or {}).get('plan')
+        session_id = session['id']
+
+        logger.info(f"Stripe payment completed: session {session_id}, plan {plan}")
+
+        db.execute(
+            """INSERT INTO users (stripe_session_id, subscription_tier, created_at)
+               VALUES (%s, %s, NOW())
+               ON CONFLICT (stripe_session_id)
+               DO UPDATE SET subscription_tier = EXCLUDED.subscription_tier, updated_at = NOW()""",
+            (session_id, plan)
+        )
+
+        log_user_action(session_id, "subscription_created", {"plan": plan})
+
+def handle_coinbase_event(body, db):
+    event = body['event']
+    if event['type'] == 'charge:confirmed':
+        charge = event['data']
+        amount = charge['payments'][0]['value']['local']['amount']
+
+        logger.info(f"Crypto donation confirmed: charge {charge['id']}, amount {amount}")
+
+        db.execute(
+            """INSERT INTO donations (charge_id, amount, type, timestamp)
+               VALUES (%s, %s, %s, NOW())
+               ON CONFLICT (charge_id) DO NOTHING""",
+            (charge['id'], amount, 'crypto')
+        )
+
+        log_user_action(charge['id'], "crypto_donation", {"amount": amount})
+
+# Global webhook inbox and worker instances
+webhook_inbox = WebhookInbox(config.WEBHOOK_SPILL_FILE, lease_seconds=config.WEBHOOK_LEASE_SECONDS,
+                             recent_ids=config.WEBHOOK_RECENT_IDS,
+                             append_connections=config.WEBHOOK_APPEND_CONNECTIONS)
+webhook_worker = WebhookWorker(
+    webhook_inbox,
+    {'stripe': handle_stripe_event, 'coinbase': handle_coinbase_event},
+    batch_size=config.WEBHOOK_BATCH_SIZE,
+    poll_interval=config.WEBHOOK_POLL_SECONDS,
+    max_attempts=config.WEBHOOK_MAX_ATTEMPTS,
+    retry_base_seconds=config.WEBHOOK_RETRY_BASE_SECONDS
+)
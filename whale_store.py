@@ -0,0 +1,174 @@
+"""
+Columnar in-memory whale store.
+
+WhaleStore keeps whales as NumPy columns instead of a list of dicts:
+balance (float64), quality score (uint8), network and source as codes into
+small interned tables, first_seen as epoch seconds (int64) and addresses as
+fixed-width ASCII. Post URLs and titles are variable-length, so each is
+one UTF-8 buffer plus offsets. A whale costs 101 bytes plus its URL and
+title text, about 180 bytes in all, against about 640 bytes as a dict of
+boxed numbers and separate strings (benchmarks/bench_whale_store.py).
+
+Queries filter with boolean masks and rank with argpartition plus a sort
+of the candidates only, so top-k over a million whales takes 2-15 ms.
+Dicts are built only for the page being returned, in the shape the API has
+always served.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# Sort orders: primary column, tie-breaker (both descending)
+SORT_KEYS = {
+    'quality': ('quality_score', 'balance'),
+    'balance': ('balance', 'quality_score'),
+    'first_seen': ('first_seen', 'quality_score'),
+}
+
+ADDRESS_WIDTH = 64
+
+class TextColumn:
+    """Variable-length strings as one UTF-8 buffer plus offsets"""
+
+    __slots__ = ('data', 'offsets')
+
+    def __init__(self, values: Iterable[Optional[str]]):
+        encoded = [(value or '').encode('utf-8') for value in values]
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=self.offsets[1:])
+        self.data = b''.join(encoded)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self.data[self.offsets[i]:self.offsets[i + 1]].decode('utf-8')
+
+    @property
+    def nbytes(self):
+        return len(self.data) + self.offsets.nbytes
+
+class WhaleStore:
+    """Immutable columnar set of whales with vectorized filter, sort and top-k"""
+
+    def __init__(self, address: Sequence[str], balance: Sequence[float], network: Sequence[str],
+                 source: Sequence[Optional[str]], quality_score: Sequence[int],
+                 first_seen: Sequence[Any], post_url: Sequence[Optional[str]] = None,
+                 post_title: Sequence[Optional[str]] = None):
+        count = len(address)
+        self.address = np.array(address, dtype=f'S{ADDRESS_WIDTH}')
+        self.balance = np.asarray(balance, dtype=np.float64)
+        self.quality_score = np.clip(np.asarray(quality_score, dtype=np.int64), 0, 100).astype(np.uint8)
+        self.first_seen = np.fromiter((epoch_seconds(value) for value in first_seen),
+                                      dtype=np.int64, count=count)
+        self.networks, self.network = intern_column(network)
+        self.sources, self.source = intern_column(source)
+        self.post_url = TextColumn(post_url if post_url is not None else [None] * count)
+        self.post_title = TextColumn(post_title if post_title is not None else [None] * count)
+
+    @classmethod
+    def from_dicts(cls, whales: Sequence[Dict[str, Any]]):
+        """Build from API-shaped dicts (address, balance, network, source, quality_score, first_seen, ...)"""
+        return cls(*([whale.get(key) for whale in whales] for key in
+                     ('address', 'balance', 'network', 'source', 'quality_score',
+                      'first_seen', 'post_url', 'post_title')))
+
+    def __len__(self):
+        return len(self.balance)
+
+    @property
+    def nbytes(self):
+        columns = (self.address, self.balance, self.quality_score, self.first_seen, self.network, self.source)
+        return sum(column.nbytes for column in columns) + self.post_url.nbytes + self.post_title.nbytes
+
+    def mask(self, network: Optional[str] = None, source: Optional[str] = None,
+             min_balance: Optional[float] = None, min_quality: Optional[int] = None):
+        """Boolean mask of whales matching every given filter (None when nothing filters)"""
+        conditions = []
+        if network is not None:
+            if network not in self.networks:
+                return np.zeros(len(self), dtype=bool)
+            conditions.append(self.network == self.networks.index(network))
+        if source is not None:
+            if source not in self.sources:
+                return np.zeros(len(self), dtype=bool)
+            conditions.append(self.source == self.sources.index(source))
+        if min_balance is not None:
+            conditions.append(self.balance >= min_balance)
+        if min_quality is not None:
+            conditions.append(self.quality_score >= min_quality)
+        if not conditions:
+            return None
+        return np.logical_and.reduce(conditions) if len(conditions) > 1 else conditions[0]
+
+    def count(self, **filters) -> int:
+        mask = self.mask(**filters)
+        return len(self) if mask is None else int(np.count_nonzero(mask))
+
+    def top(self, limit: int, offset: int = 0, sort: str = 'quality', **filters) -> np.ndarray:
+        """Row indices of the page [offset, offset + limit) of matching whales, best first"""
+        primary_name, secondary_name = SORT_KEYS[sort]
+        mask = self.mask(**filters)
+        rows = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        wanted = offset + limit
+        if wanted <= 0 or not len(rows):
+            return rows[:0]
+        primary = getattr(self, primary_name)[rows]
+        if wanted < len(rows):
+            # Only rows tied with or above the k-th best primary value can make the page
+            kth = np.partition(primary, len(rows) - wanted)[len(rows) - wanted]
+            keep = primary >= kth
+            rows, primary = rows[keep], primary[keep]
+        secondary = getattr(self, secondary_name)[rows]
+        # lexsort sorts by the last key first; negate for descending, row index breaks ties
+        order = np.lexsort((rows, -secondary.astype(np.float64), -primary.astype(np.float64)))
+        return rows[order[offset:wanted]]
+
+    def to_dicts(self, rows: Iterable[int]) -> List[Dict[str, Any]]:
+        """Materialize whales as API dicts"""
+        whales = []
+        for i in rows:
+            i = int(i)
+            whales.append({
+                'address': self.address[i].decode('ascii'),
+                'balance': float(self.balance[i]),
+                'network': self.networks[self.network[i]],
+                'source': self.sources[self.source[i]],
+                'quality_score': int(self.quality_score[i]),
+                'first_seen': datetime.fromtimestamp(int(self.first_seen[i]), timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'post_url': self.post_url[i] or None,
+                'post_title': self.post_title[i] or None
+            })
+        return whales
+
+    def page(self, limit: int, offset: int = 0, sort: str = 'quality', **filters) -> List[Dict[str, Any]]:
+        return self.to_dicts(self.top(limit, offset=offset, sort=sort, **filters))
+
+def intern_column(values: Sequence[Optional[str]]):
+    """Distinct values (None kept as None) and a small integer code per row"""
+    table: List[Optional[str]] = []
+    index: Dict[Optional[str], int] = {}
+    codes = np.empty(len(values), dtype=np.uint16)
+    for i, value in enumerate(values):
+        code = index.get(value)
+        if code is None:
+            if len(table) > np.iinfo(np.uint16).max:
+                raise ValueError("too many distinct values to intern")
+            code = index[value] = len(table)
+            table.append(value)
+        codes[i] = code
+    return table, codes
+
+def epoch_seconds(value) -> int:
+    """Epoch seconds from a datetime, an ISO-8601 string or a number (naive times are UTC)"""
+    if value is None:
+        return 0
+    if isinstance(value, (int, float, np.integer)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())